@@ -0,0 +1,144 @@
+"""Benchmark suite command line.
+
+    python -m benchmarks run [-k PATTERN] [--output FILE]
+    python -m benchmarks compare [-k PATTERN] [--baseline FILE]
+        [--results FILE] [--threshold 0.25] [--normalize]
+
+`compare` exits with status 1 when any tracked operation is slower than
+the baseline by more than the threshold (a fraction, 0.25 = 25%).
+Baselines are machine specific and aren't committed: record one with
+`make benchmark-baseline` on the machine that runs the comparison.
+"""
+
+import argparse
+import sys
+from pathlib import Path
+from typing import Optional
+
+from . import runner
+
+
+def _report(name: str, seconds: float) -> None:
+    print(f'{runner.format_time(seconds)}  {name}', flush=True)
+
+
+def _run(args: argparse.Namespace) -> runner.Results:
+    from .cases import BENCHMARKS, close_parallel_validators
+
+    names = runner.select(list(BENCHMARKS), args.k)
+    try:
+        return runner.run(
+            {name: BENCHMARKS[name] for name in names},
+            min_time=args.min_time,
+            repeat=args.repeat,
+            report=_report,
+        )
+    finally:
+        close_parallel_validators()
+
+
+def run(args: argparse.Namespace) -> int:
+    results = _run(args)
+    if args.output:
+        runner.save(results, args.output)
+    return 0
+
+
+def compare(args: argparse.Namespace) -> int:
+    if not args.baseline.exists():
+        print(
+            f'No baseline at {args.baseline}, record one with '
+            '`make benchmark-baseline`',
+            file=sys.stderr,
+        )
+        return 2
+    baseline = runner.load(args.baseline)
+    if args.results:
+        results = runner.load(args.results)
+        results = {
+            name: results[name]
+            for name in runner.select(list(results), args.k)
+        }
+    else:
+        results = _run(args)
+
+    regressions = []
+    print(f'\n{"baseline":>11}  {"current":>11}  {"ratio":>6}  name')
+    for comparison in runner.compare(baseline, results, args.normalize):
+        ratio = comparison.ratio
+        flag = ''
+        if comparison.is_regression(args.threshold):
+            regressions.append(comparison)
+            flag = '  << SLOWER'
+        baseline_time = (
+            runner.format_time(comparison.baseline)
+            if comparison.baseline
+            else 'new'
+        )
+        print(
+            f'{baseline_time:>11}'
+            f'  {runner.format_time(comparison.current)}'
+            f'  {f"{ratio:.2f}" if ratio else "-":>6}'
+            f'  {comparison.name}{flag}'
+        )
+    if regressions:
+        print(
+            f'\n{len(regressions)} operation(s) slower than the baseline by '
+            f'more than {args.threshold:.0%}'
+        )
+        return 1
+    return 0
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog='python -m benchmarks')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    def add_command(name: str, help: str) -> argparse.ArgumentParser:
+        command = commands.add_parser(name, help=help)
+        command.add_argument(
+            '-k',
+            action='append',
+            default=[],
+            metavar='PATTERN',
+            help='only run the cases whose name contains PATTERN',
+        )
+        command.add_argument(
+            '--min-time', type=float, default=runner.DEFAULT_MIN_TIME
+        )
+        command.add_argument(
+            '--repeat', type=int, default=runner.DEFAULT_REPEAT
+        )
+        return command
+
+    run_command = add_command('run', 'run the suite and print the timings')
+    run_command.add_argument('--output', type=Path)
+    run_command.set_defaults(func=run)
+
+    compare_command = add_command(
+        'compare', 'fail if an operation got slower than the baseline'
+    )
+    compare_command.add_argument(
+        '--baseline', type=Path, default=runner.BASELINE_PATH
+    )
+    compare_command.add_argument(
+        '--results',
+        type=Path,
+        help='compare previously saved results instead of running the suite',
+    )
+    compare_command.add_argument(
+        '--threshold', type=float, default=runner.DEFAULT_THRESHOLD
+    )
+    compare_command.add_argument(
+        '--normalize',
+        action='store_true',
+        help='compare relative to the median slowdown of the whole run',
+    )
+    compare_command.set_defaults(func=compare)
+
+    args = parser.parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
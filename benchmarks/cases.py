@@ -0,0 +1,557 @@
+"""Registry of the operations tracked by the benchmark suite.
+
+Each case is a zero-argument callable keyed by a dotted name. Cases over
+the `*_inputs` batches process the whole batch per call.
+"""
+
+import asyncio
+import copy
+import csv
+import datetime as dt
+import io
+import json
+from collections import deque
+from functools import partial
+from typing import Any, Callable, Optional, Union
+
+from clabe import Clabe
+from pydantic import BaseModel, TypeAdapter
+from pydantic_extra_types.payment import PaymentCardNumber
+
+from cuenca_validations import (
+    duplicates,
+    ingestion,
+    instrumentation,
+    parallel,
+    prefetch,
+    validators,
+)
+from cuenca_validations.types import (
+    AccountNumber,
+    CardQuery,
+    Cursor,
+    JSONEncoder,
+    PhoneNumber,
+    StrictPaymentCardNumber,
+    TransferQuery,
+    TransferRequest,
+    UserLoginRequest,
+    UserQuery,
+    enum_coercer,
+    get_state_name,
+    helpers,
+    lenient_enum,
+    state_labels,
+)
+from cuenca_validations.types.accounts import parse_account_number
+from cuenca_validations.types.enums import AuthorizerTransaction, State
+from cuenca_validations.types.identities import Curp
+from cuenca_validations.types.requests import (
+    CurpValidationRequest,
+    FileUploadRequest,
+    PartnerUpdateRequest,
+    UserUpdateRequest,
+    validate_batch,
+)
+
+from . import runner
+from .fixtures import (
+    MODEL_PAYLOADS,
+    birth_date_inputs,
+    card_number_inputs,
+    clabe_inputs,
+    curp_inputs,
+    document_input,
+    e164_inputs,
+    email_inputs,
+    file_batch_input,
+    name_inputs,
+    nested_dict_inputs,
+    payroll_csv_input,
+    phone_number_inputs,
+    webhook_inputs,
+)
+
+Case = Callable[[], Any]
+
+BENCHMARKS: dict[str, Case] = {}
+
+
+def consume(values: Any) -> None:
+    deque(values, maxlen=0)
+
+
+def for_each(func: Callable[[Any], Any], values: list) -> Case:
+    return lambda: consume(map(func, values))
+
+
+def fresh_each(func: Callable[[Any], Any], values: list) -> Case:
+    """Like `for_each`, over a deep copy of `values` made before each run"""
+    return runner.Prepared(
+        partial(copy.deepcopy, values),
+        lambda copies: consume(map(func, copies)),
+    )
+
+
+def _model_cases(model: type[BaseModel], payload: dict) -> None:
+    name = f'{model.__module__.rsplit(".", 1)[-1]}.{model.__name__}'
+    instance = model.model_validate(payload)
+    BENCHMARKS[f'{name}.model_validate'] = partial(
+        model.model_validate, payload
+    )
+    BENCHMARKS[f'{name}.model_dump'] = instance.model_dump
+
+
+def _type_cases() -> None:
+    types: list[tuple[str, Any, list[str]]] = [
+        ('Clabe', Clabe, clabe_inputs()),
+        ('PaymentCardNumber', PaymentCardNumber, card_number_inputs()),
+        (
+            'StrictPaymentCardNumber',
+            StrictPaymentCardNumber,
+            card_number_inputs(),
+        ),
+        ('PhoneNumber', PhoneNumber, e164_inputs()),
+        ('Curp', Curp, curp_inputs()),
+    ]
+    for name, type_, values in types:
+        adapter = TypeAdapter(type_)
+        BENCHMARKS[f'types.{name}.validate_python'] = for_each(
+            adapter.validate_python, values
+        )
+
+
+def _account_cases() -> None:
+    # transfer fan-out batches mix Clabes and card numbers
+    accounts = [
+        account
+        for pair in zip(clabe_inputs(), card_number_inputs())
+        for account in pair
+    ]
+    transfers = [
+        dict(MODEL_PAYLOADS[TransferRequest], account_number=account)
+        for account in accounts
+    ]
+    union: TypeAdapter[Any] = TypeAdapter(Union[Clabe, PaymentCardNumber])
+    account_number: TypeAdapter[Any] = TypeAdapter(AccountNumber)
+    BENCHMARKS.update(
+        {
+            'accounts.Union.validate_python': for_each(
+                union.validate_python, accounts
+            ),
+            'accounts.AccountNumber.validate_python': for_each(
+                account_number.validate_python, accounts
+            ),
+            'accounts.parse_account_number.uncached': for_each(
+                parse_account_number.__wrapped__, accounts
+            ),
+            'accounts.TransferRequest.validate_batch': partial(
+                validate_batch, TransferRequest, transfers
+            ),
+        }
+    )
+
+
+def _validator_cases() -> None:
+    emails = email_inputs()
+    phone_numbers = phone_number_inputs()
+    names = name_inputs()
+    nested_dicts = nested_dict_inputs()
+    BENCHMARKS.update(
+        {
+            'validators.normalize_email': for_each(
+                validators.normalize_email, emails
+            ),
+            'validators.normalize_emails': partial(
+                validators.normalize_emails, emails
+            ),
+            'validators.normalize_phone_number': for_each(
+                validators.normalize_phone_number, phone_numbers
+            ),
+            'validators.normalize_phone_numbers': partial(
+                validators.normalize_phone_numbers, phone_numbers
+            ),
+            'validators.normalize_name': for_each(
+                validators.normalize_name, names
+            ),
+            'validators.cached_normalize_name': for_each(
+                validators.cached_normalize_name, names
+            ),
+            # in place, so every run gets its own copy of the inputs
+            'validators.sanitize_dict': fresh_each(
+                validators.sanitize_dict, nested_dicts
+            ),
+            'validators.sanitize_dict.copy': fresh_each(
+                partial(validators.sanitize_dict, copy=True), nested_dicts
+            ),
+            'validators.sanitize_item': fresh_each(
+                validators.sanitize_item, nested_dicts
+            ),
+            'validators.sanitize_item.lists_of_dicts': fresh_each(
+                validators.sanitize_item, webhook_inputs(100)
+            ),
+        }
+    )
+
+
+def _query_cases() -> None:
+    # list endpoint requests, from the query string to storage filters
+    for model in (TransferQuery, CardQuery, UserQuery):
+        params = dict(
+            MODEL_PAYLOADS[model],
+            created_after='2024-01-01T00:00:00',
+            page_size='50',
+        )
+        name = f'queries.{model.__name__}'
+        BENCHMARKS[f'{name}.parse_to_filters'] = partial(
+            lambda model, params: model.model_validate(params).to_filters(),
+            model,
+            params,
+        )
+        BENCHMARKS[f'{name}.parse_to_dump'] = partial(
+            lambda model, params: model.model_validate(params).model_dump(),
+            model,
+            params,
+        )
+    # bulk lookups by id, with a full page of them
+    for model, prefix in ((TransferQuery, 'TR'), (UserQuery, 'US')):
+        ids = ','.join(helpers.uuid_field(prefix)() for _ in range(100))
+        params = dict(MODEL_PAYLOADS[model], ids=ids)
+        name = f'queries.{model.__name__}.ids100'
+        BENCHMARKS[f'{name}.parse_to_filters'] = partial(
+            lambda model, params: model.model_validate(params).to_filters(),
+            model,
+            params,
+        )
+        BENCHMARKS[f'{name}.parse_to_dump'] = partial(
+            lambda model, params: model.model_validate(params).model_dump(),
+            model,
+            params,
+        )
+
+
+def _with_cursor_secret(case: Case) -> Case:
+    def run() -> None:
+        secret = Cursor.secret
+        Cursor.secret = b'benchmark secret'
+        try:
+            case()
+        finally:
+            Cursor.secret = secret
+
+    return run
+
+
+def _cursor_cases() -> None:
+    created_at = dt.datetime(2024, 5, 1, 12, 30, tzinfo=dt.timezone.utc)
+    transaction_id = 'TRSnL4BHyuRsqIHVdVTcvLwg'
+    tokens: list[str] = []
+    _with_cursor_secret(
+        lambda: tokens.append(Cursor.create(created_at, transaction_id))
+    )()
+    params = dict(MODEL_PAYLOADS[TransferQuery], cursor=str(tokens[0]))
+    BENCHMARKS.update(
+        {
+            'queries.Cursor.create': _with_cursor_secret(
+                partial(Cursor.create, created_at, transaction_id)
+            ),
+            'queries.Cursor.decode': _with_cursor_secret(
+                partial(Cursor.decode, tokens[0])
+            ),
+            'queries.TransferQuery.cursor.parse_to_filters': (
+                _with_cursor_secret(
+                    lambda: TransferQuery.model_validate(params).to_filters()
+                )
+            ),
+        }
+    )
+
+
+def _helper_cases() -> None:
+    curps = curp_inputs()
+    birth_dates = birth_date_inputs()
+    adult_birth_dates = [
+        birth_date
+        for birth_date in birth_dates
+        if birth_date <= helpers.age_cutoff()
+    ]
+    login = UserLoginRequest.model_validate(dict(password='supersecret'))
+    fields = list(UserLoginRequest.model_fields.values())
+    BENCHMARKS.update(
+        {
+            'helpers.uuid_field': helpers.uuid_field('US'),
+            'helpers.get_log_config': for_each(helpers.get_log_config, fields),
+            'helpers.get_log_plan': partial(
+                helpers.get_log_plan, UserLoginRequest
+            ),
+            'helpers.mask_value': partial(
+                helpers.mask_value, '646180157034181180', 4
+            ),
+            'helpers.model_dump_for_log': login.model_dump_for_log,
+            'helpers.curp_check_digit': for_each(
+                helpers.curp_check_digit, curps
+            ),
+            'helpers.parse_curp': for_each(helpers.parse_curp, curps),
+            'helpers.parse_curps': lambda: consume(helpers.parse_curps(curps)),
+            'helpers.get_birth_date_from_curp': for_each(
+                helpers.get_birth_date_from_curp, curps
+            ),
+            'helpers.age_cutoff': helpers.age_cutoff,
+            'helpers.validate_age_requirement': for_each(
+                helpers.validate_age_requirement, adult_birth_dates
+            ),
+            'helpers.meets_age_requirement': partial(
+                helpers.meets_age_requirement, birth_dates
+            ),
+        }
+    )
+
+
+def _serialization_cases() -> None:
+    nested_dicts = nested_dict_inputs()
+    encoder = JSONEncoder()
+    for model in (TransferRequest, UserUpdateRequest, PartnerUpdateRequest):
+        request = model.model_validate(MODEL_PAYLOADS[model])
+        BENCHMARKS[f'general.json_dumps.{model.__name__}'] = partial(
+            lambda request: json.dumps(request.model_dump(), cls=JSONEncoder),
+            request,
+        )
+    BENCHMARKS.update(
+        {
+            'general.JSONEncoder.stream': lambda: consume(
+                encoder.stream(nested_dicts)
+            ),
+            'requests.validate_batch': partial(
+                validate_batch,
+                TransferRequest,
+                [MODEL_PAYLOADS[TransferRequest]] * 100,
+            ),
+        }
+    )
+
+
+def _label_cases() -> None:
+    states = list(State) * 10
+    labels = [state_labels[state].upper() for state in states]
+    BENCHMARKS.update(
+        {
+            'general.get_state_name': for_each(get_state_name, states),
+            'general.EnumLabels.labels_for': partial(
+                state_labels.labels_for, states
+            ),
+            'general.EnumLabels.lookup': for_each(state_labels.lookup, labels),
+        }
+    )
+
+
+def _enum_cases() -> None:
+    # transaction types as they arrive in authorizer payloads
+    values = [member.value for member in AuthorizerTransaction] * 10
+    upper = [value.upper() for value in values]
+    coercer = enum_coercer(AuthorizerTransaction)
+    lenient = TypeAdapter(lenient_enum(AuthorizerTransaction))
+    BENCHMARKS.update(
+        {
+            'general.Enum.__call__': for_each(AuthorizerTransaction, values),
+            'general.EnumCoercer.coerce': for_each(coercer.coerce, values),
+            'general.EnumCoercer.coerce_many': partial(
+                coercer.coerce_many, values
+            ),
+            'general.EnumCoercer.coerce_many.lenient': partial(
+                coercer.coerce_many, upper, lenient=True
+            ),
+            'general.lenient_enum.validate_python': for_each(
+                lenient.validate_python, upper
+            ),
+        }
+    )
+
+
+def _file_cases() -> None:
+    document = document_input()
+    inputs = dict(
+        bytes=document,
+        bytearray=bytearray(document),
+        memoryview=memoryview(document),
+        file=io.BytesIO(document),
+    )
+    request = dict(type='ine', user_id='US01', extension='jpg')
+    encoder = JSONEncoder()
+    for name, file in inputs.items():
+        BENCHMARKS[f'files.FileUploadRequest.{name}'] = partial(
+            FileUploadRequest.model_validate, dict(request, file=file)
+        )
+    upload = FileUploadRequest.model_validate(dict(request, file=document))
+    BENCHMARKS.update(
+        {
+            'files.json_dumps': lambda: json.dumps(
+                upload.model_dump(), cls=JSONEncoder
+            ),
+            'files.JSONEncoder.stream': lambda: consume(
+                encoder.stream(upload.model_dump())
+            ),
+        }
+    )
+
+
+def _prefetch_cases(files: int) -> dict[str, Case]:
+    def prefetch_batch(concurrency: int) -> Case:
+        # the server starts with the first run, not when cases are listed
+        return lambda: asyncio.run(
+            prefetch.prefetch_batch(file_batch_input(files), concurrency)
+        )
+
+    return {
+        f'prefetch.prefetch_batch.{files}': prefetch_batch(
+            prefetch.DEFAULT_CONCURRENCY
+        ),
+        f'prefetch.prefetch_batch.{files}.serial': prefetch_batch(1),
+    }
+
+
+def _ingestion_cases(rows: int, keys: int) -> dict[str, Case]:
+    payroll = payroll_csv_input(rows)
+
+    def ingest(
+        processes: Optional[int], unique_transfers: bool = False
+    ) -> Case:
+        return lambda: consume(
+            ingestion.ingest(
+                TransferRequest,
+                ingestion.read_csv(payroll),
+                processes=processes,
+                unique_transfers=unique_transfers,
+            )
+        )
+
+    def baseline() -> None:
+        # what the batch service does today: reading the whole file,
+        # validating the rows one by one and then looking for repeated
+        # idempotency keys in a dict of the full strings
+        rows = list(csv.DictReader(io.StringIO(payroll.decode())))
+        for row in rows:
+            row['amount'] = int(row['amount'])
+        models = list(map(TransferRequest.model_validate, rows))
+        first_rows: dict[str, int] = {}
+        for line, model in enumerate(models, 2):
+            first_rows.setdefault(model.idempotency_key, line)
+
+    def index_keys() -> None:
+        index = duplicates.DuplicateIndex()
+        consume(map(index.add, key_inputs, range(keys)))
+
+    def dict_keys() -> None:
+        # what the batch service does today, full strings in memory
+        first_rows: dict[str, int] = {}
+        consume(map(first_rows.setdefault, key_inputs, range(keys)))
+
+    key_inputs = [f'PAYROLL-2024-05-{i:07}' for i in range(keys)]
+    return {
+        f'duplicates.DuplicateIndex.add.{keys}': index_keys,
+        f'duplicates.dict.setdefault.{keys}': dict_keys,
+        f'ingestion.csv.{rows}': ingest(None),
+        f'ingestion.csv.{rows}.processes': ingest(2),
+        f'ingestion.csv.{rows}.unique_transfers': ingest(None, True),
+        f'ingestion.csv.{rows}.baseline': baseline,
+    }
+
+
+# started by the first run, and reused so the timings don't include
+# starting the workers
+_parallel_validators: dict[int, parallel.ParallelValidator] = {}
+
+
+def _parallel_validator(processes: int) -> parallel.ParallelValidator:
+    if processes not in _parallel_validators:
+        _parallel_validators[processes] = parallel.ParallelValidator(
+            [CurpValidationRequest, UserUpdateRequest], processes
+        )
+    return _parallel_validators[processes]
+
+
+def close_parallel_validators() -> None:
+    """Stops the worker processes started by the parallel cases"""
+    while _parallel_validators:
+        _, validator = _parallel_validators.popitem()
+        validator.close()
+
+
+def _parallel_cases(size: int) -> dict[str, Case]:
+    cases: dict[str, Case] = {}
+    for model in (CurpValidationRequest, UserUpdateRequest):
+        payloads = [MODEL_PAYLOADS[model]] * size
+        name = f'parallel.{model.__name__}.{size}'
+        cases[f'{name}.validate_batch'] = partial(
+            validate_batch, model, payloads
+        )
+        for processes in (1, 2, 4):
+            cases[f'{name}.processes_{processes}'] = partial(
+                lambda processes, model, payloads: _parallel_validator(
+                    processes
+                ).validate(model, payloads),
+                processes,
+                model,
+                payloads,
+            )
+    return cases
+
+
+def large_input_cases(
+    files: int = 500,
+    rows: int = 10_000,
+    keys: int = 100_000,
+    payloads: int = 2_000,
+) -> dict[str, Case]:
+    """
+    Cases over large batches, worker processes and a local file server.
+    The test suite runs them with tiny inputs instead of these sizes.
+    """
+    return {
+        **_prefetch_cases(files),
+        **_ingestion_cases(rows, keys),
+        **_parallel_cases(payloads),
+    }
+
+
+def _instrumented(sink: instrumentation.Sink, case: Case) -> Case:
+    def run() -> None:
+        instrumentation.enable(sink)
+        try:
+            case()
+        finally:
+            instrumentation.disable()
+
+    return run
+
+
+def _instrumentation_cases() -> None:
+    transfers = [MODEL_PAYLOADS[TransferRequest]] * 100
+    validate = for_each(TransferRequest.model_validate, transfers)
+    BENCHMARKS.update(
+        {
+            'instrumentation.disabled': validate,
+            'instrumentation.in_memory': _instrumented(
+                instrumentation.InMemorySink(), validate
+            ),
+            'instrumentation.statsd': _instrumented(
+                instrumentation.StatsdSink(port=9), validate
+            ),
+        }
+    )
+
+
+for _model, _payload in MODEL_PAYLOADS.items():
+    _model_cases(_model, _payload)
+_type_cases()
+_account_cases()
+_validator_cases()
+_query_cases()
+_cursor_cases()
+_helper_cases()
+_serialization_cases()
+_label_cases()
+_enum_cases()
+_file_cases()
+_instrumentation_cases()
+LARGE_INPUT_CASES = large_input_cases()
+BENCHMARKS.update(LARGE_INPUT_CASES)
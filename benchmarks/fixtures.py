@@ -0,0 +1,516 @@
+"""Realistic inputs for the benchmarks.
+
+`MODEL_PAYLOADS` has one valid payload for every model in
+`types/requests.py` and `types/queries.py`, and the `*_inputs` generators
+build deterministic batches of values for the validators and helpers.
+"""
+
+import datetime as dt
+import random
+import string
+import threading
+import time
+from functools import lru_cache
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any
+
+from clabe import compute_control_digit
+from pydantic import BaseModel
+
+from cuenca_validations.card_bins import CARD_BINS
+from cuenca_validations.types import queries, requests
+from cuenca_validations.types.enums import TransactionStatus
+from cuenca_validations.types.identities import ADDRESS_REQUEST_EXAMPLE
+from cuenca_validations.typing import DictStrAny
+
+BATCH_SIZE = 1_000
+SEED = 2024
+
+
+def with_luhn_digit(number: str) -> str:
+    total = 0
+    for position, char in enumerate(reversed(number)):
+        digit = int(char)
+        if position % 2 == 0:
+            digit = digit * 2 - 9 if digit > 4 else digit * 2
+        total += digit
+    return number + str((10 - total % 10) % 10)
+
+
+USER_ID = 'USWqY5cvkISJOxHyEKjAKf8w'
+CARD_ID = 'CA2XhLmfFBFMWJ1qO4v4Pz3g'
+CLABE = '646180157034181180'
+CARD_NUMBER = with_luhn_digit('400443' + '340002350')
+CURP = 'GOCG650418HVZNML08'
+RFC = 'GOCG650418TJ1'
+PHONE_NUMBER = '+525512345678'
+LOCATION = (19.432607, -99.133209)
+
+CARD_TRANSACTION = dict(
+    card_id=CARD_ID,
+    user_id=USER_ID,
+    amount=15_000,
+    merchant_name='OXXO SUC 2315',
+    merchant_type='5411',
+    merchant_data='OXXO SUC 2315 CIUDAD DE MEXMX',
+    currency_code='484',
+    prosa_transaction_id='PT1234567890',
+    retrieval_reference='123456789012',
+    card_type='physical',
+    card_status='active',
+    transaction_type='normal_purchase',
+)
+CARD_NOTIFICATION = dict(
+    CARD_TRANSACTION,
+    track_data_method='terminal',
+    pos_capability='pin_accepted',
+)
+SHAREHOLDER = dict(
+    name='Doroteo',
+    first_surname='Arango',
+    curp=CURP,
+    rfc=RFC,
+    percentage=100,
+    shareholders=[],
+    legal_representatives=[
+        dict(
+            names='Doroteo',
+            first_surname='Arango',
+            job='CEO',
+            phone_number=PHONE_NUMBER,
+            email_address='doroteo@cuenca.com',
+            address=ADDRESS_REQUEST_EXAMPLE,
+        )
+    ],
+)
+
+
+def _example(model: type[BaseModel], **overrides: Any) -> DictStrAny:
+    extra = model.model_config.get('json_schema_extra')
+    assert isinstance(extra, dict)
+    example = extra['example']
+    assert isinstance(example, dict)
+    return {**example, **overrides}
+
+
+MODEL_PAYLOADS: dict[type[BaseModel], DictStrAny] = {
+    # requests
+    requests.BaseRequest: {},
+    requests.BaseTransferRequest: dict(
+        recipient_name='Doroteo Arango',
+        amount=10_000,
+        descriptor='Mezcal, pulque y tequila',
+        idempotency_key='UNIQUE-KEY-003',
+    ),
+    requests.TransferRequest: _example(requests.TransferRequest),
+    requests.StrictTransferRequest: _example(
+        requests.StrictTransferRequest, account_number=CARD_NUMBER
+    ),
+    requests.UpdateTransferRequest: dict(status='succeeded'),
+    requests.CardUpdateRequest: dict(status='blocked'),
+    requests.CardRequest: dict(
+        user_id=USER_ID, issuer='cuenca', funding_type='debit'
+    ),
+    requests.CardActivationRequest: dict(
+        number=CARD_NUMBER, exp_month=11, exp_year=30, cvv2='123'
+    ),
+    requests.ApiKeyUpdateRequest: dict(
+        user_id=USER_ID, metadata=dict(name='webhooks')
+    ),
+    requests.UserCredentialUpdateRequest: dict(is_active=True),
+    requests.UserCredentialRequest: dict(password='Mypass123.'),
+    requests.CardValidationRequest: dict(
+        number=CARD_NUMBER, exp_month=11, exp_year=30, cvv2='123'
+    ),
+    requests.ARPCRequest: dict(
+        number=CARD_NUMBER,
+        arqc='DB3C77D5469C53C6',
+        arpc_method='1',
+        transaction_data='1234',
+        response_code='0010',
+        transaction_counter='001D',
+        pan_sequence='00',
+        unique_number='42D6A016',
+        track_data_method='terminal',
+    ),
+    requests.CardBatchRequest: dict(
+        card_design='classic', card_packaging='NL', number_of_cards=100
+    ),
+    requests.CardTransactionRequest: CARD_TRANSACTION,
+    requests.ReverseRequest: CARD_TRANSACTION,
+    requests.CardNotificationRequest: CARD_NOTIFICATION,
+    requests.ChargeRequest: dict(CARD_NOTIFICATION, issuer='Visa'),
+    requests.UserCardNotificationRequest: dict(
+        CARD_TRANSACTION, type='balance_inquiry'
+    ),
+    requests.SavingBaseRequest: dict(goal_amount=1_000_000),
+    requests.SavingRequest: dict(
+        name='Viaje', category='travel', goal_amount=1_000_000
+    ),
+    requests.SavingUpdateRequest: dict(goal_amount=2_000_000),
+    requests.WalletTransactionRequest: dict(
+        wallet_uri='/savings/LAvWUDH6OpQk-ber3E_zUEiQ',
+        transaction_type='deposit',
+        amount=10_000,
+    ),
+    requests.FraudFundsTransferRequest: dict(
+        user_id=USER_ID, clabe=CLABE, amount=10_000
+    ),
+    requests.FraudValidationRequest: dict(
+        amount=15_000,
+        merchant_name='OXXO SUC 2315',
+        merchant_type='5411',
+        merchant_data='OXXO SUC 2315 CIUDAD DE MEXMX',
+        currency_code='484',
+        transaction_type='normal_purchase',
+        track_data_method='terminal',
+        pos_capability='pin_accepted',
+        issuer='Mastercard',
+    ),
+    requests.TransactionTokenValidationUpdateRequest: dict(status='accepted'),
+    requests.UserPldRiskLevelRequest: dict(user_id=USER_ID, level=0.25),
+    requests.CurpValidationRequest: _example(requests.CurpValidationRequest),
+    requests.TOSRequest: dict(
+        type='ifpe', version='2022-01-01', ip='127.0.0.1'
+    ),
+    requests.UserTOSAgreementRequest: dict(
+        tos_id='TS67f5d1e9b6c7f8fa5a3ad5b4', location=LOCATION
+    ),
+    requests.PasswordResetRequest: dict(location=LOCATION),
+    requests.UserRequest: _example(
+        requests.UserRequest, profession='empleado'
+    ),
+    requests.BeneficiaryRequest: _example(requests.BeneficiaryRequest),
+    requests.UserUpdateRequest: dict(
+        phone_number=PHONE_NUMBER,
+        email_address='doroteo@cuenca.com',
+        profession='empleado',
+        address=ADDRESS_REQUEST_EXAMPLE,
+    ),
+    requests.UserLoginRequest: _example(requests.UserLoginRequest),
+    requests.SessionRequest: _example(requests.SessionRequest),
+    requests.AgentRequest: _example(requests.AgentRequest),
+    requests.EndpointRequest: dict(
+        url='https://cuenca.com/webhooks', events=['transaction.create']
+    ),
+    requests.EndpointUpdateRequest: dict(is_enable=False),
+    requests.FileUploadRequest: dict(
+        file=b'%PDF-1.4\n' + bytes(range(256)) * 16,
+        extension='pdf',
+        type='ine',
+        is_back=False,
+        user_id=USER_ID,
+    ),
+    requests.StrictFileUploadRequest: dict(
+        file=b'%PDF-1.4\n' + bytes(range(256)) * 16,
+        extension='pdf',
+        type='ine',
+        is_back=False,
+        user_id=USER_ID,
+    ),
+    requests.FileRequest: dict(
+        url='https://cuenca.com/files/ine.jpeg', type='ine'
+    ),
+    requests.FileBatchUploadRequest: dict(
+        files=[
+            dict(url='https://cuenca.com/files/ine.jpeg', type='ine'),
+            dict(
+                url='https://cuenca.com/files/ine_back.jpeg',
+                type='ine',
+                is_back=True,
+            ),
+        ],
+        user_id=USER_ID,
+    ),
+    requests.VerificationRequest: _example(requests.VerificationRequest),
+    requests.VerificationAttemptRequest: _example(
+        requests.VerificationAttemptRequest
+    ),
+    requests.LimitedWalletRequest: dict(
+        allowed_curp='TAXM840916HNEMXT02', allowed_rfc='TAXM840916123'
+    ),
+    requests.PlatformRequest: dict(
+        name='Cuenca', rfc=RFC, establishment_date=dt.date(2015, 1, 1)
+    ),
+    requests.WebhookRequest: dict(
+        id='WHzL1Ow4c9QFmCbSbYt2WBbg',
+        event='create',
+        object_type='transaction',
+        data=dict(id='TR123', amount=10_000, status='succeeded'),
+    ),
+    requests.KYCValidationRequest: dict(
+        user_id=USER_ID, source_type='client', force=False
+    ),
+    requests.BankAccountValidationRequest: dict(account_number=CLABE),
+    requests.UserListsRequest: _example(
+        requests.UserListsRequest, account_number=CLABE
+    ),
+    requests.QuestionnairesRequest: dict(
+        user_id=USER_ID, token='tok_123456', form_id='FORM-001'
+    ),
+    requests.PartnerRequest: dict(
+        legal_name='Cuenca Tecnologia Financiera',
+        business_name='Cuenca',
+        nationality='MX',
+        incorporation_date=dt.date(2015, 1, 1),
+        folio='FOLIO-123',
+        rfc=RFC,
+        documentation_url='https://cuenca.com/docs/acta.pdf',
+        web_site='https://cuenca.com',
+        phone_number=PHONE_NUMBER,
+        email_address='legal@cuenca.com',
+        address=ADDRESS_REQUEST_EXAMPLE,
+    ),
+    requests.PartnerUpdateRequest: dict(
+        shareholders=[SHAREHOLDER],
+        legal_representatives=SHAREHOLDER['legal_representatives'],
+    ),
+    requests.PhoneVerificationAssociationRequest: dict(
+        verification_id='VEKp662Yrf6lMztl0-9qzk7Q'
+    ),
+    # queries
+    queries.QueryParams: dict(
+        user_id=USER_ID, created_after='2024-01-01T00:00:00'
+    ),
+    queries.TransactionQuery: dict(status='succeeded', page_size=50),
+    queries.TransferQuery: dict(
+        account_number=CLABE, network='spei', status='succeeded'
+    ),
+    queries.DepositQuery: dict(tracking_key='CUENCA1234', network='spei'),
+    queries.BillPaymentQuery: dict(account_number='501000000007'),
+    queries.CardTransactionQuery: dict(
+        card_uri=f'/cards/{CARD_ID}', status='succeeded'
+    ),
+    queries.ApiKeyQuery: dict(active=True),
+    queries.CardQuery: dict(number=CARD_NUMBER, status='active'),
+    queries.StatementQuery: dict(year=2022, month=1),
+    queries.AccountQuery: dict(account_number=CLABE),
+    queries.BalanceEntryQuery: dict(
+        funding_instrument_uri='/accounts/AC123', count=True
+    ),
+    queries.WalletQuery: dict(active=True),
+    queries.WalletTransactionQuery: dict(
+        wallet_uri='/savings/LAvWUDH6OpQk-ber3E_zUEiQ'
+    ),
+    queries.UserQuery: dict(
+        phone_number=PHONE_NUMBER,
+        email_address='doroteo@cuenca.com',
+        status='active',
+        clabe=CLABE,
+        curp=CURP,
+        name='José Doroteo Arango Arámbula',
+    ),
+    queries.IdentityQuery: dict(curp=CURP, rfc=RFC, status='active'),
+    queries.EventQuery: dict(identity_id='IDkhF3Ukm0RmC_3zq-lwCF0w'),
+    queries.SessionQuery: dict(type='session.registration'),
+    queries.AgentQuery: dict(active=True),
+    queries.FileQuery: dict(type='ine'),
+    queries.BankAccountValidationQuery: dict(account_number=CLABE),
+    queries.PostalCodeQuery: dict(postal_code='06600'),
+    queries.TOSQuery: dict(type='ifpe'),
+    queries.UsersTOSQuery: dict(type='ifpe'),
+}
+
+
+def _rng() -> random.Random:
+    return random.Random(SEED)
+
+
+def _digits(rng: random.Random, length: int) -> str:
+    return ''.join(rng.choices(string.digits, k=length))
+
+
+def email_inputs(n: int = BATCH_SIZE) -> list[str]:
+    rng = _rng()
+    domains = ['gmail.com', 'Yahoo.com', 'HOTMAIL.com', 'cuenca.com']
+    return [
+        f'User.{i}{rng.choice(["", "+cuenca", "+promo"])}'
+        f'@{rng.choice(domains)}'
+        for i in range(n)
+    ]
+
+
+def phone_number_inputs(n: int = BATCH_SIZE) -> list[str]:
+    rng = _rng()
+    formats = [
+        '+52 1 {} {} {}',
+        '52044{}{}{}',
+        '({}) {}-{}',
+        '+1 1{}.{}.{}',
+    ]
+    return [
+        rng.choice(formats).format(
+            _digits(rng, 2), _digits(rng, 4), _digits(rng, 4)
+        )
+        for _ in range(n)
+    ]
+
+
+def e164_inputs(n: int = BATCH_SIZE) -> list[str]:
+    rng = _rng()
+    return [
+        f'+52{rng.choice(["55", "33", "81"])}{_digits(rng, 8)}'
+        for _ in range(n)
+    ]
+
+
+def name_inputs(n: int = BATCH_SIZE) -> list[str]:
+    rng = _rng()
+    names = ['José', 'María', 'Ñuño', 'Rubén', 'Ángel', 'Doroteo', 'Zoë']
+    surnames = ['Núñez', 'Arango', 'Pérez', 'Gómez', 'Ibáñez', 'Ávila']
+    return [
+        f'{rng.choice(names)} {rng.choice(surnames)} {rng.choice(surnames)}'
+        for _ in range(n)
+    ]
+
+
+def curp_inputs(n: int = BATCH_SIZE) -> list[str]:
+    rng = _rng()
+    states = ['DF', 'VZ', 'NL', 'JC', 'NE', 'MC']
+    curps = []
+    for _ in range(n):
+        birth_date = dt.date(1950, 1, 1) + dt.timedelta(
+            days=rng.randrange(365 * 55)
+        )
+        curps.append(
+            ''.join(rng.choices(string.ascii_uppercase, k=4))
+            + birth_date.strftime('%y%m%d')
+            + rng.choice('HM')
+            + rng.choice(states)
+            + ''.join(rng.choices(string.ascii_uppercase, k=3))
+            + rng.choice(string.digits + string.ascii_uppercase)
+            + rng.choice(string.digits)
+        )
+    return curps
+
+
+def birth_date_inputs(n: int = BATCH_SIZE) -> list[dt.date]:
+    rng = _rng()
+    return [
+        dt.date(1950, 1, 1) + dt.timedelta(days=rng.randrange(365 * 60))
+        for _ in range(n)
+    ]
+
+
+def clabe_inputs(n: int = BATCH_SIZE) -> list[str]:
+    rng = _rng()
+    banks = ['002', '012', '014', '072', '646']
+    clabes = []
+    for _ in range(n):
+        clabe = rng.choice(banks) + '180' + _digits(rng, 11)
+        clabes.append(clabe + compute_control_digit(clabe))
+    return clabes
+
+
+def card_number_inputs(n: int = BATCH_SIZE) -> list[str]:
+    rng = _rng()
+    bins = sorted(CARD_BINS)
+    return [
+        with_luhn_digit(rng.choice(bins) + _digits(rng, 9)) for _ in range(n)
+    ]
+
+
+def nested_dict_inputs(n: int = BATCH_SIZE) -> list[DictStrAny]:
+    rng = _rng()
+    return [
+        dict(
+            id=f'TR{i}',
+            amount=rng.randrange(100, 1_000_000),
+            created_at=dt.datetime(2024, 1, 1) + dt.timedelta(minutes=i),
+            status=TransactionStatus.succeeded,
+            metadata=dict(
+                tags=['spei', 'transfer'],
+                raw=bytes(rng.randrange(256) for _ in range(16)),
+            ),
+        )
+        for i in range(n)
+    ]
+
+
+def webhook_inputs(n: int = BATCH_SIZE) -> list[DictStrAny]:
+    """Webhook payloads with lists of dicts that have lists of dicts"""
+    created_at = dt.datetime(2024, 1, 1)
+    return [
+        dict(
+            id=f'WH{i}',
+            status=TransactionStatus.succeeded,
+            created_at=created_at,
+            transfers=[
+                dict(
+                    id=f'TR{i}{j}',
+                    amount=j * 100,
+                    created_at=created_at,
+                    tags=['spei', 'transfer'],
+                    events=[dict(type='created', at=created_at)],
+                )
+                for j in range(5)
+            ],
+        )
+        for i in range(n)
+    ]
+
+
+def document_input(size: int = 4 * 1024 * 1024) -> bytes:
+    """A JPEG-looking KYC document of `size` bytes"""
+    rng = _rng()
+    return b'\xff\xd8\xff\xe0' + rng.randbytes(size - 4)
+
+
+class _DocumentHandler(BaseHTTPRequestHandler):
+    """
+    Answers every GET with the requested range of a JPEG document after
+    `latency` seconds, like a remote file storage would
+    """
+
+    protocol_version = 'HTTP/1.1'
+    # one write per response, so it isn't held back by Nagle's algorithm
+    wbufsize = -1
+    disable_nagle_algorithm = True
+    document = b'\xff\xd8\xff\xe0' + bytes(1020)
+    latency = 0.002
+
+    def log_message(self, *args: Any) -> None:
+        pass
+
+    def do_GET(self) -> None:
+        time.sleep(self.latency)
+        last = int(self.headers['Range'].rpartition('-')[2]) + 1
+        body = self.document[:last]
+        self.send_response(206)
+        self.send_header('Content-Type', 'image/jpeg')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+@lru_cache(maxsize=None)
+def file_server_url() -> str:
+    """Base URL of a local server for the file download benchmarks,
+    started the first time it's needed"""
+    server = ThreadingHTTPServer(('127.0.0.1', 0), _DocumentHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    host, port = server.server_address[:2]
+    return f'http://{host!s}:{port}'
+
+
+def file_batch_input(n: int = 500) -> DictStrAny:
+    base_url = file_server_url()
+    return dict(
+        user_id=USER_ID,
+        files=[
+            dict(url=f'{base_url}/files/{i}.jpg', type='ine') for i in range(n)
+        ],
+    )
+
+
+def payroll_csv_input(n: int = 10_000) -> bytes:
+    """Payroll file with `n` transfers to Clabes and cards"""
+    rng = _rng()
+    accounts = clabe_inputs(n // 2) + card_number_inputs(n - n // 2)
+    names = name_inputs(n)
+    lines = ['recipient_name,account_number,amount,descriptor,idempotency_key']
+    for i, (name, account) in enumerate(zip(names, accounts)):
+        amount = rng.randint(100_00, 50_000_00)
+        lines.append(f'{name},{account},{amount},Nómina,PAYROLL-{i}')
+    return '\r\n'.join(lines).encode()
@@ -0,0 +1,140 @@
+import fnmatch
+import json
+import platform
+import statistics
+import timeit
+from dataclasses import dataclass
+from pathlib import Path
+from time import perf_counter
+from typing import Any, Callable, Optional
+
+BASELINE_PATH = Path(__file__).with_name('baseline.json')
+DEFAULT_THRESHOLD = 0.25
+DEFAULT_MIN_TIME = 0.05
+DEFAULT_REPEAT = 5
+
+Results = dict[str, float]
+
+
+@dataclass(frozen=True)
+class Comparison:
+    name: str
+    baseline: Optional[float]
+    current: float
+    scale: float = 1.0
+
+    @property
+    def ratio(self) -> Optional[float]:
+        if not self.baseline:
+            return None
+        return self.current / (self.baseline * self.scale)
+
+    def is_regression(self, threshold: float) -> bool:
+        return self.ratio is not None and self.ratio > 1 + threshold
+
+
+@dataclass(frozen=True)
+class Prepared:
+    """
+    Case for functions that consume or mutate their input: `setup` builds
+    a fresh input before every call, and only `func` is timed
+    """
+
+    setup: Callable[[], Any]
+    func: Callable[[Any], object]
+
+    def __call__(self) -> object:
+        return self.func(self.setup())
+
+    def timeit(self, number: int) -> float:
+        elapsed = 0.0
+        for _ in range(number):
+            value = self.setup()
+            start = perf_counter()
+            self.func(value)
+            elapsed += perf_counter() - start
+        return elapsed
+
+
+def select(names: list[str], patterns: list[str]) -> list[str]:
+    if not patterns:
+        return names
+    return [
+        name
+        for name in names
+        if any(fnmatch.fnmatch(name, f'*{pattern}*') for pattern in patterns)
+    ]
+
+
+def measure(
+    func: Callable[[], object],
+    min_time: float = DEFAULT_MIN_TIME,
+    repeat: int = DEFAULT_REPEAT,
+) -> float:
+    """Best time per call, in seconds, out of `repeat` runs that each
+    take at least `min_time`"""
+    time: Callable[[int], float] = (
+        func.timeit
+        if isinstance(func, Prepared)
+        else timeit.Timer(func).timeit
+    )
+    number = 1
+    while (elapsed := time(number)) < min_time:
+        number = max(number * 2, int(number * min_time / max(elapsed, 1e-9)))
+    times = [elapsed, *(time(number) for _ in range(repeat - 1))]
+    return min(times) / number
+
+
+def run(
+    cases: dict[str, Callable[[], object]],
+    min_time: float = DEFAULT_MIN_TIME,
+    repeat: int = DEFAULT_REPEAT,
+    report: Optional[Callable[[str, float], None]] = None,
+) -> Results:
+    results = {}
+    for name, func in cases.items():
+        results[name] = measure(func, min_time, repeat)
+        if report:
+            report(name, results[name])
+    return results
+
+
+def compare(
+    baseline: Results, current: Results, normalize: bool = False
+) -> list[Comparison]:
+    """
+    Compares each current result with its baseline. With `normalize`, the
+    ratios are relative to the median ratio of all the common cases, which
+    cancels out a machine that is uniformly faster or slower than the one
+    that recorded the baseline.
+    """
+    scale = 1.0
+    common = [name for name in current if baseline.get(name)]
+    if normalize and common:
+        scale = statistics.median(
+            current[name] / baseline[name] for name in common
+        )
+    return [
+        Comparison(name, baseline.get(name), seconds, scale)
+        for name, seconds in current.items()
+    ]
+
+
+def save(results: Results, path: Path) -> None:
+    document = dict(
+        python=platform.python_version(),
+        machine=platform.machine(),
+        results={name: results[name] for name in sorted(results)},
+    )
+    path.write_text(json.dumps(document, indent=2) + '\n')
+
+
+def load(path: Path) -> Results:
+    return json.loads(path.read_text())['results']
+
+
+def format_time(seconds: float) -> str:
+    for unit, scale in (('s', 1), ('ms', 1e-3), ('us', 1e-6)):
+        if seconds >= scale:
+            return f'{seconds / scale:8.2f} {unit}'
+    return f'{seconds / 1e-9:8.2f} ns'
@@ -5,9 +5,15 @@ __all__ = [
     'validators',
 ]
 
-from pydantic_extra_types.phone_numbers import PhoneNumber
+from importlib import import_module
+from types import ModuleType
 
-from . import types, typing, validators
+from . import typing, validators
 from .version import __version__
 
-PhoneNumber.phone_format = 'E164'
+
+def __getattr__(name: str) -> ModuleType:
+    # types builds every pydantic model, so it's only imported on first use
+    if name == 'types':
+        return import_module('.types', __name__)
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
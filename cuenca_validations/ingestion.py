@@ -0,0 +1,323 @@
+"""Streaming validation of payroll and dispersal files.
+
+    from cuenca_validations.ingestion import ingest, read_csv
+
+    with open('payroll.csv', 'rb') as file:
+        for row in ingest(TransferRequest, read_csv(file)):
+            if row.ok:
+                send(row.model)
+            else:
+                report(row.line, row.errors)
+
+`read_csv` and `read_fixed_width` parse one row at a time from a file or
+from an in-memory or memory-mapped buffer, and `ingest` validates them as
+they're read, so memory doesn't depend on the size of the file. Rows come
+out in file order, with the validated model or the errors of that row.
+
+Every cell is a str, except for `int_fields` (the amount in cents) when
+they're integers, so amounts are validated as strict ints like in a JSON
+request. Empty cells are left out, so optional fields take their
+defaults. An `idempotency_key` that was already used by an earlier valid
+row is reported as a `duplicate_idempotency_key` error, and with
+`unique_transfers` so is a repeated (account_number, amount, descriptor)
+as `duplicate_transfer`. Both errors have the line of the first row in
+their `ctx`.
+"""
+
+import csv
+import io
+import mmap
+from dataclasses import dataclass, field
+from itertools import islice, tee
+from typing import (
+    IO,
+    Any,
+    Generator,
+    Generic,
+    Iterable,
+    Iterator,
+    Mapping,
+    Optional,
+    Sequence,
+    TypeVar,
+    Union,
+)
+
+from pydantic import ValidationError
+from pydantic_core import ErrorDetails
+
+from .duplicates import DuplicateIndex
+from .parallel import Errors, ParallelValidator, Payload
+from .types.requests import BaseTransferRequest
+from .typing import DictStrAny
+
+DEFAULT_CHUNK_SIZE = 1_000
+INT_FIELDS = frozenset({'amount'})
+
+Buffer = Union[bytes, bytearray, mmap.mmap]
+Source = Union[IO[bytes], IO[str], Buffer]
+# field name -> (start, end) columns of each line
+Layout = Mapping[str, tuple[int, int]]
+TransferModel = TypeVar('TransferModel', bound=BaseTransferRequest)
+
+
+@dataclass
+class Row(Generic[TransferModel]):
+    line: int
+    fields: DictStrAny = field(default_factory=dict)
+    model: Optional[TransferModel] = None
+    errors: list[ErrorDetails] = field(default_factory=list)
+
+    @property
+    def ok(self) -> bool:
+        return not self.errors
+
+
+class _BufferReader(io.RawIOBase):
+    """Reads an in-memory or memory-mapped buffer without copying it"""
+
+    def __init__(self, buffer: Buffer) -> None:
+        self._view = memoryview(buffer)
+        self._position = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, target: Any) -> int:
+        start = self._position
+        end = min(start + len(target), len(self._view))
+        target[: end - start] = self._view[start:end]
+        self._position = end
+        return end - start
+
+    def close(self) -> None:
+        # lets an mmap be closed once the rows are read
+        self._view.release()
+        super().close()
+
+
+def _decoded_lines(
+    lines: Iterable[Union[bytes, str]], encoding: str
+) -> Iterator[str]:
+    for line in lines:
+        yield line if isinstance(line, str) else line.decode(encoding)
+
+
+def _text_lines(source: Source, encoding: str) -> Iterator[str]:
+    """
+    Lines of `source` with their line endings, split on line feeds only.
+    Buffers and buffered binary files are decoded in blocks.
+    """
+    if isinstance(source, io.TextIOBase):
+        yield from source
+        return
+    if isinstance(source, (bytes, bytearray, mmap.mmap)):
+        binary: Any = io.BufferedReader(_BufferReader(source))
+    elif isinstance(source, io.BufferedIOBase):
+        binary = source
+    else:
+        yield from _decoded_lines(source, encoding)
+        return
+    text = io.TextIOWrapper(binary, encoding, newline='\n')
+    try:
+        yield from text
+    finally:
+        # the file of the caller is left open
+        if binary is source:
+            text.detach()
+        else:
+            text.close()
+
+
+def _to_int(value: str) -> Union[int, str]:
+    digits = value[1:] if value[0] == '-' else value
+    return int(value) if digits.isdigit() and digits.isascii() else value
+
+
+def _fields(
+    names: Sequence[str], values: Sequence[str], int_names: Sequence[str]
+) -> DictStrAny:
+    fields: DictStrAny = dict(zip(names, values))
+    if '' in values:
+        fields = {name: value for name, value in fields.items() if value}
+    for name in int_names:
+        if fields.get(name):
+            fields[name] = _to_int(fields[name])
+    return fields
+
+
+def read_csv(
+    source: Source,
+    fieldnames: Optional[Sequence[str]] = None,
+    delimiter: str = ',',
+    encoding: str = 'utf-8',
+    int_fields: frozenset[str] = INT_FIELDS,
+) -> Iterator[Row[Any]]:
+    """
+    Rows of a CSV file, using its first line as the header unless
+    `fieldnames` is given. Blank lines are skipped and a row with a
+    different number of columns than the header is reported as a
+    `column_count` error.
+    """
+    reader = csv.reader(_text_lines(source, encoding), delimiter=delimiter)
+    names = list(fieldnames) if fieldnames is not None else next(reader, [])
+    int_names = [name for name in names if name in int_fields]
+    for values in reader:
+        if not values:
+            continue
+        if len(values) != len(names):
+            error = ErrorDetails(
+                type='column_count',
+                loc=(),
+                msg=f'Expected {len(names)} columns, got {len(values)}',
+                input=values,
+            )
+            yield Row(reader.line_num, errors=[error])
+            continue
+        yield Row(reader.line_num, _fields(names, values, int_names))
+
+
+def read_fixed_width(
+    source: Source,
+    layout: Layout,
+    encoding: str = 'utf-8',
+    int_fields: frozenset[str] = INT_FIELDS,
+) -> Iterator[Row[Any]]:
+    """
+    Rows of a fixed-width file, one per line, with each field taken from
+    the `layout` columns and stripped. Blank lines are skipped.
+    """
+    names = list(layout)
+    int_names = [name for name in names if name in int_fields]
+    slices = [slice(start, end) for start, end in layout.values()]
+    for line_number, line in enumerate(_text_lines(source, encoding), 1):
+        line = line.rstrip('\r\n')
+        if not line.strip():
+            continue
+        values = [line[columns].strip() for columns in slices]
+        yield Row(line_number, _fields(names, values, int_names))
+
+
+def _chunks(
+    rows: Iterable[Row[Any]], chunk_size: int
+) -> Iterator[list[Row[Any]]]:
+    iterator = iter(rows)
+    while chunk := list(islice(iterator, chunk_size)):
+        yield chunk
+
+
+def _checked_rows(
+    model: type[BaseTransferRequest],
+    rows: Iterable[Row[Any]],
+    chunk_size: int,
+    processes: int,
+) -> Iterator[Row[Any]]:
+    """
+    `rows` with the errors found by the worker processes. Only errors
+    come back from the workers, as pickling the models costs more than
+    validating them again.
+    """
+
+    def payloads(chunk: list[Row[Any]]) -> list[Payload]:
+        return [row.fields for row in chunk if row.ok]
+
+    # tee keeps the rows of the chunks that are ahead in the workers
+    row_chunks, payload_chunks = tee(_chunks(rows, chunk_size))
+    with ParallelValidator([model], processes) as validator:
+        chunk_errors: Iterator[Errors] = validator.check_chunks(
+            model, map(payloads, payload_chunks)
+        )
+        for chunk, errors in zip(row_chunks, chunk_errors):
+            position = 0
+            for row in chunk:
+                if row.ok:
+                    row.errors = errors.get(position, [])
+                    position += 1
+                yield row
+
+
+def _duplicate_error(
+    type: str, loc: tuple, msg: str, key: str, first_line: int
+) -> ErrorDetails:
+    return ErrorDetails(
+        type=type,
+        loc=loc,
+        msg=f'{msg} on line {first_line}',
+        input=key,
+        ctx=dict(first_line=first_line),
+    )
+
+
+def ingest(
+    model: type[TransferModel],
+    rows: Iterable[Row[Any]],
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    processes: Optional[int] = None,
+    unique_transfers: bool = False,
+) -> Generator[Row[TransferModel], None, None]:
+    """
+    Validates `rows` against `model` as they're read and yields them in
+    order. Rows that already have errors are passed through.
+
+    With `processes`, rows are first checked in chunks of `chunk_size` by
+    that many worker processes, and only the rows they found valid are
+    validated again here to build their models. That doesn't make
+    ingestion faster, since those rows are still validated in this
+    process: it only moves rejecting the invalid rows to the workers.
+    Closing the generator before the end stops the worker processes.
+    """
+    keys = DuplicateIndex()
+    transfers = DuplicateIndex() if unique_transfers else None
+    validate = model.__pydantic_validator__.validate_python
+    if processes:
+        rows = _checked_rows(model, rows, chunk_size, processes)
+    for row in rows:
+        if row.ok:
+            try:
+                row.model = validate(row.fields)
+            except ValidationError as exc:
+                row.errors = exc.errors()
+            else:
+                row.errors = _check_duplicates(row, keys, transfers)
+                if row.errors:
+                    row.model = None
+        yield row
+
+
+def _check_duplicates(
+    row: Row[TransferModel],
+    keys: DuplicateIndex,
+    transfers: Optional[DuplicateIndex],
+) -> list[ErrorDetails]:
+    assert row.model is not None
+    key = row.model.idempotency_key
+    first_line = keys.add(key, row.line)
+    if first_line is not None:
+        return [
+            _duplicate_error(
+                'duplicate_idempotency_key',
+                ('idempotency_key',),
+                'Already used',
+                key,
+                first_line,
+            )
+        ]
+    if transfers is None:
+        return []
+    # account_number is only defined by the BaseTransferRequest subclasses
+    account_number = getattr(row.model, 'account_number', '')
+    transfer = (
+        f'{account_number}\x1f{row.model.amount}\x1f{row.model.descriptor}'
+    )
+    first_line = transfers.add(transfer, row.line)
+    if first_line is None:
+        return []
+    return [
+        _duplicate_error(
+            'duplicate_transfer',
+            (),
+            'Same account_number, amount and descriptor as the transfer',
+            transfer,
+            first_line,
+        )
+    ]
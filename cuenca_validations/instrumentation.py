@@ -0,0 +1,345 @@
+"""Optional timing and failure metrics for model validation.
+
+    from cuenca_validations import instrumentation
+
+    sink = instrumentation.InMemorySink()
+    instrumentation.enable(sink)
+    ...
+    print(sink.to_prometheus())
+
+`enable` wraps the validator of `BaseRequest`, `QueryParams` and every
+subclass, including the ones defined while it's on, so each of them
+reports the latency of its top-level validation (`Model(...)`,
+`model_validate`, `model_validate_json` and `model_validate_strings`)
+plus one error count per failing field and error type, e.g.
+`account_number` / `payment_card_number.bin`. `disable` puts the original
+validators back, so there's no overhead at all while it's off.
+
+Pydantic validates all the fields of a model in a single pydantic-core
+call, so latency is measured per model, not per field. Nested models are
+part of their parent's validation and aren't reported on their own.
+"""
+
+import socket
+import threading
+from bisect import bisect_left
+from collections import defaultdict
+from dataclasses import dataclass, field
+from time import perf_counter
+from typing import Any, Callable, Iterable, Optional, Protocol, Sequence
+
+from pydantic import BaseModel, ValidationError
+
+FieldError = tuple[str, str]  # (field, error type)
+
+DEFAULT_BUCKETS = (
+    0.00001,
+    0.000025,
+    0.00005,
+    0.0001,
+    0.00025,
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    float('inf'),
+)
+
+
+class Sink(Protocol):
+    def record(
+        self, model: str, seconds: float, errors: Sequence[FieldError]
+    ) -> None: ...  # pragma: no cover
+
+
+def field_errors(exc: ValidationError) -> list[FieldError]:
+    """
+    (field, error type) for each error, using the top-level field of the
+    model so nested locations and union members don't add new series
+    """
+    return [
+        (str(error['loc'][0]) if error['loc'] else '__root__', error['type'])
+        for error in exc.errors(include_url=False)
+    ]
+
+
+@dataclass
+class Histogram:
+    buckets: tuple[float, ...] = DEFAULT_BUCKETS
+    counts: list[int] = field(default_factory=list)
+    sum: float = 0.0
+    count: int = 0
+
+    def __post_init__(self) -> None:
+        self.counts = [0] * len(self.buckets)
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative_counts(self) -> list[int]:
+        total = 0
+        cumulative = []
+        for count in self.counts:
+            total += count
+            cumulative.append(total)
+        return cumulative
+
+
+def _label(value: str) -> str:
+    return value.replace('\\', r'\\').replace('"', r'\"').replace('\n', r'\n')
+
+
+def _format_bucket(bucket: float) -> str:
+    return '+Inf' if bucket == float('inf') else repr(bucket)
+
+
+class InMemorySink:
+    """Aggregates the metrics in process, e.g. for a /metrics endpoint"""
+
+    def __init__(self, buckets: tuple[float, ...] = DEFAULT_BUCKETS) -> None:
+        self.buckets = buckets
+        self.latencies: dict[str, Histogram] = {}
+        self.failures: dict[str, int] = defaultdict(int)
+        self.errors: dict[tuple[str, str, str], int] = defaultdict(int)
+        self._lock = threading.Lock()
+
+    def record(
+        self, model: str, seconds: float, errors: Sequence[FieldError]
+    ) -> None:
+        with self._lock:
+            try:
+                histogram = self.latencies[model]
+            except KeyError:
+                histogram = self.latencies[model] = Histogram(self.buckets)
+            histogram.observe(seconds)
+            if errors:
+                self.failures[model] += 1
+                for field_name, error_type in errors:
+                    self.errors[model, field_name, error_type] += 1
+
+    def reset(self) -> None:
+        with self._lock:
+            self.latencies.clear()
+            self.failures.clear()
+            self.errors.clear()
+
+    def to_prometheus(self, prefix: str = 'cuenca_validations') -> str:
+        """Prometheus text exposition format"""
+        lines = [
+            f'# HELP {prefix}_validation_seconds Validation latency per '
+            'model.',
+            f'# TYPE {prefix}_validation_seconds histogram',
+        ]
+        with self._lock:
+            for model, histogram in sorted(self.latencies.items()):
+                labels = f'model="{_label(model)}"'
+                for bucket, count in zip(
+                    histogram.buckets, histogram.cumulative_counts()
+                ):
+                    lines.append(
+                        f'{prefix}_validation_seconds_bucket{{{labels},'
+                        f'le="{_format_bucket(bucket)}"}} {count}'
+                    )
+                lines += [
+                    f'{prefix}_validation_seconds_sum{{{labels}}} '
+                    f'{histogram.sum!r}',
+                    f'{prefix}_validation_seconds_count{{{labels}}} '
+                    f'{histogram.count}',
+                ]
+            lines += [
+                f'# HELP {prefix}_validation_failures_total Rejected '
+                'validations per model.',
+                f'# TYPE {prefix}_validation_failures_total counter',
+            ]
+            for model, count in sorted(self.failures.items()):
+                lines.append(
+                    f'{prefix}_validation_failures_total'
+                    f'{{model="{_label(model)}"}} {count}'
+                )
+            lines += [
+                f'# HELP {prefix}_validation_errors_total Validation errors '
+                'per model, field and error type.',
+                f'# TYPE {prefix}_validation_errors_total counter',
+            ]
+            for (model, field_name, error_type), count in sorted(
+                self.errors.items()
+            ):
+                lines.append(
+                    f'{prefix}_validation_errors_total{{'
+                    f'model="{_label(model)}",field="{_label(field_name)}",'
+                    f'type="{_label(error_type)}"}} {count}'
+                )
+        return '\n'.join(lines) + '\n'
+
+
+class StatsdSink:
+    """
+    Sends the metrics to a StatsD compatible agent over UDP, one packet
+    per validation. Send errors are ignored so metrics can never make a
+    validation fail.
+    """
+
+    def __init__(
+        self,
+        host: str = '127.0.0.1',
+        port: int = 8125,
+        prefix: str = 'cuenca_validations',
+    ) -> None:
+        self.address = (host, port)
+        self.prefix = prefix
+        self.socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.socket.setblocking(False)
+
+    def record(
+        self, model: str, seconds: float, errors: Sequence[FieldError]
+    ) -> None:
+        name = f'{self.prefix}.{model}'
+        lines = [f'{name}.validation:{seconds * 1000:.6f}|ms']
+        if errors:
+            lines.append(f'{name}.failures:1|c')
+            lines.extend(
+                f'{name}.errors.{field_name}.{error_type}:1|c'
+                for field_name, error_type in errors
+            )
+        try:
+            self.socket.sendto('\n'.join(lines).encode(), self.address)
+        except OSError:
+            pass
+
+    def close(self) -> None:
+        self.socket.close()
+
+
+_sink: Optional[Sink] = None
+# instrumented models, and the ones whose subclasses get instrumented too
+_instrumented: dict[type[BaseModel], '_InstrumentedValidator'] = {}
+_bases: list[type[BaseModel]] = []
+
+
+def _record(
+    model: type[BaseModel], start: float, exc: Optional[ValidationError]
+) -> None:
+    seconds = perf_counter() - start
+    if _sink is not None:
+        _sink.record(model.__name__, seconds, field_errors(exc) if exc else ())
+
+
+class _InstrumentedValidator:
+    """
+    Stands in for a model's `__pydantic_validator__`, timing the entry
+    points and passing everything else through
+    """
+
+    def __init__(self, model: type[BaseModel], validator: Any) -> None:
+        self.model = model
+        self.validator = validator
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.validator, name)
+
+    def _entry_point(self, name: str) -> Callable[..., Any]:
+        # getting the entry point of a deferred model builds it, which
+        # replaces the model's validator, and this wrapper, with the built
+        # one
+        func = getattr(self.validator, name)
+        current = self.model.__dict__.get('__pydantic_validator__')
+        if current is not self:
+            self.validator = current
+            self.model.__pydantic_validator__ = self  # type: ignore
+        return func
+
+    def _validate(self, name: str, args: Any, kwargs: Any) -> Any:
+        start = perf_counter()
+        try:
+            result = self._entry_point(name)(*args, **kwargs)
+        except ValidationError as exc:
+            _record(self.model, start, exc)
+            raise
+        _record(self.model, start, None)
+        return result
+
+    def validate_python(self, *args: Any, **kwargs: Any) -> Any:
+        return self._validate('validate_python', args, kwargs)
+
+    def validate_json(self, *args: Any, **kwargs: Any) -> Any:
+        return self._validate('validate_json', args, kwargs)
+
+    def validate_strings(self, *args: Any, **kwargs: Any) -> Any:
+        return self._validate('validate_strings', args, kwargs)
+
+
+def _instrument(model: type[BaseModel]) -> None:
+    if model in _instrumented:
+        return
+    validator = _InstrumentedValidator(
+        model, model.__dict__['__pydantic_validator__']
+    )
+    model.__pydantic_validator__ = validator  # type: ignore
+    _instrumented[model] = validator
+    for subclass in model.__subclasses__():
+        _instrument(subclass)
+
+
+def _init_subclass_hook(base: type[BaseModel]) -> classmethod:
+    def __pydantic_init_subclass__(
+        cls: type[BaseModel], **kwargs: Any
+    ) -> None:
+        parent: Any = super(base, cls)
+        parent.__pydantic_init_subclass__(**kwargs)
+        _instrument(cls)
+
+    return classmethod(__pydantic_init_subclass__)
+
+
+def _default_models() -> list[type[BaseModel]]:
+    from .types.queries import QueryParams
+    from .types.requests import BaseRequest
+
+    return [BaseRequest, QueryParams]
+
+
+def enable(
+    sink: Sink, models: Optional[Iterable[type[BaseModel]]] = None
+) -> None:
+    """
+    Starts reporting validations of `models` and their subclasses, by
+    default BaseRequest and QueryParams, to `sink`. Calling it again
+    only replaces the sink.
+    """
+    global _sink
+    if _bases:
+        _sink = sink
+        return
+    models = list(models or _default_models())
+    for model in models:
+        if '__pydantic_init_subclass__' in model.__dict__:
+            raise ValueError(
+                f'{model.__name__} already defines __pydantic_init_subclass__'
+            )
+    for model in models:
+        _instrument(model)
+        model.__pydantic_init_subclass__ = _init_subclass_hook(  # type: ignore
+            model
+        )
+        _bases.append(model)
+    _sink = sink
+
+
+def disable() -> None:
+    """Puts the original validators back"""
+    global _sink
+    for model in _bases:
+        del model.__pydantic_init_subclass__
+    _bases.clear()
+    for model, validator in _instrumented.items():
+        if model.__dict__.get('__pydantic_validator__') is validator:
+            model.__pydantic_validator__ = validator.validator  # type: ignore
+    _instrumented.clear()
+    _sink = None
+
+
+def is_enabled() -> bool:
+    return bool(_bases)
@@ -0,0 +1,188 @@
+"""Validation of large batches spread over a process pool.
+
+    from cuenca_validations.parallel import ParallelValidator
+
+    with ParallelValidator([UserUpdateRequest]) as validator:
+        result = validator.validate(UserUpdateRequest, payloads)
+    for position, errors in result.errors.items():
+        print(position, errors)
+
+Pydantic validators and the custom ones of models such as
+UserUpdateRequest or CurpValidationRequest run while holding the GIL, so
+threads don't help. `ParallelValidator` splits the payloads in chunks
+that `validate_batch` validates in worker processes, and puts the results
+back in the input order, as if the whole batch had been validated in
+this process. Pickling the models back is often as slow as validating
+them, so `check_chunks` only sends back the errors of the failing items.
+
+Every worker builds the schemas of `models` once when it starts. Chunk
+sizes adapt to each model: they start small and grow to about
+`target_seconds` of work per chunk with the time per item measured by
+the workers, so the cost of sending a chunk to a worker stays small next
+to validating it, while every process still gets its share of the batch.
+"""
+
+import os
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from time import perf_counter
+from types import TracebackType
+from typing import Callable, Iterable, Iterator, Optional, TypeVar, Union
+
+from pydantic import BaseModel
+from pydantic_core import ErrorDetails
+
+from .types.general import prebuild_models
+from .types.requests import BatchValidationResult, Model, validate_batch
+from .typing import DictStrAny
+
+DEFAULT_TARGET_SECONDS = 0.05
+MIN_CHUNK_SIZE = 8
+MAX_CHUNK_SIZE = 10_000
+
+Payload = Union[DictStrAny, bytes, str]
+Errors = dict[int, list[ErrorDetails]]
+Result = TypeVar('Result')
+
+
+def _warm_up(models: tuple[type[BaseModel], ...]) -> None:
+    prebuild_models(*models)
+
+
+def _validate_chunk(
+    model: type[Model], payloads: list[Payload]
+) -> tuple[BatchValidationResult[Model], float]:
+    start = perf_counter()
+    result = validate_batch(model, payloads)
+    return result, perf_counter() - start
+
+
+def _check_chunk(
+    model: type[BaseModel], payloads: list[Payload]
+) -> tuple[Errors, float]:
+    start = perf_counter()
+    errors = validate_batch(model, payloads).errors
+    return errors, perf_counter() - start
+
+
+class ParallelValidator:
+    def __init__(
+        self,
+        models: Iterable[type[BaseModel]] = (),
+        processes: Optional[int] = None,
+        target_seconds: float = DEFAULT_TARGET_SECONDS,
+    ) -> None:
+        self.models = tuple(models)
+        self.processes = processes or os.cpu_count() or 1
+        self.target_seconds = target_seconds
+        # seconds per item of each model, measured by the workers
+        self.item_seconds: dict[type[BaseModel], float] = {}
+        self._executor = ProcessPoolExecutor(
+            self.processes, initializer=_warm_up, initargs=(self.models,)
+        )
+
+    def chunk_size(self, model: type[BaseModel], remaining: int) -> int:
+        """
+        Items for about `target_seconds` of work, but no more than an even
+        share of the `remaining` items for each process
+        """
+        item_seconds = self.item_seconds.get(model)
+        if item_seconds is None:
+            size = MIN_CHUNK_SIZE
+        else:
+            size = int(self.target_seconds / max(item_seconds, 1e-9))
+        share = -(-remaining // self.processes)
+        return max(min(size, share, MAX_CHUNK_SIZE), 1)
+
+    def _record(self, model: type[BaseModel], item_seconds: float) -> None:
+        previous = self.item_seconds.get(model, item_seconds)
+        self.item_seconds[model] = (previous + item_seconds) / 2
+
+    def validate_chunks(
+        self, model: type[Model], chunks: Iterable[list[Payload]]
+    ) -> Iterator[BatchValidationResult[Model]]:
+        """
+        Validates each of `chunks` in the worker processes and yields the
+        results in order. Chunks are taken from `chunks` as the results
+        are consumed, at most two per process ahead, so it can be a
+        stream. Chunks that haven't started are cancelled when a worker
+        raises or the generator is closed.
+        """
+        return self._map_chunks(_validate_chunk, model, chunks)
+
+    def check_chunks(
+        self, model: type[BaseModel], chunks: Iterable[list[Payload]]
+    ) -> Iterator[Errors]:
+        """
+        Like `validate_chunks`, but yields only the errors of each chunk
+        by position, without the models of the valid items
+        """
+        return self._map_chunks(_check_chunk, model, chunks)
+
+    def _map_chunks(
+        self,
+        func: Callable[..., tuple[Result, float]],
+        model: type[BaseModel],
+        chunks: Iterable[list[Payload]],
+    ) -> Iterator[Result]:
+        pending: deque[tuple[int, Future[tuple[Result, float]]]] = deque()
+        iterator = iter(chunks)
+        try:
+            while True:
+                while len(pending) < 2 * self.processes:
+                    chunk = next(iterator, None)
+                    if chunk is None:
+                        break
+                    future = self._executor.submit(func, model, chunk)
+                    pending.append((len(chunk), future))
+                if not pending:
+                    return
+                size, future = pending.popleft()
+                result, seconds = future.result()
+                if size:
+                    self._record(model, seconds / size)
+                yield result
+        finally:
+            for _, future in pending:
+                future.cancel()
+
+    def validate(
+        self, model: type[Model], items: Iterable[Payload]
+    ) -> BatchValidationResult[Model]:
+        """
+        Same result as `validate_batch(model, items)`, with the items
+        validated in the worker processes. Chunks are cut as they're
+        submitted, so their sizes follow the latest measurements.
+        """
+        payloads = list(items)
+
+        def chunks() -> Iterator[list[Payload]]:
+            start = 0
+            while start < len(payloads):
+                end = start + self.chunk_size(model, len(payloads) - start)
+                yield payloads[start:end]
+                start = end
+
+        result: BatchValidationResult[Model] = BatchValidationResult(models=[])
+        for chunk_result in self.validate_chunks(model, chunks()):
+            offset = len(result.models)
+            result.models += chunk_result.models
+            for position, errors in chunk_result.errors.items():
+                result.errors[offset + position] = errors
+        result.errors = dict(sorted(result.errors.items()))
+        return result
+
+    def close(self) -> None:
+        """Waits for the running chunks and cancels the queued ones"""
+        self._executor.shutdown(cancel_futures=True)
+
+    def __enter__(self) -> 'ParallelValidator':
+        return self
+
+    def __exit__(
+        self,
+        exc_type: Optional[type[BaseException]],
+        exc_value: Optional[BaseException],
+        traceback: Optional[TracebackType],
+    ) -> None:
+        self.close()
@@ -0,0 +1,216 @@
+"""Concurrent validation and header prefetch for file batch uploads.
+
+    from cuenca_validations.prefetch import prefetch_batch
+
+    batch = asyncio.run(prefetch_batch(data))
+    for file in batch.errors:
+        print(file.index, file.error)
+    request = batch.request  # FileBatchUploadRequest of the usable files
+
+Every entry of `files` is validated on its own and only the first bytes of
+each URL are downloaded, with a `Range` request, to sniff its format. The
+downloads run in a bounded thread pool that shares keep-alive connections
+per host. An invalid entry, a failed download or an unrecognized format
+is reported on that file instead of failing the whole batch.
+"""
+
+import asyncio
+import http.client
+import threading
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Optional
+from urllib.parse import urlsplit
+
+from pydantic import ValidationError
+
+from .types.enums import FileExtension
+from .types.files import SNIFF_LENGTH, sniff_extensions
+from .types.requests import FileBatchUploadRequest, FileRequest
+
+DEFAULT_CONCURRENCY = 16
+DEFAULT_TIMEOUT = 10.0
+
+Connection = http.client.HTTPConnection
+HostKey = tuple[str, str, Optional[int]]
+
+
+@dataclass(frozen=True)
+class FileHead:
+    status: int
+    content_type: Optional[str]
+    head: bytes
+
+
+class ConnectionPool:
+    """
+    Keep-alive HTTP connections per (scheme, host, port), each used by one
+    thread at a time. Connections are created on demand, so the number of
+    open connections per host is bounded by the number of threads.
+    """
+
+    def __init__(self, timeout: float = DEFAULT_TIMEOUT) -> None:
+        self.timeout = timeout
+        self._idle: dict[HostKey, list[Connection]] = defaultdict(list)
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def _acquire(self, key: HostKey) -> tuple[Connection, bool]:
+        with self._lock:
+            if self._idle[key]:
+                return self._idle[key].pop(), True
+        scheme, host, port = key
+        cls = (
+            http.client.HTTPSConnection
+            if scheme == 'https'
+            else http.client.HTTPConnection
+        )
+        return cls(host, port, timeout=self.timeout), False
+
+    def _release(self, key: HostKey, connection: Connection) -> None:
+        with self._lock:
+            if not self._closed:
+                self._idle[key].append(connection)
+                return
+        # a download that was still running when the pool was closed
+        connection.close()
+
+    def fetch_head(self, url: str, length: int = SNIFF_LENGTH) -> FileHead:
+        """First `length` bytes of `url`"""
+        parts = urlsplit(url)
+        key = (parts.scheme, parts.hostname or '', parts.port)
+        path = parts.path or '/'
+        if parts.query:
+            path = f'{path}?{parts.query}'
+        headers = {'Range': f'bytes=0-{length - 1}'}
+        while True:
+            connection, reused = self._acquire(key)
+            try:
+                connection.request('GET', path, headers=headers)
+                response = connection.getresponse()
+                head = response.read(length)
+            except (http.client.RemoteDisconnected, ConnectionResetError):
+                connection.close()
+                if reused:
+                    # the server closed the idle connection, retry on a
+                    # new one
+                    continue
+                raise
+            except BaseException:
+                connection.close()
+                raise
+            break
+        if response.isclosed():
+            self._release(key, connection)
+        else:
+            # the server ignored the Range header, don't read the rest
+            connection.close()
+        return FileHead(
+            response.status, response.getheader('Content-Type'), head
+        )
+
+    def close(self) -> None:
+        with self._lock:
+            self._closed = True
+            for connections in self._idle.values():
+                for connection in connections:
+                    connection.close()
+            self._idle.clear()
+
+
+@dataclass
+class FilePrefetch:
+    index: int
+    file: Optional[FileRequest] = None
+    extensions: frozenset[FileExtension] = frozenset()
+    content_type: Optional[str] = None
+    error: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+@dataclass
+class BatchPrefetch:
+    user_id: str
+    files: list[FilePrefetch] = field(default_factory=list)
+
+    @property
+    def errors(self) -> list[FilePrefetch]:
+        return [file for file in self.files if not file.ok]
+
+    @property
+    def request(self) -> FileBatchUploadRequest:
+        """The batch with only the files that were fetched successfully"""
+        return FileBatchUploadRequest(
+            user_id=self.user_id,
+            files=[file.file for file in self.files if file.ok and file.file],
+        )
+
+
+def _validate_file(index: int, data: Any) -> FilePrefetch:
+    try:
+        return FilePrefetch(index, FileRequest.model_validate(data))
+    except ValidationError as exc:
+        error = '; '.join(
+            f'{".".join(map(str, error["loc"]))}: {error["msg"]}'
+            for error in exc.errors(include_url=False)
+        )
+        return FilePrefetch(index, error=error)
+
+
+def _fetch(pool: ConnectionPool, prefetch: FilePrefetch) -> FilePrefetch:
+    assert prefetch.file is not None
+    try:
+        head = pool.fetch_head(str(prefetch.file.url))
+    except (OSError, http.client.HTTPException) as exc:
+        prefetch.error = f'Download failed: {exc!r}'
+        return prefetch
+    prefetch.content_type = head.content_type
+    if head.status not in (200, 206):
+        prefetch.error = f'Download failed with status {head.status}'
+        return prefetch
+    prefetch.extensions = sniff_extensions(head.head)
+    if not prefetch.extensions:
+        prefetch.error = 'Unrecognized file format'
+    return prefetch
+
+
+async def prefetch_batch(
+    data: dict,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    timeout: float = DEFAULT_TIMEOUT,
+) -> BatchPrefetch:
+    """
+    Validates each entry of a FileBatchUploadRequest payload, then fetches
+    the first bytes of the valid ones, at most `concurrency` at a time.
+    Only `user_id` being invalid fails the whole batch.
+    """
+    entries = data.get('files')
+    # anything but a list of entries fails like the request itself would
+    batch = FileBatchUploadRequest.model_validate(
+        dict(data, files=[]) if isinstance(entries, list) else data
+    )
+    files = [
+        _validate_file(index, entry)
+        for index, entry in enumerate(entries or [])
+    ]
+    loop = asyncio.get_running_loop()
+    pool = ConnectionPool(timeout)
+    executor = ThreadPoolExecutor(concurrency)
+    try:
+        await asyncio.gather(
+            *(
+                loop.run_in_executor(executor, _fetch, pool, file)
+                for file in files
+                if file.ok
+            )
+        )
+    finally:
+        # when cancelled, the event loop isn't blocked until the running
+        # downloads finish, and the pending ones are dropped
+        executor.shutdown(wait=False, cancel_futures=True)
+        pool.close()
+    return BatchPrefetch(batch.user_id, files)
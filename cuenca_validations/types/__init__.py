@@ -1,263 +1,330 @@
-__all__ = [
-    'AccountUseType',
-    'AccountQuery',
-    'Address',
-    'AgentQuery',
-    'AgentRequest',
-    'ApiKeyQuery',
-    'ApiKeyUpdateRequest',
-    'AuthorizerTransaction',
-    'BalanceEntryQuery',
-    'BankAccountValidationQuery',
-    'BankAccountValidationRequest',
-    'PostalCodeQuery',
-    'UsersTOSQuery',
-    'TOSQuery',
-    'BankAccountStatus',
-    'BatchFileMetadata',
-    'Beneficiary',
-    'BeneficiaryRequest',
-    'BillPaymentQuery',
-    'CardErrorType',
-    'CardFundingType',
-    'CardholderVerificationMethod',
-    'CardIssuer',
-    'CardNetwork',
-    'CardQuery',
-    'CardStatus',
-    'CardTransactionQuery',
-    'CardTransactionType',
-    'CardType',
-    'Country',
-    'Curp',
-    'CurpValidationRequest',
-    'CommissionType',
-    'DepositNetwork',
-    'DepositQuery',
-    'EcommerceIndicator',
-    'EndpointRequest',
-    'EndpointUpdateRequest',
-    'EntryType',
-    'EventQuery',
-    'EventType',
-    'FileExtension',
-    'FileFormat',
-    'FileQuery',
-    'FileBatchUploadRequest',
-    'FileRequest',
-    'FileUploadRequest',
-    'FraudFundsTransferRequest',
-    'Gender',
-    'IncomeType',
-    'IssuerNetwork',
-    'IdentityQuery',
-    'JSONEncoder',
-    'KYCFile',
-    'KYCFileType',
-    'KYCValidationRequest',
-    'KYCValidationSource',
-    'Language',
-    'LimitedWalletRequest',
-    'MonthlyMovementsType',
-    'MonthlySpendingType',
-    'PartnerRequest',
-    'PartnerUpdateRequest',
-    'PasswordResetRequest',
-    'PhoneNumber',
-    'PlatformRequest',
-    'PlatformType',
-    'PosCapability',
-    'Profession',
-    'QueryParams',
-    'Rfc',
-    'QuestionnairesRequest',
-    'SantizedDict',
-    'SATRegimeCode',
-    'SavingCategory',
-    'SavingRequest',
-    'SavingUpdateRequest',
-    'ServiceProviderCategory',
-    'SessionQuery',
-    'SessionRequest',
-    'SessionType',
-    'State',
-    'StatementQuery',
-    'StrictPaymentCardNumber',
-    'StrictPositiveInt',
-    'StrictTransferRequest',
-    'TermsOfService',
-    'TOSAgreement',
-    'TOSRequest',
-    'TrackDataMethod',
-    'TransactionQuery',
-    'TransactionStatus',
-    'TransferNetwork',
-    'TransferQuery',
-    'TransferRequest',
-    'UpdateTransferRequest',
-    'UserCardNotification',
-    'UserCredentialRequest',
-    'UserCredentialUpdateRequest',
-    'UserListsRequest',
-    'UserLoginRequest',
-    'UserQuery',
-    'UserUpdateRequest',
-    'UserRequest',
-    'UserStatus',
-    'UserType',
-    'VerificationAttemptRequest',
-    'VerificationErrors',
-    'VerificationRequest',
-    'VerificationStatus',
-    'VerificationType',
-    'WalletTransactionRequest',
-    'WalletTransactionType',
-    'WalletQuery',
-    'WalletTransactionQuery',
-    'WebhookEvent',
-    'digits',
-    'get_state_name',
-    'get_profession_name',
-    'get_income_type_name',
-    'get_account_use_type_name',
-    'get_monthly_movements_type_name',
-    'get_monthly_spending_type_name',
-    'uuid_field',
-    'LogConfig',
-]
+from importlib import import_module
+from typing import TYPE_CHECKING, Any
 
-from .card import StrictPaymentCardNumber
-from .enums import (
-    AccountUseType,
-    AuthorizerTransaction,
-    BankAccountStatus,
-    CardErrorType,
-    CardFundingType,
-    CardholderVerificationMethod,
-    CardIssuer,
-    CardNetwork,
-    CardStatus,
-    CardTransactionType,
-    CardType,
-    CommissionType,
-    Country,
-    DepositNetwork,
-    EcommerceIndicator,
-    EntryType,
-    EventType,
-    FileExtension,
-    FileFormat,
-    Gender,
-    IncomeType,
-    IssuerNetwork,
-    KYCFileType,
-    KYCValidationSource,
-    Language,
-    MonthlyMovementsType,
-    MonthlySpendingType,
-    PlatformType,
-    PosCapability,
-    Profession,
-    SATRegimeCode,
-    SavingCategory,
-    ServiceProviderCategory,
-    SessionType,
-    State,
-    TermsOfService,
-    TrackDataMethod,
-    TransactionStatus,
-    TransferNetwork,
-    UserCardNotification,
-    UserStatus,
-    UserType,
-    VerificationStatus,
-    VerificationType,
-    WalletTransactionType,
-    WebhookEvent,
-)
-from .files import BatchFileMetadata
-from .general import (
-    JSONEncoder,
-    LogConfig,
-    SantizedDict,
-    StrictPositiveInt,
-    digits,
-    get_account_use_type_name,
-    get_income_type_name,
-    get_monthly_movements_type_name,
-    get_monthly_spending_type_name,
-    get_profession_name,
-    get_state_name,
-)
-from .helpers import uuid_field
-from .identities import (
-    Address,
-    Beneficiary,
-    Curp,
-    KYCFile,
-    PhoneNumber,
-    Rfc,
-    TOSAgreement,
-    VerificationErrors,
-)
-from .queries import (
-    AccountQuery,
-    AgentQuery,
-    ApiKeyQuery,
-    BalanceEntryQuery,
-    BankAccountValidationQuery,
-    BillPaymentQuery,
-    CardQuery,
-    CardTransactionQuery,
-    DepositQuery,
-    EventQuery,
-    FileQuery,
-    IdentityQuery,
-    PostalCodeQuery,
-    QueryParams,
-    SessionQuery,
-    StatementQuery,
-    TOSQuery,
-    TransactionQuery,
-    TransferQuery,
-    UserQuery,
-    UsersTOSQuery,
-    WalletQuery,
-    WalletTransactionQuery,
-)
-from .requests import (
-    AgentRequest,
-    ApiKeyUpdateRequest,
-    BankAccountValidationRequest,
-    BeneficiaryRequest,
-    CurpValidationRequest,
-    EndpointRequest,
-    EndpointUpdateRequest,
-    FileBatchUploadRequest,
-    FileRequest,
-    FileUploadRequest,
-    FraudFundsTransferRequest,
-    KYCValidationRequest,
-    LimitedWalletRequest,
-    PartnerRequest,
-    PartnerUpdateRequest,
-    PasswordResetRequest,
-    PlatformRequest,
-    QuestionnairesRequest,
-    SavingRequest,
-    SavingUpdateRequest,
-    SessionRequest,
-    StrictTransferRequest,
-    TOSRequest,
-    TransferRequest,
-    UpdateTransferRequest,
-    UserCredentialRequest,
-    UserCredentialUpdateRequest,
-    UserListsRequest,
-    UserLoginRequest,
-    UserRequest,
-    UserUpdateRequest,
-    VerificationAttemptRequest,
-    VerificationRequest,
-    WalletTransactionRequest,
-)
+# Submodules are only imported the first time one of their names is
+# accessed, so importing the package doesn't build every model up front
+_LAZY_IMPORTS = {
+    'AccountNumber': 'accounts',
+    'StrictAccountNumber': 'accounts',
+    'StrictPaymentCardNumber': 'card',
+    'AccountNumberType': 'enums',
+    'AccountUseType': 'enums',
+    'AuthorizerTransaction': 'enums',
+    'BankAccountStatus': 'enums',
+    'CardErrorType': 'enums',
+    'CardFundingType': 'enums',
+    'CardholderVerificationMethod': 'enums',
+    'CardIssuer': 'enums',
+    'CardNetwork': 'enums',
+    'CardStatus': 'enums',
+    'CardTransactionType': 'enums',
+    'CardType': 'enums',
+    'CommissionType': 'enums',
+    'Country': 'enums',
+    'DepositNetwork': 'enums',
+    'EcommerceIndicator': 'enums',
+    'EntryType': 'enums',
+    'EventType': 'enums',
+    'FileExtension': 'enums',
+    'FileFormat': 'enums',
+    'Gender': 'enums',
+    'IncomeType': 'enums',
+    'IssuerNetwork': 'enums',
+    'KYCFileType': 'enums',
+    'KYCValidationSource': 'enums',
+    'Language': 'enums',
+    'MonthlyMovementsType': 'enums',
+    'MonthlySpendingType': 'enums',
+    'PlatformType': 'enums',
+    'PosCapability': 'enums',
+    'Profession': 'enums',
+    'SATRegimeCode': 'enums',
+    'SavingCategory': 'enums',
+    'ServiceProviderCategory': 'enums',
+    'SessionType': 'enums',
+    'State': 'enums',
+    'TermsOfService': 'enums',
+    'TrackDataMethod': 'enums',
+    'TransactionStatus': 'enums',
+    'TransferNetwork': 'enums',
+    'UserCardNotification': 'enums',
+    'UserStatus': 'enums',
+    'UserType': 'enums',
+    'VerificationStatus': 'enums',
+    'VerificationType': 'enums',
+    'WalletTransactionType': 'enums',
+    'WebhookEvent': 'enums',
+    'BatchFileMetadata': 'files',
+    'EnumCoercer': 'general',
+    'EnumLabels': 'general',
+    'JSONEncoder': 'general',
+    'LogConfig': 'general',
+    'account_use_type_labels': 'general',
+    'SantizedDict': 'general',
+    'StrictPositiveInt': 'general',
+    'digits': 'general',
+    'enum_coercer': 'general',
+    'get_account_use_type_name': 'general',
+    'get_income_type_name': 'general',
+    'get_monthly_movements_type_name': 'general',
+    'get_monthly_spending_type_name': 'general',
+    'get_profession_name': 'general',
+    'get_state_name': 'general',
+    'income_type_labels': 'general',
+    'lenient_enum': 'general',
+    'monthly_movements_type_labels': 'general',
+    'monthly_spending_type_labels': 'general',
+    'prebuild_models': 'general',
+    'profession_labels': 'general',
+    'state_labels': 'general',
+    'ParsedCurp': 'helpers',
+    'parse_curp': 'helpers',
+    'parse_curps': 'helpers',
+    'uuid_field': 'helpers',
+    'Address': 'identities',
+    'Beneficiary': 'identities',
+    'Curp': 'identities',
+    'KYCFile': 'identities',
+    'PhoneNumber': 'identities',
+    'Rfc': 'identities',
+    'TOSAgreement': 'identities',
+    'VerificationErrors': 'identities',
+    'AccountQuery': 'queries',
+    'AgentQuery': 'queries',
+    'ApiKeyQuery': 'queries',
+    'BalanceEntryQuery': 'queries',
+    'BankAccountValidationQuery': 'queries',
+    'BillPaymentQuery': 'queries',
+    'CardQuery': 'queries',
+    'CardTransactionQuery': 'queries',
+    'Cursor': 'queries',
+    'DepositQuery': 'queries',
+    'EventQuery': 'queries',
+    'FileQuery': 'queries',
+    'Filter': 'queries',
+    'IdentityQuery': 'queries',
+    'IdList': 'queries',
+    'id_list': 'queries',
+    'PostalCodeQuery': 'queries',
+    'QueryFilters': 'queries',
+    'QueryParams': 'queries',
+    'SessionQuery': 'queries',
+    'StatementQuery': 'queries',
+    'TOSQuery': 'queries',
+    'TransactionQuery': 'queries',
+    'TransferQuery': 'queries',
+    'UserQuery': 'queries',
+    'UsersTOSQuery': 'queries',
+    'WalletQuery': 'queries',
+    'WalletTransactionQuery': 'queries',
+    'AgentRequest': 'requests',
+    'ApiKeyUpdateRequest': 'requests',
+    'BankAccountValidationRequest': 'requests',
+    'BeneficiaryRequest': 'requests',
+    'CurpValidationRequest': 'requests',
+    'EndpointRequest': 'requests',
+    'EndpointUpdateRequest': 'requests',
+    'FileBatchUploadRequest': 'requests',
+    'FileRequest': 'requests',
+    'FileUploadRequest': 'requests',
+    'FraudFundsTransferRequest': 'requests',
+    'KYCValidationRequest': 'requests',
+    'LimitedWalletRequest': 'requests',
+    'PartnerRequest': 'requests',
+    'PartnerUpdateRequest': 'requests',
+    'PasswordResetRequest': 'requests',
+    'PlatformRequest': 'requests',
+    'QuestionnairesRequest': 'requests',
+    'SavingRequest': 'requests',
+    'SavingUpdateRequest': 'requests',
+    'SessionRequest': 'requests',
+    'StrictFileUploadRequest': 'requests',
+    'StrictTransferRequest': 'requests',
+    'TOSRequest': 'requests',
+    'TransferRequest': 'requests',
+    'UpdateTransferRequest': 'requests',
+    'UserCredentialRequest': 'requests',
+    'UserCredentialUpdateRequest': 'requests',
+    'UserListsRequest': 'requests',
+    'UserLoginRequest': 'requests',
+    'UserRequest': 'requests',
+    'UserUpdateRequest': 'requests',
+    'VerificationAttemptRequest': 'requests',
+    'VerificationRequest': 'requests',
+    'WalletTransactionRequest': 'requests',
+}
+__all__ = list(_LAZY_IMPORTS)
+
+
+def __getattr__(name: str) -> Any:
+    try:
+        module = _LAZY_IMPORTS[name]
+    except KeyError:
+        raise AttributeError(
+            f'module {__name__!r} has no attribute {name!r}'
+        ) from None
+    value = getattr(import_module(f'.{module}', __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted(set(globals()) | set(_LAZY_IMPORTS))
+
+
+# The same names as _LAZY_IMPORTS, which tests/test_imports.py checks
+if TYPE_CHECKING:
+    from .accounts import AccountNumber, StrictAccountNumber
+    from .card import StrictPaymentCardNumber
+    from .enums import (
+        AccountNumberType,
+        AccountUseType,
+        AuthorizerTransaction,
+        BankAccountStatus,
+        CardErrorType,
+        CardFundingType,
+        CardholderVerificationMethod,
+        CardIssuer,
+        CardNetwork,
+        CardStatus,
+        CardTransactionType,
+        CardType,
+        CommissionType,
+        Country,
+        DepositNetwork,
+        EcommerceIndicator,
+        EntryType,
+        EventType,
+        FileExtension,
+        FileFormat,
+        Gender,
+        IncomeType,
+        IssuerNetwork,
+        KYCFileType,
+        KYCValidationSource,
+        Language,
+        MonthlyMovementsType,
+        MonthlySpendingType,
+        PlatformType,
+        PosCapability,
+        Profession,
+        SATRegimeCode,
+        SavingCategory,
+        ServiceProviderCategory,
+        SessionType,
+        State,
+        TermsOfService,
+        TrackDataMethod,
+        TransactionStatus,
+        TransferNetwork,
+        UserCardNotification,
+        UserStatus,
+        UserType,
+        VerificationStatus,
+        VerificationType,
+        WalletTransactionType,
+        WebhookEvent,
+    )
+    from .files import BatchFileMetadata
+    from .general import (
+        EnumCoercer,
+        EnumLabels,
+        JSONEncoder,
+        LogConfig,
+        SantizedDict,
+        StrictPositiveInt,
+        account_use_type_labels,
+        digits,
+        enum_coercer,
+        get_account_use_type_name,
+        get_income_type_name,
+        get_monthly_movements_type_name,
+        get_monthly_spending_type_name,
+        get_profession_name,
+        get_state_name,
+        income_type_labels,
+        lenient_enum,
+        monthly_movements_type_labels,
+        monthly_spending_type_labels,
+        prebuild_models,
+        profession_labels,
+        state_labels,
+    )
+    from .helpers import ParsedCurp, parse_curp, parse_curps, uuid_field
+    from .identities import (
+        Address,
+        Beneficiary,
+        Curp,
+        KYCFile,
+        PhoneNumber,
+        Rfc,
+        TOSAgreement,
+        VerificationErrors,
+    )
+    from .queries import (
+        AccountQuery,
+        AgentQuery,
+        ApiKeyQuery,
+        BalanceEntryQuery,
+        BankAccountValidationQuery,
+        BillPaymentQuery,
+        CardQuery,
+        CardTransactionQuery,
+        Cursor,
+        DepositQuery,
+        EventQuery,
+        FileQuery,
+        Filter,
+        IdentityQuery,
+        IdList,
+        PostalCodeQuery,
+        QueryFilters,
+        QueryParams,
+        SessionQuery,
+        StatementQuery,
+        TOSQuery,
+        TransactionQuery,
+        TransferQuery,
+        UserQuery,
+        UsersTOSQuery,
+        WalletQuery,
+        WalletTransactionQuery,
+        id_list,
+    )
+    from .requests import (
+        AgentRequest,
+        ApiKeyUpdateRequest,
+        BankAccountValidationRequest,
+        BeneficiaryRequest,
+        CurpValidationRequest,
+        EndpointRequest,
+        EndpointUpdateRequest,
+        FileBatchUploadRequest,
+        FileRequest,
+        FileUploadRequest,
+        FraudFundsTransferRequest,
+        KYCValidationRequest,
+        LimitedWalletRequest,
+        PartnerRequest,
+        PartnerUpdateRequest,
+        PasswordResetRequest,
+        PlatformRequest,
+        QuestionnairesRequest,
+        SavingRequest,
+        SavingUpdateRequest,
+        SessionRequest,
+        StrictFileUploadRequest,
+        StrictTransferRequest,
+        TOSRequest,
+        TransferRequest,
+        UpdateTransferRequest,
+        UserCredentialRequest,
+        UserCredentialUpdateRequest,
+        UserListsRequest,
+        UserLoginRequest,
+        UserRequest,
+        UserUpdateRequest,
+        VerificationAttemptRequest,
+        VerificationRequest,
+        WalletTransactionRequest,
+    )
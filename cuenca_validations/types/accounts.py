@@ -0,0 +1,190 @@
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Annotated, Any, ClassVar, Optional, Union
+
+from clabe import BANKS, Clabe
+from clabe.types import CLABE_LENGTH
+from pydantic import GetCoreSchemaHandler, ValidatorFunctionWrapHandler
+from pydantic_core import PydanticCustomError, core_schema
+from pydantic_extra_types.payment import PaymentCardNumber
+
+from .card import CARD_BIN_INDEX, StrictPaymentCardNumber, validate_bin
+from .enums import AccountNumberType
+
+CACHE_SIZE = 4096
+
+DIGITS = b'0123456789'
+DIGIT_VALUES = bytes.maketrans(DIGITS, bytes(range(10)))
+# ASCII digit -> its value times each weight of the Clabe control digit,
+# modulo 10
+CLABE_WEIGHTS = [
+    bytes.maketrans(DIGITS, bytes(digit * weight % 10 for digit in range(10)))
+    for weight in (3, 7, 1)
+]
+# ASCII digit -> sum of the digits of twice its value, for the Luhn check
+LUHN_DOUBLED = bytes.maketrans(
+    DIGITS, bytes(sum(divmod(2 * digit, 10)) for digit in range(10))
+)
+
+
+def _is_digits(number: str) -> bool:
+    return number.isascii() and number.isdigit()
+
+
+def clabe_control_digit(clabe: str) -> int:
+    """
+    Control digit of the first 17 digits of a Clabe, which must be ASCII
+    digits. Weights repeat every 3 digits, so each slice is weighted with
+    a single translate and summed over the bytes.
+    """
+    digits = clabe.encode()
+    total = sum(
+        sum(digits[start:17:3].translate(table))
+        for start, table in enumerate(CLABE_WEIGHTS)
+    )
+    return -total % 10
+
+
+def luhn_valid(number: str) -> bool:
+    """Luhn check of a number of ASCII digits"""
+    digits = number.encode()[::-1]
+    total = sum(digits[::2].translate(DIGIT_VALUES)) + sum(
+        digits[1::2].translate(LUHN_DOUBLED)
+    )
+    return total % 10 == 0
+
+
+class ClabeAccountNumber(Clabe):
+    kind: ClassVar[AccountNumberType] = AccountNumberType.clabe
+
+    @classmethod
+    def validate(cls, clabe: str) -> 'ClabeAccountNumber':
+        """Same checks and errors as `Clabe`, with table lookups"""
+        if not _is_digits(clabe):
+            raise PydanticCustomError('clabe', 'debe ser numérico')
+        if clabe[:3] not in BANKS:
+            raise PydanticCustomError(
+                'clabe.bank_code', 'código de banco no es válido'
+            )
+        if int(clabe[17]) != clabe_control_digit(clabe):
+            raise PydanticCustomError(
+                'clabe.control_digit', 'clabe dígito de control no es válido'
+            )
+        return cls(clabe)
+
+
+class CardAccountNumber(PaymentCardNumber):
+    kind: ClassVar[AccountNumberType] = AccountNumberType.card
+
+    @classmethod
+    def validate_digits(cls, card_number: str) -> None:
+        if not _is_digits(card_number):
+            raise PydanticCustomError(
+                'payment_card_number_digits', 'Card number is not all digits'
+            )
+
+    @classmethod
+    def validate_luhn_check_digit(cls, card_number: str) -> str:
+        if not luhn_valid(card_number):
+            raise PydanticCustomError(
+                'payment_card_number_luhn', 'Card number is not luhn valid'
+            )
+        return card_number
+
+    @property
+    def bank_code(self) -> Optional[str]:
+        """Bank code of the card's BIN, None if the BIN isn't known"""
+        return CARD_BIN_INDEX.lookup(self)
+
+
+class StrictCardAccountNumber(CardAccountNumber, StrictPaymentCardNumber):
+    """Card number from a known bank, as returned by `StrictAccountNumber`"""
+
+    @property
+    def bank_code(self) -> str:
+        # skips CardAccountNumber's, which returns None for unknown BINs
+        return super(CardAccountNumber, self).bank_code
+
+
+AccountNumberValue = Union[ClabeAccountNumber, CardAccountNumber]
+
+
+def _card_number(number: str, strict: bool) -> CardAccountNumber:
+    if not strict:
+        return CardAccountNumber(number)
+    card = StrictCardAccountNumber(number)
+    validate_bin(card)
+    return card
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def parse_account_number(
+    number: str, strict: bool = False
+) -> AccountNumberValue:
+    """
+    Routes on length so only one validator runs for most numbers: 18
+    digits is a Clabe, falling back to a card number if it isn't a valid
+    one, and anything else is a card number. `strict` requires the card
+    BIN to belong to a known bank. Valid numbers are cached, so accounts
+    repeated in a batch are validated once.
+    """
+    if not (
+        PaymentCardNumber.min_length
+        <= len(number)
+        <= PaymentCardNumber.max_length
+    ):
+        raise PydanticCustomError(
+            'account_number_length', 'must have 12 to 19 digits'
+        )
+    if len(number) != CLABE_LENGTH:
+        return _card_number(number, strict)
+    try:
+        return ClabeAccountNumber.validate(number)
+    except PydanticCustomError as exc:
+        clabe_error = exc
+    try:
+        return _card_number(number, strict)
+    except PydanticCustomError:
+        raise clabe_error
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def is_valid_account_number(number: str, strict: bool = False) -> bool:
+    try:
+        parse_account_number(number, strict)
+    except PydanticCustomError:
+        return False
+    return True
+
+
+@dataclass(frozen=True)
+class AccountNumberSchema:
+    strict: bool = False
+
+    def __get_pydantic_core_schema__(
+        self, _source_type: Any, handler: GetCoreSchemaHandler
+    ) -> core_schema.CoreSchema:
+        # the Clabe or card union is only run for invalid numbers, so the
+        # JSON schema and the errors are the same as before
+        card = StrictPaymentCardNumber if self.strict else PaymentCardNumber
+        return core_schema.no_info_wrap_validator_function(
+            self.validate, handler.generate_schema(Union[Clabe, card])
+        )
+
+    def validate(
+        self, value: Any, handler: ValidatorFunctionWrapHandler
+    ) -> AccountNumberValue:
+        if isinstance(value, str):
+            try:
+                return parse_account_number(value.strip(), self.strict)
+            except PydanticCustomError:
+                pass
+        return handler(value)
+
+
+# Clabe or card number, validated by only one of them
+AccountNumber = Annotated[AccountNumberValue, AccountNumberSchema()]
+# Same, with card numbers from a known bank
+StrictAccountNumber = Annotated[
+    AccountNumberValue, AccountNumberSchema(strict=True)
+]
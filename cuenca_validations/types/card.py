@@ -1,4 +1,6 @@
-from typing import Annotated
+import heapq
+from bisect import bisect_right
+from typing import Annotated, Iterable, Mapping, Optional
 
 from pydantic import Field, StringConstraints
 from pydantic_core import PydanticCustomError, core_schema
@@ -18,6 +20,107 @@ Cvv = Annotated[
     ),
 ]
 
+BIN_MAX_LENGTH = 8
+
+
+class BinIndex:
+    """BIN lookup table built once from prefixes and prefix ranges.
+
+    Every entry is expanded to an integer interval over the first
+    `BIN_MAX_LENGTH` digits of a card number, so 6 and 8 digit BINs and
+    ranges such as ('506099', '506198') live in the same structure. Nested
+    entries are flattened into disjoint segments that keep the most
+    specific bank code, which turns a longest-prefix lookup into one
+    `bisect` over the segment starts. Lookups return the stored bank code
+    object itself.
+    """
+
+    __slots__ = ('_starts', '_ends', '_codes')
+
+    def __init__(
+        self,
+        bins: Mapping[str, str],
+        ranges: Iterable[tuple[str, str, str]] = (),
+    ):
+        intervals = [self._interval(b, b, code) for b, code in bins.items()]
+        intervals += [self._interval(*entry) for entry in ranges]
+        self._starts: list[int] = []
+        self._ends: list[int] = []
+        self._codes: list[str] = []
+        intervals.sort()
+        points = sorted(
+            {start for start, _, _ in intervals}
+            | {end + 1 for _, end, _ in intervals}
+        )
+        active: list[tuple[int, int, str]] = []  # (width, end, code)
+        pending = 0
+        for start, end in zip(points, points[1:]):
+            while pending < len(intervals) and intervals[pending][0] == start:
+                low, high, code = intervals[pending]
+                heapq.heappush(active, (high - low, high, code))
+                pending += 1
+            while active and active[0][1] < start:
+                heapq.heappop(active)
+            if not active:
+                continue
+            code = active[0][2]
+            if (
+                self._ends
+                and self._ends[-1] == start - 1
+                and self._codes[-1] == code
+            ):
+                self._ends[-1] = end - 1
+                continue
+            self._starts.append(start)
+            self._ends.append(end - 1)
+            self._codes.append(code)
+
+    @staticmethod
+    def _interval(low: str, high: str, code: str) -> tuple[int, int, str]:
+        if (
+            len(low) != len(high)
+            or not low.isdigit()
+            or not high.isdigit()
+            or len(low) > BIN_MAX_LENGTH
+            or low > high
+        ):
+            raise ValueError(f'Invalid BIN range: {low}-{high}')
+        scale = 10 ** (BIN_MAX_LENGTH - len(low))
+        return int(low) * scale, (int(high) + 1) * scale - 1, code
+
+    def __len__(self) -> int:
+        return len(self._starts)
+
+    def lookup(self, number: str) -> Optional[str]:
+        """Bank code of the most specific BIN matching `number`"""
+        prefix = number[:BIN_MAX_LENGTH]
+        # int() also takes signs, underscores, spaces and non-ASCII digits
+        if not (prefix.isascii() and prefix.isdigit()):
+            return None
+        key = int(prefix.ljust(BIN_MAX_LENGTH, '0'))
+        position = bisect_right(self._starts, key) - 1
+        if position >= 0 and key <= self._ends[position]:
+            return self._codes[position]
+        return None
+
+    def lookup_many(self, numbers: Iterable[str]) -> list[Optional[str]]:
+        """Bulk version of `lookup` for settlement-size inputs"""
+        return list(map(self.lookup, numbers))
+
+
+CARD_BIN_INDEX = BinIndex(CARD_BINS)
+
+
+def validate_bin(card_number: str) -> None:
+    if CARD_BIN_INDEX.lookup(card_number) is None:
+        raise PydanticCustomError(
+            'payment_card_number.bin',
+            'The card number contains a BIN (first six digits) that '
+            'does not have a known association with a Mexican bank. '
+            'To add the association, please file an issue: '
+            'https://github.com/cuenca-mx/cuenca-validations/issues',
+        )
+
 
 class StrictPaymentCardNumber(PaymentCardNumber):
 
@@ -26,16 +129,12 @@ class StrictPaymentCardNumber(PaymentCardNumber):
         cls, card_number: str, validation_info: core_schema.ValidationInfo
     ) -> 'StrictPaymentCardNumber':
         card = super().validate(card_number, validation_info)
-        if card.bin not in CARD_BINS:
-            raise PydanticCustomError(
-                'payment_card_number.bin',
-                'The card number contains a BIN (first six digits) that '
-                'does not have a known association with a Mexican bank. '
-                'To add the association, please file an issue: '
-                'https://github.com/cuenca-mx/cuenca-validations/issues',
-            )
+        validate_bin(card)
         return cls(card)
 
     @property
     def bank_code(self) -> str:
-        return CARD_BINS[self.bin]
+        bank_code = CARD_BIN_INDEX.lookup(self)
+        if bank_code is None:
+            raise KeyError(self.bin)
+        return bank_code
@@ -84,6 +84,11 @@ class TransferNetwork(str, Enum):
     spei = 'spei'
 
 
+class AccountNumberType(str, Enum):
+    clabe = 'clabe'
+    card = 'card'
+
+
 class CommissionType(str, Enum):
     card_request = 'card_request'
     cash_deposit = 'cash_deposit'
@@ -1,13 +1,139 @@
-from typing import Optional
+import io
+import math
+from typing import Annotated, Any, Optional
 
-from pydantic import BaseModel
+from pydantic import PlainSerializer, PlainValidator, WithJsonSchema
 
-from .enums import KYCFileType
-from .general import SerializableHttpUrl
+from ..validators import is_binary_file, is_bytes_like
+from .enums import FileExtension, KYCFileType
+from .general import DeferrableModel, SerializableHttpUrl
 
+# Size limit of StrictFileUploadRequest
+MAX_FILE_SIZE = 20 * 1024 * 1024
+SNIFF_LENGTH = 32
 
-class BatchFileMetadata(BaseModel):
+ISO_MEDIA_EXTENSIONS = frozenset(
+    {FileExtension.mp4, FileExtension.mov, FileExtension.v_3gpp}
+)
+FILE_SIGNATURES = [
+    (b'\xff\xd8\xff', frozenset({FileExtension.jpg, FileExtension.jpeg})),
+    (b'\x89PNG\r\n\x1a\n', frozenset({FileExtension.png})),
+    (b'%PDF-', frozenset({FileExtension.pdf})),
+]
+HTML_SIGNATURES = (b'<!doctype html', b'<html')
+
+
+class BatchFileMetadata(DeferrableModel):
     id: Optional[str] = None
     is_back: bool
     type: KYCFileType
     url: SerializableHttpUrl
+
+
+def sniff_extensions(head: bytes) -> frozenset[FileExtension]:
+    """
+    Extensions that match the magic bytes at the start of a file, empty
+    when the format isn't recognized
+    """
+    for signature, extensions in FILE_SIGNATURES:
+        if head.startswith(signature):
+            return extensions
+    if head[4:8] == b'ftyp':
+        # mp4, mov and 3gpp share the ISO media container
+        return ISO_MEDIA_EXTENSIONS
+    if head.lstrip(b'\xef\xbb\xbf \t\r\n').lower().startswith(HTML_SIGNATURES):
+        return frozenset({FileExtension.html})
+    return frozenset()
+
+
+def read_head(content: Any, length: int = SNIFF_LENGTH) -> bytes:
+    """
+    First `length` bytes of a bytes-like object or a seekable binary file,
+    leaving the file position where it was
+    """
+    if not is_binary_file(content):
+        with memoryview(content) as view, view.cast('B') as octets:
+            return octets[:length].tobytes()
+    position = content.tell()
+    try:
+        return content.read(length)
+    finally:
+        content.seek(position)
+
+
+def _file_size(content: Any) -> int:
+    if not is_binary_file(content):
+        with memoryview(content) as view:
+            if not view.c_contiguous:
+                raise ValueError('file memoryview must be contiguous')
+            return view.nbytes
+    if not content.seekable():
+        raise ValueError('file must be seekable')
+    position = content.tell()
+    try:
+        return content.seek(0, io.SEEK_END) - position
+    finally:
+        content.seek(position)
+
+
+def _read(content: Any) -> Any:
+    if not is_binary_file(content):
+        return content
+    position = content.tell()
+    try:
+        return content.read()
+    finally:
+        content.seek(position)
+
+
+def validate_file_content(value: Any, max_size: Optional[int] = None) -> Any:
+    """
+    Accepts bytes, base64 str, bytes-like objects (bytearray, memoryview,
+    mmap, array) and seekable binary files as they are, without copying
+    them. Text streams are rejected, since their content can't be encoded
+    as bytes. With `max_size`, larger files are rejected.
+    """
+    if isinstance(value, str):
+        # the same content as a base64 str
+        if max_size is not None and len(value) > 4 * math.ceil(max_size / 3):
+            raise ValueError(f'file is larger than {max_size} bytes')
+        return value
+    if not is_bytes_like(value) and not is_binary_file(value):
+        raise ValueError(
+            'file must be bytes, str, a bytes-like object or a binary file'
+        )
+    size = _file_size(value)
+    if max_size is not None and size > max_size:
+        raise ValueError(f'file is larger than {max_size} bytes')
+    return value
+
+
+def _serialize_file_content(value: Any) -> str:
+    # as UTF-8 text, like pydantic's bytes
+    if isinstance(value, str):
+        return value
+    return str(_read(value), 'utf-8')
+
+
+def file_content(max_size: Optional[int] = None) -> Any:
+    """`FileContent` that rejects files larger than `max_size` bytes"""
+
+    def validate(value: Any) -> Any:
+        return validate_file_content(value, max_size)
+
+    return Annotated[
+        Any,
+        PlainValidator(validate),
+        PlainSerializer(_serialize_file_content, when_used='json'),
+        WithJsonSchema(
+            {
+                'anyOf': [
+                    {'type': 'string', 'format': 'binary'},
+                    {'type': 'string'},
+                ]
+            }
+        ),
+    ]
+
+
+FileContent = file_content()
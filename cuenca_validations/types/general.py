@@ -1,10 +1,30 @@
+import copy
+import io
 import json
+import os
+import re
+from collections.abc import Iterator
 from dataclasses import dataclass
-from typing import Annotated, Any, Optional
+from enum import Enum
+from functools import lru_cache
+from typing import (
+    IO,
+    Annotated,
+    Any,
+    Generic,
+    Iterable,
+    Mapping,
+    Optional,
+    TypeVar,
+    Union,
+)
 
 from pydantic import (
     AfterValidator,
     AnyUrl,
+    BaseModel,
+    BeforeValidator,
+    ConfigDict,
     Field,
     HttpUrl,
     IPvAnyAddress,
@@ -12,7 +32,16 @@ from pydantic import (
     StringConstraints,
 )
 
-from ..validators import normalize_name, sanitize_dict, sanitize_item
+from ..validators import (
+    PASSTHROUGH_TYPES,
+    cached_normalize_name,
+    is_binary_file,
+    is_bytes_like,
+    iter_base64,
+    normalize_name,
+    sanitize_dict,
+    sanitize_item,
+)
 from .enums import (
     AccountUseType,
     IncomeType,
@@ -22,6 +51,21 @@ from .enums import (
     State,
 )
 
+# Opt-in to build each model's validator on first use instead of when the
+# class is defined, for processes that only use a few of the models
+DEFER_BUILD = os.environ.get('CUENCA_VALIDATIONS_DEFER_BUILD', '').lower() in {
+    '1',
+    'true',
+    'yes',
+}
+
+
+class DeferrableModel(BaseModel):
+    """Base of the root models, so they all follow `DEFER_BUILD`"""
+
+    model_config = ConfigDict(defer_build=DEFER_BUILD)
+
+
 # We use custom serializers for IP addresses and URLs because
 # Pydantic's IPvAnyAddress, AnyUrl, HttpUrl types are not JSON serializable.
 SerializableHttpUrl = Annotated[HttpUrl, PlainSerializer(str, return_type=str)]
@@ -47,9 +91,182 @@ class SantizedDict(dict):
         sanitize_dict(self)
 
 
+STREAM_CHUNK_SIZE = 64 * 1024
+# Flat lists longer than this are encoded in slices of this many items
+STREAM_SLICE_LENGTH = 1000
+
+
 class JSONEncoder(json.JSONEncoder):
     def default(self, o):
-        return sanitize_item(o, default=super().default)
+        sanitized = sanitize_item(o, default=super().default)
+        # sanitized sets are still sets, which JSON only has as arrays
+        if isinstance(sanitized, (set, frozenset)):
+            return list(sanitized)
+        return sanitized
+
+    def stream(
+        self, o: Any, chunk_size: int = STREAM_CHUNK_SIZE
+    ) -> Iterator[str]:
+        """Encode `o` lazily, yielding chunks of about `chunk_size` chars.
+
+        The joined chunks are the same as `self.encode(o)`, with iterators
+        (e.g. generators of rows) encoded as JSON arrays. Dicts and lists
+        whose values are all scalars go through the C encoder in one go,
+        or in slices when they are long, so memory stays bounded by the
+        largest flat item rather than the whole document. With `indent`,
+        the output goes through `iterencode` and each iterator is read into
+        a list when it's reached.
+        """
+        if self.indent is not None:
+            pieces: Iterator[str] = self._iterencode_iterators(o)
+        else:
+            pieces = self._stream(o, set() if self.check_circular else None)
+        buffer: list[str] = []
+        size = 0
+        for piece in pieces:
+            buffer.append(piece)
+            size += len(piece)
+            if size >= chunk_size:
+                yield ''.join(buffer)
+                buffer.clear()
+                size = 0
+        if buffer:
+            yield ''.join(buffer)
+
+    def stream_to(
+        self, o: Any, fp: IO, chunk_size: int = STREAM_CHUNK_SIZE
+    ) -> None:
+        """Write `self.stream(o)` to a text or binary file-like object"""
+        text = isinstance(fp, io.TextIOBase)
+        for chunk in self.stream(o, chunk_size):
+            fp.write(chunk if text else chunk.encode('utf-8'))
+
+    def _iterencode_iterators(self, o: Any) -> Iterator[str]:
+        encoder = copy.copy(self)
+        default = self.default
+        encoder.default = lambda value: (  # type: ignore[method-assign]
+            list(value) if isinstance(value, Iterator) else default(value)
+        )
+        return encoder.iterencode(o)
+
+    def _stream(self, o: Any, markers: Optional[set[int]]) -> Iterator[str]:
+        if _is_binary(o):
+            yield '"'
+            yield from iter_base64(o)
+            yield '"'
+            return
+        is_dict = isinstance(o, dict)
+        if not is_dict and not isinstance(o, (list, tuple, Iterator)):
+            yield self.encode(o)
+            return
+        if markers is not None:
+            if id(o) in markers:
+                raise ValueError('Circular reference detected')
+            markers.add(id(o))
+        if is_dict:
+            yield from self._stream_dict(o, markers)
+        else:
+            yield from self._stream_list(o, markers)
+        if markers is not None:
+            markers.remove(id(o))
+
+    def _stream_dict(
+        self, o: dict, markers: Optional[set[int]]
+    ) -> Iterator[str]:
+        if len(o) <= STREAM_SLICE_LENGTH and _is_flat(o.values()):
+            yield self.encode(o)
+            return
+        yield '{'
+        first = True
+        for key, value in sorted(o.items()) if self.sort_keys else o.items():
+            if isinstance(key, str):
+                pass
+            elif isinstance(key, (int, float)) or key is None:
+                key = self.encode(key)
+            elif self.skipkeys:
+                continue
+            else:
+                raise TypeError(
+                    f'keys must be str, int, float, bool or None, '
+                    f'not {key.__class__.__name__}'
+                )
+            if not first:
+                yield self.item_separator
+            first = False
+            yield self.encode(key)
+            yield self.key_separator
+            yield from self._stream(value, markers)
+        yield '}'
+
+    def _stream_list(
+        self, o: Iterable, markers: Optional[set[int]]
+    ) -> Iterator[str]:
+        # Runs of scalars and flat containers are encoded together, one
+        # `encode` call per slice instead of one per item
+        yield '['
+        batch: list[Any] = []
+        first = True
+        for item in o:
+            flat = _is_flat_item(item)
+            if flat:
+                batch.append(item)
+                if len(batch) < STREAM_SLICE_LENGTH:
+                    continue
+            if batch:
+                if not first:
+                    yield self.item_separator
+                first = False
+                yield self.encode(batch)[1:-1]
+                batch.clear()
+            if not flat:
+                if not first:
+                    yield self.item_separator
+                first = False
+                yield from self._stream(item, markers)
+        if batch:
+            if not first:
+                yield self.item_separator
+            yield self.encode(batch)[1:-1]
+        yield ']'
+
+
+def _is_flat_item(item: Any) -> bool:
+    if isinstance(item, dict):
+        values: Iterable = item.values()
+    elif isinstance(item, (list, tuple)):
+        values = item
+    else:
+        return not isinstance(item, Iterator) and not _is_binary(item)
+    return len(item) <= STREAM_SLICE_LENGTH and _is_flat(values)
+
+
+def _is_flat(values: Iterable) -> bool:
+    for value in values:
+        value_type = type(value)
+        if value_type in PASSTHROUGH_TYPES:
+            continue
+        if _is_binary(value) or isinstance(
+            value, (dict, list, tuple, Iterator)
+        ):
+            return False
+    return True
+
+
+def _is_binary(value: Any) -> bool:
+    """Files and large binary values, streamed as base64 in chunks"""
+    if is_bytes_like(value):
+        with memoryview(value) as view:
+            return view.nbytes > STREAM_CHUNK_SIZE
+    return is_binary_file(value)
+
+
+def prebuild_models(*models: type[BaseModel]) -> None:
+    """Build the validators of models with a deferred build ahead of their
+    first use, e.g. at startup for the models a service actually handles.
+    Already built models are left untouched.
+    """
+    for model in models:
+        model.model_rebuild()
 
 
 MAX_VALUE_IN_DB = 21_474_836_47
@@ -73,6 +290,139 @@ def digits(
     ]
 
 
+E = TypeVar('E', bound=Enum)
+
+
+class EnumLabels(Generic[E]):
+    """
+    Human readable labels for every member of an enum. Each member also gets
+    its label as a `label` attribute, and members can be looked up from
+    their label or value regardless of accents, case and spacing.
+    """
+
+    def __init__(self, enum: type[E], labels: Mapping[E, str]) -> None:
+        missing = [member.name for member in enum if member not in labels]
+        if missing:
+            raise ValueError(f'Missing {enum.__name__} labels: {missing}')
+        self.enum = enum
+        self.labels: dict[Any, str] = {
+            **{member.value: labels[member] for member in enum},
+            **labels,
+        }
+        self._members: dict[str, E] = {}
+        for member in enum:
+            setattr(member, 'label', labels[member])
+            for text in (labels[member], str(member.value)):
+                key = normalize_name(text)
+                if self._members.setdefault(key, member) is not member:
+                    raise ValueError(
+                        f'{text!r} matches more than one {enum.__name__}'
+                    )
+
+    def __getitem__(self, member: Union[E, str]) -> str:
+        return self.labels[member]
+
+    def lookup(self, text: str) -> E:
+        try:
+            return self._members[cached_normalize_name(text)]
+        except KeyError:
+            raise ValueError(
+                f'{text!r} is not a valid {self.enum.__name__}'
+            ) from None
+
+    def lookup_many(self, texts: Iterable[str]) -> list[E]:
+        return list(map(self.lookup, texts))
+
+    def labels_for(self, members: Iterable[Union[E, str]]) -> list[str]:
+        """Labels for many members or member values at once"""
+        return list(map(self.labels.__getitem__, members))
+
+
+ENUM_SEPARATORS = re.compile(r'[\s_-]+')
+
+
+@lru_cache(maxsize=4096)
+def _fold_enum_value(value: str) -> str:
+    return ENUM_SEPARATORS.sub('_', value.strip()).casefold()
+
+
+class EnumCoercer(Generic[E]):
+    """
+    Maps raw values to the members of an enum through a precomputed table.
+    Lenient lookups also match member names and `aliases`, ignoring case,
+    surrounding spaces and `-`, `_` or space separators, e.g. 'SUCCEEDED'
+    or 'not set'.
+    """
+
+    def __init__(
+        self, enum: type[E], aliases: Optional[Mapping[str, E]] = None
+    ) -> None:
+        self.enum = enum
+        self.values: dict[Any, E] = {member.value: member for member in enum}
+        self.folded: dict[str, E] = {}
+        keys = [
+            (str(key), member)
+            for member in enum
+            for key in (member.value, member.name)
+        ]
+        keys += (aliases or {}).items()
+        for key, member in keys:
+            folded = _fold_enum_value(key)
+            if self.folded.setdefault(folded, member) is not member:
+                raise ValueError(
+                    f'{key!r} matches more than one {enum.__name__}'
+                )
+
+    def lookup(self, value: Any, lenient: bool = False) -> Optional[E]:
+        try:
+            return self.values[value]
+        except (KeyError, TypeError):
+            pass
+        if lenient and isinstance(value, str):
+            return self.folded.get(_fold_enum_value(value))
+        return None
+
+    def coerce(self, value: Any, lenient: bool = False) -> E:
+        member = self.lookup(value, lenient)
+        if member is None:
+            raise ValueError(f'{value!r} is not a valid {self.enum.__name__}')
+        return member
+
+    def coerce_many(
+        self, values: Iterable[Any], lenient: bool = False
+    ) -> list[E]:
+        if not isinstance(values, (list, tuple)):
+            values = list(values)
+        values_table = self.values
+        try:
+            # all exact values, the common case, in a single pass
+            return [values_table[value] for value in values]
+        except (KeyError, TypeError):
+            return [self.coerce(value, lenient) for value in values]
+
+
+@lru_cache(maxsize=None)
+def enum_coercer(enum: type[E]) -> EnumCoercer[E]:
+    """Shared coercer for `enum`, built on first use"""
+    return EnumCoercer(enum)
+
+
+def lenient_enum(
+    enum: type[E], aliases: Optional[Mapping[str, E]] = None
+) -> Any:
+    """
+    `enum` field type that also accepts values in any case, member names and
+    `aliases`. Anything else is left to pydantic, so errors don't change.
+    """
+    coercer = EnumCoercer(enum, aliases) if aliases else enum_coercer(enum)
+
+    def coerce(value: Any) -> Any:
+        member = coercer.lookup(value, lenient=True)
+        return value if member is None else member
+
+    return Annotated[enum, BeforeValidator(coerce)]
+
+
 names_state = {
     State.NE: 'Nacido en el Extranjero',
     State.AS: 'Aguascalientes',
@@ -110,6 +460,9 @@ names_state = {
 }
 
 
+state_labels = EnumLabels(State, names_state)
+
+
 def get_state_name(state: State) -> str:
     return names_state[state]
 
@@ -132,6 +485,9 @@ names_professions = {
 }
 
 
+profession_labels = EnumLabels(Profession, names_professions)
+
+
 def get_profession_name(profession: Profession) -> str:
     return names_professions[profession]
 
@@ -148,6 +504,9 @@ names_account_use_types = {
 }
 
 
+account_use_type_labels = EnumLabels(AccountUseType, names_account_use_types)
+
+
 def get_account_use_type_name(account_use_type: AccountUseType) -> str:
     return names_account_use_types[account_use_type]
 
@@ -160,6 +519,11 @@ names_monthly_movements_types = {
 }
 
 
+monthly_movements_type_labels = EnumLabels(
+    MonthlyMovementsType, names_monthly_movements_types
+)
+
+
 def get_monthly_movements_type_name(
     monthly_movements_type: MonthlyMovementsType,
 ) -> str:
@@ -176,6 +540,11 @@ names_monthly_spending_types = {
 }
 
 
+monthly_spending_type_labels = EnumLabels(
+    MonthlySpendingType, names_monthly_spending_types
+)
+
+
 def get_monthly_spending_type_name(
     monthly_spending_type: MonthlySpendingType,
 ) -> str:
@@ -190,6 +559,9 @@ names_income_types = {
 }
 
 
+income_type_labels = EnumLabels(IncomeType, names_income_types)
+
+
 def get_income_type_name(income_type: IncomeType) -> str:
     return names_income_types[income_type]
 
@@ -2,14 +2,31 @@ import datetime as dt
 import random
 import uuid
 from base64 import urlsafe_b64encode
-from typing import Callable, Optional, Union
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import (
+    Any,
+    Callable,
+    Iterable,
+    Iterator,
+    Mapping,
+    Optional,
+    Union,
+    get_args,
+    get_origin,
+)
 
 from dateutil.relativedelta import relativedelta
+from pydantic import BaseModel
 from pydantic.fields import FieldInfo
 
+from .enums import Gender, State
 from .general import LogConfig
 from .identities import Curp
 
+# Length of the ids made by `uuid_field`, after their prefix
+UUID_FIELD_LENGTH = 22
+
 
 def uuid_field(prefix: str = '') -> Callable[[], str]:
     def base64_uuid_func() -> str:
@@ -29,20 +46,257 @@ def get_log_config(field: FieldInfo) -> Optional[LogConfig]:
         return None
 
 
-def get_birth_date_from_curp(curp: Curp) -> dt.date:
+@dataclass(frozen=True)
+class LogFieldPlan:
+    name: str
+    # key of the field in the dumped data, its alias when dumping by alias
+    key: str
+    config: Optional[LogConfig] = None
+    # whether the value holds models, directly or inside containers, whose
+    # own plans apply to it
+    nested: bool = False
+
+
+def _nested_models(annotation: Any) -> Iterator[type[BaseModel]]:
+    origin = get_origin(annotation)
+    if origin is None:
+        if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+            yield annotation
+        return
+    for arg in get_args(annotation):
+        yield from _nested_models(arg)
+
+
+def _has_log_fields(model: type[BaseModel]) -> bool:
+    for field in model.model_fields.values():
+        config = get_log_config(field)
+        if config and (config.masked or config.excluded):
+            return True
+    return False
+
+
+@lru_cache(maxsize=None)
+def _needs_log_plan(model: type[BaseModel]) -> bool:
+    """
+    Whether `model` or any model nested in it, at any depth, has fields to
+    mask or exclude. Recursive models are only visited once.
+    """
+    visited = {model}
+    pending = [model]
+    while pending:
+        current = pending.pop()
+        if _has_log_fields(current):
+            return True
+        for field in current.model_fields.values():
+            for nested_model in _nested_models(field.annotation):
+                if nested_model not in visited:
+                    visited.add(nested_model)
+                    pending.append(nested_model)
+    return False
+
+
+@lru_cache(maxsize=None)
+def get_log_plan(
+    model: type[BaseModel], by_alias: bool = False
+) -> tuple[LogFieldPlan, ...]:
+    """
+    Fields of `model` that have to be masked or excluded when logging,
+    and the ones holding models that have them. Computed once per class.
+    """
+    plan = []
+    for name, field in model.model_fields.items():
+        key = (by_alias and field.serialization_alias) or name
+        config = get_log_config(field)
+        if config and (config.masked or config.excluded):
+            plan.append(LogFieldPlan(name, key, config))
+        elif any(map(_needs_log_plan, _nested_models(field.annotation))):
+            plan.append(LogFieldPlan(name, key, nested=True))
+    return tuple(plan)
+
+
+def mask_value(value: Any, unmasked_chars_length: int = 0) -> str:
+    text = str(value)
+    visible = (
+        text[-unmasked_chars_length:]
+        if 0 < unmasked_chars_length < len(text)
+        else ''
+    )
+    return '*' * (len(text) - len(visible)) + visible
+
+
+def _apply_nested_log_plan(data: Any, value: Any, by_alias: bool) -> None:
+    # the plan comes from the type of each value, so union members and
+    # subclasses get their own
+    if isinstance(value, BaseModel):
+        if isinstance(data, dict):
+            apply_log_plan(data, value, by_alias)
+    elif isinstance(value, Mapping):
+        if isinstance(data, dict):
+            for key, item in value.items():
+                if key in data:
+                    _apply_nested_log_plan(data[key], item, by_alias)
+    elif isinstance(value, (list, tuple)):
+        # items only line up while none of them were excluded from the dump
+        if isinstance(data, (list, tuple)) and len(data) == len(value):
+            for data_item, item in zip(data, value):
+                _apply_nested_log_plan(data_item, item, by_alias)
+
+
+def apply_log_plan(
+    data: dict[str, Any], model: BaseModel, by_alias: bool = False
+) -> dict[str, Any]:
+    """
+    Masks and removes from `data`, in place, the fields to log differently
+    of `model`, the instance it was dumped from, and of the models in it
+    """
+    for entry in get_log_plan(type(model), by_alias):
+        if entry.key not in data:
+            continue
+        value = data[entry.key]
+        if entry.config is None:
+            _apply_nested_log_plan(value, getattr(model, entry.name), by_alias)
+        elif entry.config.excluded:
+            del data[entry.key]
+        elif value is not None:
+            data[entry.key] = mask_value(
+                value, entry.config.unmasked_chars_length
+            )
+    return data
+
+
+CURP_CACHE_SIZE = 16384
+CURP_CHECK_VALUES = {
+    char: value
+    for value, char in enumerate('0123456789ABCDEFGHIJKLMNÑOPQRSTUVWXYZ')
+}
+CURP_GENDERS = {
+    'H': Gender.male,
+    'M': Gender.female,
+    'X': Gender.non_binary,
+}
+CURP_STATES = {state.value: state for state in State}
+
+
+@dataclass(frozen=True)
+class ParsedCurp:
+    curp: str
+    birth_date: dt.date
+    gender: Optional[Gender]
+    state: Optional[State]
+    homoclave: str
+    check_digit_valid: bool
+
+
+def curp_check_digit(curp: str) -> Optional[int]:
+    """Check digit of the first 17 characters, None if any is invalid"""
+    total = 0
+    for position, char in enumerate(curp[:17]):
+        value = CURP_CHECK_VALUES.get(char)
+        if value is None:
+            return None
+        total += value * (18 - position)
+    return (10 - total % 10) % 10
+
+
+def _curp_birth_date(curp: str, current_yy: int) -> dt.date:
     curp_date = curp[4:10]  # YYMMDD
+    if len(curp) != 18 or not (curp_date.isascii() and curp_date.isdigit()):
+        raise ValueError(f'Invalid CURP: {curp}')
     yy = int(curp_date[:2])
+    century = 1900 if yy > current_yy else 2000
+    return dt.date(century + yy, int(curp_date[2:4]), int(curp_date[4:]))
+
+
+def _decode_curp(curp: str, current_yy: int) -> ParsedCurp:
+    return ParsedCurp(
+        curp=curp,
+        birth_date=_curp_birth_date(curp, current_yy),
+        gender=CURP_GENDERS.get(curp[10]),
+        state=CURP_STATES.get(curp[11:13]),
+        homoclave=curp[16:],
+        check_digit_valid=str(curp_check_digit(curp)) == curp[17],
+    )
+
+
+_parse_curp = lru_cache(maxsize=CURP_CACHE_SIZE)(_decode_curp)
+
+
+def parse_curp(curp: Curp) -> ParsedCurp:
+    """
+    Decodes birth date, gender, state and homoclave of a CURP and
+    verifies its check digit. Raises ValueError when the birth date
+    can't be decoded.
+    """
+    return _parse_curp(curp, dt.date.today().year % 100)
+
+
+def parse_curps(curps: Iterable[str]) -> Iterator[Optional[ParsedCurp]]:
+    """
+    Lazily parses many CURPs without going through the cache, yielding
+    None for the ones that can't be decoded
+    """
     current_yy = dt.date.today().year % 100
-    century = '19' if yy > current_yy else '20'
-    birth_date = dt.datetime.strptime(century + curp_date, '%Y%m%d').date()
-    return birth_date
+    for curp in curps:
+        try:
+            yield _decode_curp(curp, current_yy)
+        except ValueError:
+            yield None
 
 
-def validate_age_requirement(birth_date: Union[dt.date, Curp]) -> dt.date:
+def get_birth_date_from_curp(curp: Curp) -> dt.date:
+    return parse_curp(curp).birth_date
+
+
+MIN_AGE = 18
+
+
+@lru_cache(maxsize=32)
+def _age_cutoff(today: dt.date, min_age: int) -> dt.date:
+    cutoff = today - relativedelta(years=min_age)
+    # relativedelta already counts a Feb 29 birth as a full year on
+    # Feb 28 of non-leap years
+    next_day = cutoff + dt.timedelta(days=1)
+    if relativedelta(today, next_day).years >= min_age:
+        cutoff = next_day
+    return cutoff
+
+
+def age_cutoff(min_age: int = MIN_AGE) -> dt.date:
+    """
+    Latest birth date that is at least `min_age` years old today.
+    Cached per day, so it's recomputed once the date changes.
+    """
+    return _age_cutoff(dt.date.today(), min_age)
+
+
+def validate_age_requirement(
+    birth_date: Union[dt.date, Curp], min_age: int = MIN_AGE
+) -> dt.date:
     if isinstance(birth_date, str):
         birth_date = get_birth_date_from_curp(birth_date)
 
-    current_date = dt.date.today()
-    if relativedelta(current_date, birth_date).years < 18:
+    if birth_date > age_cutoff(min_age):
         raise ValueError('User does not meet age requirement.')
     return birth_date
+
+
+def meets_age_requirement(
+    birth_dates: Iterable[Union[dt.date, Curp]], min_age: int = MIN_AGE
+) -> list[Optional[bool]]:
+    """
+    Checks many birth dates or CURPs against the same cutoff. CURPs
+    whose birth date can't be decoded result in None.
+    """
+    today = dt.date.today()
+    cutoff = _age_cutoff(today, min_age)
+    current_yy = today.year % 100
+    results: list[Optional[bool]] = []
+    for birth_date in birth_dates:
+        if isinstance(birth_date, str):
+            try:
+                birth_date = _curp_birth_date(birth_date, current_yy)
+            except ValueError:
+                results.append(None)
+                continue
+        results.append(birth_date <= cutoff)
+    return results
@@ -1,11 +1,17 @@
 import datetime as dt
 from typing import Annotated, Optional, Union
 
-from pydantic import BaseModel, ConfigDict, Field, SecretStr, StringConstraints
+from pydantic import ConfigDict, Field, SecretStr, StringConstraints
+from pydantic.config import JsonDict
 from pydantic_extra_types.phone_numbers import PhoneNumber
 
 from .enums import Country, KYCFileType, State, VerificationStatus
-from .general import NonEmptyStr, SerializableIPvAnyAddress
+from .general import DeferrableModel, NonEmptyStr, SerializableIPvAnyAddress
+
+# Set here, and not when the package is imported, so phonenumbers is only
+# loaded with the models. Every model with a PhoneNumber imports it from
+# this module.
+PhoneNumber.phone_format = 'E164'
 
 Password = Annotated[
     SecretStr,
@@ -44,7 +50,7 @@ Rfc = Annotated[
 # fields and is intended for validating incoming data.
 
 
-class Address(BaseModel):
+class Address(DeferrableModel):
     street: Optional[str] = None
     ext_number: Optional[str] = None
     int_number: Optional[str] = None
@@ -66,11 +72,19 @@ class Address(BaseModel):
                 "country": "MX",
                 "city": "Cuauhtémoc",
             }
-        }
+        },
     )
 
 
-class AddressRequest(BaseModel):
+ADDRESS_REQUEST_EXAMPLE: JsonDict = {
+    "street": "Reforma",
+    "ext_number": "265",
+    "int_number": "5",
+    "postal_code_id": "PC2ygq9j2bS9-9tsuVawzErA",
+}
+
+
+class AddressRequest(DeferrableModel):
     # This model is mainly for request validation, enforcing required fields.
     street: NonEmptyStr
     ext_number: NonEmptyStr
@@ -78,18 +92,11 @@ class AddressRequest(BaseModel):
     postal_code_id: NonEmptyStr
 
     model_config = ConfigDict(
-        json_schema_extra={
-            "example": {
-                "street": "Reforma",
-                "ext_number": "265",
-                "int_number": "5",
-                "postal_code_id": "PC2ygq9j2bS9-9tsuVawzErA",
-            }
-        }
+        json_schema_extra={"example": dict(ADDRESS_REQUEST_EXAMPLE)},
     )
 
 
-class BaseBeneficiary(BaseModel):
+class BaseBeneficiary(DeferrableModel):
     name: str
     birth_date: dt.date
     user_relationship: str
@@ -104,7 +111,7 @@ class BaseBeneficiary(BaseModel):
                 "user_relationship": "friend",
                 "percentage": 100,
             }
-        }
+        },
     )
 
 
@@ -112,7 +119,7 @@ class Beneficiary(BaseBeneficiary):
     phone_number: Union[PhoneNumber, str]
 
 
-class VerificationErrors(BaseModel):
+class VerificationErrors(DeferrableModel):
     identifier: str = Field(
         description='Unique identifier for the step validation'
     )
@@ -135,7 +142,7 @@ class VerificationErrors(BaseModel):
     )
 
 
-class KYCFile(BaseModel):
+class KYCFile(DeferrableModel):
     type: KYCFileType
     uri_front: str = Field(description='API uri to fetch the file')
     uri_back: Optional[str] = Field(
@@ -175,7 +182,7 @@ class KYCFile(BaseModel):
     )
 
 
-class TOSAgreement(BaseModel):
+class TOSAgreement(DeferrableModel):
     version: str
     ip: SerializableIPvAnyAddress
     location: Optional[str] = None
@@ -186,5 +193,5 @@ class TOSAgreement(BaseModel):
                 "ip": "192.168.0.1",
                 "location": "19.427224, -99.168082",
             }
-        }
+        },
     )
@@ -1,25 +1,25 @@
 import datetime as dt
 from typing import Optional
 
-from pydantic import BaseModel, EmailStr
+from pydantic import EmailStr
 
-from ..types import Curp, PhoneNumber, Rfc
-from .identities import AddressRequest
+from .general import DeferrableModel
+from .identities import AddressRequest, Curp, PhoneNumber, Rfc
 
 
-class BusinessDetails(BaseModel):
+class BusinessDetails(DeferrableModel):
     business_description: str
     account_usage_description: str
 
 
-class TransactionalProfileServices(BaseModel):
+class TransactionalProfileServices(DeferrableModel):
     spei_transfers_num: int
     spei_transfers_amount: int
     internal_transfers_num: int
     internal_transfers_amount: int
 
 
-class TransactionalProfile(BaseModel):
+class TransactionalProfile(DeferrableModel):
     currency: str
     monthly_amount: int
     payers_num: int
@@ -28,28 +28,28 @@ class TransactionalProfile(BaseModel):
     withdrawal: Optional[TransactionalProfileServices] = None
 
 
-class LicenseDetails(BaseModel):
+class LicenseDetails(DeferrableModel):
     license_required: bool
     supervisory_entity: Optional[str] = None
     license_type: Optional[str] = None
     license_date: Optional[dt.date] = None
 
 
-class AuditDetails(BaseModel):
+class AuditDetails(DeferrableModel):
     has_audit: bool
     audit_provider: Optional[str] = None
     audit_date: Optional[dt.date] = None
     audit_comments: Optional[str] = None
 
 
-class VulnerableActivityDetails(BaseModel):
+class VulnerableActivityDetails(DeferrableModel):
     is_vulnerable_activity: bool
     has_sat_register: Optional[bool] = None
     sat_registered_date: Optional[dt.date] = None
     is_in_compliance: Optional[bool] = None
 
 
-class PhysicalPerson(BaseModel):
+class PhysicalPerson(DeferrableModel):
     names: str
     first_surname: str
     second_surname: Optional[str] = None
@@ -68,7 +68,7 @@ class ShareholderPhysical(PhysicalPerson):
     share_capital: int
 
 
-class Shareholder(BaseModel):
+class Shareholder(DeferrableModel):
     name: str
     percentage: int
     shareholders: list[ShareholderPhysical]
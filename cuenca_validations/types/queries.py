@@ -1,16 +1,27 @@
+import base64
+import binascii
 import datetime as dt
-from typing import Annotated, Optional
+import hashlib
+import hmac
+import os
+import re
+import struct
+from dataclasses import dataclass
+from enum import Enum
+from functools import cached_property, lru_cache
+from typing import Annotated, Any, Callable, ClassVar, Optional, get_args
 
 from clabe import Clabe
 from pydantic import (
-    BaseModel,
     ConfigDict,
     EmailStr,
     Field,
+    GetCoreSchemaHandler,
     PositiveInt,
     StringConstraints,
     field_validator,
 )
+from pydantic_core import core_schema
 
 from ..typing import DictStrAny
 from ..validators import sanitize_dict
@@ -27,20 +38,248 @@ from .enums import (
     TransferNetwork,
     UserStatus,
 )
-from .general import NormalizedName
+from .general import DeferrableModel, NormalizedName
+from .helpers import UUID_FIELD_LENGTH
 from .identities import Curp
 
 MAX_PAGE_SIZE = 100
+PAGINATION_FIELDS = frozenset({'count', 'page_size', 'limit', 'cursor'})
+RANGE_FILTERS = {
+    'created_before': ('created_at', 'lte'),
+    'created_after': ('created_at', 'gte'),
+}
+
+
+CURSOR_SECRET = os.environ.get('CUENCA_VALIDATIONS_CURSOR_SECRET')
+CURSOR_SIGNATURE_LENGTH = 12
+MAX_CURSOR_SECRET_LENGTH = 64
+MAX_CURSOR_LENGTH = 128
+CURSOR_ALPHABET = re.compile(r'[A-Za-z0-9_-]+')
+CURSOR_EPOCH = dt.datetime(1970, 1, 1, tzinfo=dt.timezone.utc)
+MICROSECOND = dt.timedelta(microseconds=1)
+TIMESTAMP = struct.Struct('>q')
+
+
+class Cursor(str):
+    """
+    Opaque keyset pagination position: the `created_at` and `id` of the
+    last item of a page, signed so clients can't forge or edit it.
+
+        next_page = Cursor.create(last.created_at, last.id)
+
+    Backends continue from items created before `created_at`, or at the
+    same time with a lower `id`. Set `Cursor.secret`, or the
+    CUENCA_VALIDATIONS_CURSOR_SECRET environment variable, to the same
+    value of up to 64 bytes in every service that reads the cursors.
+    """
+
+    secret: ClassVar[Optional[bytes]] = (
+        CURSOR_SECRET.encode() if CURSOR_SECRET else None
+    )
+    created_at: dt.datetime
+    id: str
+
+    @classmethod
+    def _key(cls) -> Optional[bytes]:
+        """The secret, None when cursors aren't enabled"""
+        if cls.secret and len(cls.secret) > MAX_CURSOR_SECRET_LENGTH:
+            # a misconfiguration, not something clients can fix
+            raise RuntimeError(
+                f'Cursor.secret must be up to {MAX_CURSOR_SECRET_LENGTH} '
+                'bytes'
+            )
+        return cls.secret or None
+
+    @staticmethod
+    def _sign(payload: bytes, key: bytes) -> bytes:
+        # keyed BLAKE2b is a MAC by itself, and faster than HMAC-SHA256
+        return hashlib.blake2b(
+            payload, key=key, digest_size=CURSOR_SIGNATURE_LENGTH
+        ).digest()
+
+    @classmethod
+    def create(cls, created_at: dt.datetime, id: str) -> 'Cursor':
+        key = cls._key()
+        if key is None:
+            raise RuntimeError('Cursor.secret must be set')
+        # naive datetimes are local time, as when they're sanitized
+        created_at = created_at.astimezone(dt.timezone.utc)
+        micros = (created_at - CURSOR_EPOCH) // MICROSECOND
+        payload = TIMESTAMP.pack(micros) + id.encode()
+        token = base64.urlsafe_b64encode(payload + cls._sign(payload, key))
+        cursor = cls(token.rstrip(b'=').decode('ascii'))
+        if len(cursor) > MAX_CURSOR_LENGTH:
+            # decode would reject it
+            raise ValueError(
+                f'id is too long for a cursor of {MAX_CURSOR_LENGTH} chars'
+            )
+        cursor.created_at = created_at
+        cursor.id = id
+        return cursor
+
+    @classmethod
+    def decode(cls, token: str) -> 'Cursor':
+        """
+        Raises ValueError for invalid cursors, and when `secret` isn't set,
+        so clients get a validation error instead of a server error. A
+        secret longer than 64 bytes raises RuntimeError.
+        """
+        key = cls._key()
+        if key is None:
+            raise ValueError('cursors are not enabled')
+        # urlsafe_b64decode silently drops characters outside its alphabet
+        if not CURSOR_ALPHABET.fullmatch(token):
+            raise ValueError('invalid cursor')
+        try:
+            raw = base64.urlsafe_b64decode(token + '=' * (-len(token) % 4))
+        except binascii.Error:
+            raise ValueError('invalid cursor') from None
+        payload = raw[:-CURSOR_SIGNATURE_LENGTH]
+        signature = raw[-CURSOR_SIGNATURE_LENGTH:]
+        if len(payload) < TIMESTAMP.size or not hmac.compare_digest(
+            signature, cls._sign(payload, key)
+        ):
+            raise ValueError('invalid cursor')
+        (micros,) = TIMESTAMP.unpack_from(payload)
+        id_start = TIMESTAMP.size
+        cursor = cls(token)
+        cursor.created_at = CURSOR_EPOCH + micros * MICROSECOND
+        cursor.id = payload[id_start:].decode()
+        return cursor
+
+    @classmethod
+    def __get_pydantic_core_schema__(
+        cls, _source_type: Any, _handler: GetCoreSchemaHandler
+    ) -> core_schema.CoreSchema:
+        return core_schema.no_info_after_validator_function(
+            cls.decode, core_schema.str_schema(max_length=MAX_CURSOR_LENGTH)
+        )
+
+
+class IdList(str):
+    """
+    Comma separated ids, parsed once into `ids`, in order and without blanks
+    or duplicates. The str value is the same ids joined back with commas.
+    """
+
+    pattern: ClassVar[Optional[re.Pattern]] = None
+    ids: tuple[str, ...]
+
+    @cached_property
+    def id_set(self) -> frozenset[str]:
+        return frozenset(self.ids)
+
+    @classmethod
+    def parse(cls, value: str) -> 'IdList':
+        unique = dict.fromkeys(map(str.strip, value.split(',')))
+        unique.pop('', None)
+        ids = tuple(unique)
+        if len(ids) > MAX_PAGE_SIZE:
+            raise ValueError(
+                f'ids must contain at most {MAX_PAGE_SIZE} values'
+            )
+        if cls.pattern is not None:
+            match = cls.pattern.fullmatch
+            invalid = [id for id in ids if not match(id)]
+            if invalid:
+                raise ValueError(f'invalid ids: {", ".join(invalid)}')
+        id_list = cls(','.join(ids))
+        id_list.ids = ids
+        return id_list
+
+    @classmethod
+    def __get_pydantic_core_schema__(
+        cls, _source_type: Any, _handler: GetCoreSchemaHandler
+    ) -> core_schema.CoreSchema:
+        return core_schema.no_info_after_validator_function(
+            cls.parse, core_schema.str_schema()
+        )
+
+
+@lru_cache(maxsize=None)
+def id_list(prefix: str) -> type[IdList]:
+    """IdList that only accepts ids made by `uuid_field(prefix)`"""
+    pattern = re.compile(
+        f'{re.escape(prefix)}[0-9A-Za-z]{{{UUID_FIELD_LENGTH}}}'
+    )
+    return type(f'{prefix}IdList', (IdList,), dict(pattern=pattern))
 
 
-class QueryParams(BaseModel):
+# resources whose ids share a single prefix, the rest take any IdList
+CardIdList = id_list('CA')
+TransferIdList = id_list('TR')
+UserIdList = id_list('US')
+
+
+@dataclass(frozen=True)
+class Filter:
+    """`field op value` predicate, independent of the storage backend"""
+
+    field: str
+    op: str  # eq, in, gte or lte
+    value: Any
+
+
+@dataclass(frozen=True)
+class QueryFilters:
+    filters: tuple[Filter, ...]
+    count: bool = False
+    page_size: int = MAX_PAGE_SIZE
+    limit: Optional[int] = None
+    cursor: Optional[Cursor] = None
+
+
+@dataclass(frozen=True)
+class FilterRule:
+    name: str
+    field: str
+    op: str
+    convert: Optional[Callable[[Any], Any]] = None
+
+
+def _id_tuple(ids: IdList) -> Optional[tuple[str, ...]]:
+    return ids.ids or None
+
+
+def _enum_value(value: Enum) -> Any:
+    return value.value
+
+
+def _is_enum(annotation: Any) -> bool:
+    if isinstance(annotation, type) and issubclass(annotation, Enum):
+        return True
+    return any(_is_enum(arg) for arg in get_args(annotation))
+
+
+@lru_cache(maxsize=None)
+def get_filter_plan(model: type['QueryParams']) -> tuple[FilterRule, ...]:
+    """
+    How each field of `model` maps to a storage filter: created_before and
+    created_after to a range on created_at, ids to `in` and everything else
+    to equality, with Enums compared by value. Computed once per class.
+    """
+    plan = []
+    for name, field in model.model_fields.items():
+        if name in PAGINATION_FIELDS:
+            continue
+        if name in RANGE_FILTERS:
+            plan.append(FilterRule(name, *RANGE_FILTERS[name]))
+        elif name == 'ids':
+            plan.append(FilterRule(name, 'id', 'in', _id_tuple))
+        else:
+            convert = _enum_value if _is_enum(field.annotation) else None
+            plan.append(FilterRule(name, name, 'eq', convert))
+    return tuple(plan)
+
+
+class QueryParams(DeferrableModel):
     count: bool = False
     page_size: Annotated[
         int, Field(gt=0, le=MAX_PAGE_SIZE, default=MAX_PAGE_SIZE)
     ]
     limit: Optional[PositiveInt] = None
     user_id: Optional[str] = None
-    ids: Optional[str] = None
+    ids: Optional[IdList] = None
     created_before: Optional[dt.datetime] = None
     created_after: Optional[dt.datetime] = None
     related_transaction: Optional[str] = None
@@ -65,18 +304,6 @@ class QueryParams(BaseModel):
         },
     )
 
-    @field_validator('ids')
-    @classmethod
-    def validate_ids_count(cls, value: Optional[str]) -> Optional[str]:
-        if value is None:
-            return None
-        id_count = len([part for part in value.split(',') if part.strip()])
-        if id_count > MAX_PAGE_SIZE:
-            raise ValueError(
-                f'ids must contain at most {MAX_PAGE_SIZE} values'
-            )
-        return value
-
     def model_dump(self, *args, **kwargs) -> DictStrAny:
         kwargs.setdefault('exclude_none', True)
         kwargs.setdefault('exclude_unset', True)
@@ -86,12 +313,38 @@ class QueryParams(BaseModel):
         sanitize_dict(d)
         return d
 
+    def to_filters(self) -> QueryFilters:
+        """
+        The fields that were set as typed filters, e.g. datetimes stay
+        datetimes, without going through model_dump
+        """
+        fields_set = self.model_fields_set
+        values = self.__dict__
+        filters = []
+        for rule in get_filter_plan(type(self)):
+            if rule.name not in fields_set:
+                continue
+            value = values[rule.name]
+            if value is not None and rule.convert is not None:
+                value = rule.convert(value)
+            if value is not None:
+                filters.append(Filter(rule.field, rule.op, value))
+        return QueryFilters(
+            tuple(filters),
+            self.count,
+            self.page_size,
+            self.limit,
+            getattr(self, 'cursor', None),
+        )
+
 
 class TransactionQuery(QueryParams):
     status: Optional[str] = None
+    cursor: Optional[Cursor] = None
 
 
 class TransferQuery(TransactionQuery):
+    ids: Optional[TransferIdList] = None  # type: ignore[valid-type]
     account_number: Optional[str] = None
     idempotency_key: Optional[str] = None
     tracking_key: Optional[str] = None
@@ -128,6 +381,7 @@ class ApiKeyQuery(QueryParams):
 
 
 class CardQuery(QueryParams):
+    ids: Optional[CardIdList] = None  # type: ignore[valid-type]
     number: Optional[str] = None
     issuer: Optional[CardIssuer] = None
     funding_type: Optional[CardFundingType] = None
@@ -156,6 +410,7 @@ class AccountQuery(QueryParams):
 class BalanceEntryQuery(QueryParams):
     funding_instrument_uri: Optional[str] = None
     wallet_id: str = 'default'
+    cursor: Optional[Cursor] = None
 
 
 class WalletQuery(QueryParams):
@@ -167,6 +422,7 @@ class WalletTransactionQuery(QueryParams):
 
 
 class UserQuery(QueryParams):
+    ids: Optional[UserIdList] = None  # type: ignore[valid-type]
     phone_number: Optional[str] = None
     email_address: Optional[EmailStr] = None
     status: Optional[UserStatus] = None
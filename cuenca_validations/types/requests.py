@@ -1,5 +1,16 @@
 import datetime as dt
-from typing import Annotated, Any, Optional, Union
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import (
+    Annotated,
+    Any,
+    Callable,
+    Generic,
+    Iterable,
+    Optional,
+    TypeVar,
+    Union,
+)
 
 from clabe import BANK_NAMES, Clabe
 from pydantic import (
@@ -10,10 +21,13 @@ from pydantic import (
     GetCoreSchemaHandler,
     StrictStr,
     StringConstraints,
+    TypeAdapter,
+    ValidationError,
+    WrapValidator,
     field_validator,
     model_validator,
 )
-from pydantic_core import core_schema
+from pydantic_core import ErrorDetails, core_schema
 from pydantic_extra_types.coordinate import Coordinate
 
 from ..types.enums import (
@@ -57,15 +71,22 @@ from ..types.enums import (
     WebhookObject,
 )
 from ..typing import DictStrAny
-from ..validators import normalize_email, normalize_phone_number
-from .card import (
-    Cvv,
-    ExpMonth,
-    ExpYear,
-    PaymentCardNumber,
-    StrictPaymentCardNumber,
+from ..validators import (
+    is_binary_file,
+    normalize_email,
+    normalize_phone_number,
+)
+from .accounts import AccountNumber, StrictAccountNumber
+from .card import Cvv, ExpMonth, ExpYear, PaymentCardNumber
+from .files import (
+    MAX_FILE_SIZE,
+    FileContent,
+    file_content,
+    read_head,
+    sniff_extensions,
 )
 from .general import (
+    DeferrableModel,
     LogConfig,
     NonEmptyStr,
     SerializableAnyUrl,
@@ -73,8 +94,9 @@ from .general import (
     SerializableIPvAnyAddress,
     StrictPositiveInt,
 )
-from .helpers import validate_age_requirement
+from .helpers import apply_log_plan, validate_age_requirement
 from .identities import (
+    ADDRESS_REQUEST_EXAMPLE,
     AddressRequest,
     BaseBeneficiary,
     Curp,
@@ -106,7 +128,7 @@ DOCS_WITH_BACK = [
 ]
 
 
-class BaseRequest(BaseModel):
+class BaseRequest(DeferrableModel):
     model_config = ConfigDict(extra="forbid")
 
     def model_dump(self, *args, **kwargs) -> DictStrAny:
@@ -114,6 +136,14 @@ class BaseRequest(BaseModel):
         kwargs.setdefault('exclude_unset', True)
         return super().model_dump(*args, **kwargs)
 
+    def model_dump_for_log(self, *args, **kwargs) -> DictStrAny:
+        """model_dump with the LogConfig masks and exclusions applied"""
+        return apply_log_plan(
+            self.model_dump(*args, **kwargs),
+            self,
+            kwargs.get('by_alias') or False,
+        )
+
 
 class BaseTransferRequest(BaseRequest):
     recipient_name: StrictStr
@@ -144,13 +174,13 @@ class BaseTransferRequest(BaseRequest):
 
 
 class TransferRequest(BaseTransferRequest):
-    account_number: Union[Clabe, PaymentCardNumber] = Field(
+    account_number: AccountNumber = Field(
         description='Destination Clabe or Card number'
     )
 
 
 class StrictTransferRequest(BaseTransferRequest):
-    account_number: Union[Clabe, StrictPaymentCardNumber] = Field(
+    account_number: StrictAccountNumber = Field(
         description='Destination Clabe or Card number'
     )
 
@@ -183,7 +213,7 @@ class CardRequest(BaseRequest):
     card_holder_user_id: Optional[str] = None
 
 
-class CardActivationRequest(BaseModel):
+class CardActivationRequest(DeferrableModel):
     number: PaymentCardNumber
     exp_month: ExpMonth
     exp_year: ExpYear
@@ -218,7 +248,7 @@ class UserCredentialRequest(BaseRequest):
     user_id: Optional[str] = None
 
 
-class CardValidationRequest(BaseModel):
+class CardValidationRequest(DeferrableModel):
     number: PaymentCardNumber
     exp_month: Optional[ExpMonth] = None
     exp_year: Optional[ExpYear] = None
@@ -231,7 +261,7 @@ class CardValidationRequest(BaseModel):
     pin_attempts_exceeded: Optional[bool] = None
 
 
-class ARPCRequest(BaseModel):
+class ARPCRequest(DeferrableModel):
     number: PaymentCardNumber
     arqc: StrictStr
     arpc_method: Annotated[
@@ -252,7 +282,7 @@ class CardBatchRequest(BaseRequest):
     number_of_cards: Annotated[int, Field(strict=True, ge=1, le=999999)]
 
 
-class CardTransactionRequest(BaseModel):
+class CardTransactionRequest(DeferrableModel):
     card_id: str
     user_id: str
     # In some card_validations amount is equal to 0
@@ -345,7 +375,7 @@ class FraudFundsTransferRequest(BaseRequest):
         return self
 
 
-class FraudValidationRequest(BaseModel):
+class FraudValidationRequest(DeferrableModel):
     amount: StrictPositiveInt
     merchant_name: str
     merchant_type: str
@@ -371,7 +401,7 @@ class TransactionTokenValidationUpdateRequest(BaseRequest):
     status: TransactionTokenValidationStatus
 
 
-class UserPldRiskLevelRequest(BaseModel):
+class UserPldRiskLevelRequest(DeferrableModel):
     user_id: str
     level: float = Field(ge=0.0, le=1.0)
 
@@ -462,7 +492,7 @@ class CurpValidationRequest(BaseRequest):
         return values
 
 
-class TOSRequest(BaseModel):
+class TOSRequest(DeferrableModel):
     type: TermsOfService
     version: str
     location: Optional[str] = None
@@ -524,7 +554,7 @@ class UserRequest(BaseRequest):
                 'phone_verification_id': 'VEKp662Yrf6lMztl0-9qzk7Q',
                 'email_verification_id': 'VEwjDEcCMWZIk3JJ3p7P6T_A',
                 'profession': 'engineer',
-                'address': AddressRequest.model_json_schema().get('example'),
+                'address': dict(ADDRESS_REQUEST_EXAMPLE),
             }
         },
     )
@@ -674,19 +704,47 @@ class EndpointUpdateRequest(BaseRequest):
 
 class FileUploadRequest(BaseRequest):
     is_back: Optional[bool] = False
-    file: Union[bytes, str]
+    file: FileContent
     extension: Optional[FileExtension] = None
     type: KYCFileType
     user_id: str
 
+    def model_dump(self, *args, **kwargs) -> DictStrAny:
+        data = super().model_dump(*args, **kwargs)
+        # pydantic dumps file objects as iterators over their lines
+        if 'file' in data and is_binary_file(self.file):
+            if kwargs.get('mode', 'python') == 'python':
+                data['file'] = self.file
+        return data
+
+
+class StrictFileUploadRequest(FileUploadRequest):
+    """
+    Also rejects files larger than MAX_FILE_SIZE, and content whose magic
+    bytes don't match `extension`
+    """
 
-class FileRequest(BaseModel):
+    file: file_content(MAX_FILE_SIZE)  # type: ignore
+
+    @model_validator(mode='after')
+    def validate_extension(self) -> 'StrictFileUploadRequest':
+        if self.extension is None or isinstance(self.file, str):
+            return self
+        extensions = sniff_extensions(read_head(self.file))
+        if extensions and self.extension not in extensions:
+            raise ValueError(
+                f'file content does not match extension {self.extension.value}'
+            )
+        return self
+
+
+class FileRequest(DeferrableModel):
     is_back: Optional[bool] = False
     url: SerializableHttpUrl
     type: KYCFileType
 
 
-class FileBatchUploadRequest(BaseModel):
+class FileBatchUploadRequest(DeferrableModel):
     files: list[FileRequest]
     user_id: str
 
@@ -734,7 +792,7 @@ class LimitedWalletRequest(BaseRequest):
     allowed_rfc: Optional[Rfc] = None
 
 
-class PlatformRequest(BaseModel):
+class PlatformRequest(DeferrableModel):
     name: str
     rfc: Optional[str] = None
     establishment_date: Optional[dt.date] = None
@@ -746,7 +804,7 @@ class PlatformRequest(BaseModel):
     type: PlatformType = PlatformType.connect
 
 
-class WebhookRequest(BaseModel):
+class WebhookRequest(DeferrableModel):
     id: str
     event: WebhookEventType
     object_type: WebhookObject
@@ -760,13 +818,13 @@ class KYCValidationRequest(BaseRequest):
 
 
 class BankAccountValidationRequest(BaseRequest):
-    account_number: Union[Clabe, PaymentCardNumber]
+    account_number: AccountNumber
 
 
 class UserListsRequest(BaseRequest):
     curp: Optional[Curp] = Field(None, description='Curp to review on lists')
     rfc: Optional[Rfc] = Field(None, description='Rfc to review on lists')
-    account_number: Optional[Union[Clabe, PaymentCardNumber]] = Field(
+    account_number: Optional[AccountNumber] = Field(
         None, description='Account to review on lists'
     )
     names: Optional[NonEmptyStr] = Field(
@@ -820,7 +878,7 @@ class UserListsRequest(BaseRequest):
     )
 
 
-class QuestionnairesRequest(BaseModel):
+class QuestionnairesRequest(DeferrableModel):
     user_id: str
     token: str
     form_id: str
@@ -864,3 +922,84 @@ class PartnerUpdateRequest(BaseRequest):
 
 class PhoneVerificationAssociationRequest(BaseRequest):
     verification_id: str
+
+
+Model = TypeVar('Model', bound=BaseModel)
+
+
+@dataclass
+class BatchValidationResult(Generic[Model]):
+    """Outcome of `validate_batch`, aligned with the input positions.
+
+    `models[i]` is the validated model or `None` when the item failed, in
+    which case `errors[i]` holds its error details (locations are relative
+    to the item, not to the batch).
+    """
+
+    models: list[Optional[Model]]
+    errors: dict[int, list[ErrorDetails]] = field(default_factory=dict)
+
+    @property
+    def valid(self) -> list[Model]:
+        return [model for model in self.models if model is not None]
+
+
+class _InvalidItem:
+    """Stands in for an item that failed, carrying its errors"""
+
+    __slots__ = ('errors',)
+
+    def __init__(self, errors: list[ErrorDetails]) -> None:
+        self.errors = errors
+
+
+def _capture_errors(value: Any, handler: Callable[[Any], Any]) -> Any:
+    try:
+        return handler(value)
+    except ValidationError as exc:
+        return _InvalidItem(exc.errors())
+
+
+@lru_cache(maxsize=None)
+def _list_adapter(model: type[BaseModel]) -> TypeAdapter:
+    item = Annotated[model, WrapValidator(_capture_errors)]  # type: ignore
+    return TypeAdapter(list[item])  # type: ignore[valid-type]
+
+
+def validate_batch(
+    model: type[Model], items: Iterable[Union[DictStrAny, bytes, str]]
+) -> BatchValidationResult[Model]:
+    """Validate many raw payloads (dicts or JSON documents) against `model`.
+
+    Dicts are validated together through one cached `TypeAdapter`, in a
+    single pass: an item that fails is replaced by its errors, so the rest
+    of the batch is never validated again and exception objects are only
+    built for the failing items. JSON documents are validated one by one
+    with the model's core validator, which keeps a malformed document from
+    hiding its neighbours.
+    """
+    payloads = list(items)
+    result: BatchValidationResult[Model] = BatchValidationResult(
+        models=[None] * len(payloads)
+    )
+    pending: list[int] = []
+    validate_json = model.__pydantic_validator__.validate_json
+    for position, payload in enumerate(payloads):
+        if not isinstance(payload, (bytes, str)):
+            pending.append(position)
+            continue
+        try:
+            result.models[position] = validate_json(payload)
+        except ValidationError as exc:
+            result.errors[position] = exc.errors()
+
+    if pending:
+        validated = _list_adapter(model).validate_python(
+            [payloads[i] for i in pending]
+        )
+        for position, item in zip(pending, validated):
+            if isinstance(item, _InvalidItem):
+                result.errors[position] = item.errors
+            else:
+                result.models[position] = item
+    return result
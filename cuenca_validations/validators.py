@@ -1,14 +1,29 @@
 import base64
 import datetime as dt
+import io
+import mmap
 import re
 import unicodedata
 from enum import Enum
-from typing import Any, Callable, Optional, Union
+from functools import lru_cache, partial
+from itertools import chain
+from typing import Any, Callable, Iterable, Iterator, Optional
 
 SANITIZE_PHONE_NUMBER = re.compile(r'[+.()\-\s]')
 STRIP_MX_MOBILE_PREFIX = re.compile(r'(52)(?:(?:044)|1)?(\d{10})$')
 STRIP_US_DUPLICATE_PREFIX = re.compile(r'^11(\d{10})$')
 
+# Same characters as SANITIZE_PHONE_NUMBER, `\s` being every character for
+# which str.isspace() is true, as a str.translate deletion table
+PHONE_NUMBER_DELETE_TABLE = dict.fromkeys(
+    map(
+        ord,
+        '+.()-\t\n\x0b\x0c\r\x1c\x1d\x1e\x1f \x85\xa0\u1680'
+        '\u2000\u2001\u2002\u2003\u2004\u2005\u2006\u2007\u2008\u2009'
+        '\u200a\u2028\u2029\u202f\u205f\u3000',
+    )
+)
+
 
 def normalize_email(email: str) -> str:
     """Lowercase email and strip plus labels from the local part.
@@ -35,6 +50,52 @@ def normalize_phone_number(phone_number: str) -> str:
     return f'+{pn}'
 
 
+def normalize_emails(emails: Iterable[str]) -> list[str]:
+    """Batch version of `normalize_email`"""
+    return list(map(normalize_email, emails))
+
+
+def normalize_phone_numbers(phone_numbers: Iterable[str]) -> list[str]:
+    """Batch version of `normalize_phone_number`.
+
+    Produces exactly the same output in a single pass per number: the
+    sanitize step is a `str.translate` and, since the MX rewrite always
+    leaves a number the US rule can't match, at most one prefix regex
+    rewrites each number. Any iterable of str works, including NumPy
+    string arrays.
+    """
+    strip_mx = STRIP_MX_MOBILE_PREFIX.search
+    strip_us = STRIP_US_DUPLICATE_PREFIX.match
+    normalized: list[str] = []
+    append = normalized.append
+    for phone_number in phone_numbers:
+        pn = phone_number.translate(PHONE_NUMBER_DELETE_TABLE)
+        if match := strip_mx(pn):
+            pn = f'{pn[:match.start()]}52{match[2]}'
+        elif match := strip_us(pn):
+            pn = f'1{match[1]}'
+        append(f'+{pn}')
+    return normalized
+
+
+def _fold_accents(text: str) -> str:
+    nfkd = unicodedata.normalize('NFKD', text)
+    return ''.join(c for c in nfkd if not unicodedata.combining(c))
+
+
+# Per-character result of `_fold_accents` for Latin letters and combining
+# marks, as a str.translate table. Only ASCII results are kept, so a
+# translated name that is still non-ASCII needs the full NFKD pass.
+NAME_FOLD_TABLE = {
+    code: folded
+    for code in chain(
+        range(0x80, 0x250), range(0x300, 0x370), range(0x1E00, 0x1F00)
+    )
+    if (folded := _fold_accents(chr(code))).isascii()
+}
+NAME_CACHE_SIZE = 4096
+
+
 def normalize_name(name: str) -> str:
     """Normalize names for search/index matching.
 
@@ -44,43 +105,309 @@ def normalize_name(name: str) -> str:
     MARÍA JOSÉ     -> maria jose
     """
     collapsed = ' '.join(name.split())
-    nfkd = unicodedata.normalize('NFKD', collapsed)
-    return ''.join(c for c in nfkd if not unicodedata.combining(c)).lower()
+    if not collapsed.isascii():
+        folded = collapsed.translate(NAME_FOLD_TABLE)
+        collapsed = folded if folded.isascii() else _fold_accents(collapsed)
+    return collapsed.lower()
+
+
+# Given names and surnames repeat a lot, use this version for bulk jobs.
+# Hit rate is available through `cached_normalize_name.cache_info()`.
+cached_normalize_name = lru_cache(maxsize=NAME_CACHE_SIZE)(normalize_name)
+
+
+def _sanitize_datetime(item: dt.datetime) -> str:
+    if not item.tzinfo:
+        item = item.astimezone(dt.timezone.utc)
+    return item.isoformat()
+
+
+def _sanitize_date(item: dt.date) -> str:
+    return item.isoformat()
+
+
+# Multiple of 3, so every chunk but the last encodes without padding
+BASE64_CHUNK_SIZE = 48 * 1024
+
+
+def is_bytes_like(item: Any) -> bool:
+    """
+    Objects with the buffer protocol, such as bytes, bytearray, memoryview,
+    mmap or array.array, encoded straight from their buffer
+    """
+    try:
+        memoryview(item).release()
+    except TypeError:
+        return False
+    return True
+
+
+def is_binary_file(item: Any) -> bool:
+    """Readable objects that return bytes, text streams are left out"""
+    if isinstance(item, (io.RawIOBase, io.BufferedIOBase)):
+        return True
+    if (
+        isinstance(item, io.TextIOBase)
+        or not callable(getattr(item, 'read', None))
+        or is_bytes_like(item)
+    ):
+        return False
+    return isinstance(item.read(0), bytes)
+
+
+def iter_base64(
+    data: Any, chunk_size: int = BASE64_CHUNK_SIZE
+) -> Iterator[str]:
+    """Base64 of a bytes-like object or a binary file, `chunk_size` input
+    bytes at a time. Files are read from their current position, which is
+    restored afterwards when they're seekable.
+    """
+    if chunk_size % 3:
+        raise ValueError('chunk_size must be a multiple of 3')
+    if not is_binary_file(data):
+        with memoryview(data) as view, view.cast('B') as octets:
+            for start in range(0, len(octets), chunk_size):
+                end = start + chunk_size
+                yield base64.b64encode(octets[start:end]).decode('ascii')
+        return
+    position = data.tell() if data.seekable() else None
+    try:
+        rest = b''
+        while chunk := data.read(chunk_size):
+            # reads can be short, only whole 3 byte groups are encoded
+            chunk = rest + chunk if rest else chunk
+            end = len(chunk) - len(chunk) % 3
+            yield base64.b64encode(chunk[:end]).decode('ascii')
+            rest = chunk[end:]
+        if rest:
+            yield base64.b64encode(rest).decode('ascii')
+    finally:
+        if position is not None:
+            data.seek(position)
+
+
+def _sanitize_bytes(item: bytes) -> str:
+    return base64.b64encode(item).decode('utf-8')
+
+
+def _sanitize_file(item: Any) -> str:
+    return ''.join(iter_base64(item))
 
 
-def sanitize_dict(d: dict) -> dict:
-    for k, v in d.items():
-        d[k] = sanitize_item(v)
-    return d
+def _sanitize_enum(item: Enum) -> Any:
+    return item.value
+
+
+# Exact types returned untouched, checked before any isinstance call since
+# they make up most of the values we sanitize
+PASSTHROUGH_TYPES = frozenset({str, int, float, bool, type(None)})
+# Sanitizer by exact type for the leaves whose handling only depends on
+# their class. Subclasses (Enums, datetime subclasses) are added the first
+# time `_sanitize_value` resolves them.
+LEAF_SANITIZERS: dict[type, Callable[[Any], Any]] = {
+    dt.datetime: _sanitize_datetime,
+    dt.date: _sanitize_date,
+    bytes: _sanitize_bytes,
+    bytearray: _sanitize_bytes,
+    memoryview: _sanitize_bytes,
+    mmap.mmap: _sanitize_bytes,
+}
+SEQUENCE_TYPES = (list, tuple, set, frozenset)
+# Containers nested deeper than this are walked with an explicit stack, so
+# deep payloads don't hit the recursion limit
+MAX_RECURSION_DEPTH = 100
+
+Default = Optional[Callable[..., Any]]
+
+
+def sanitize_dict(d: dict, copy: bool = False) -> dict:
+    """Sanitize every value of `d`, including nested containers.
+
+    :param d: dict to be sanitized, it's modified in place unless `copy`
+    :param copy: build new dicts instead of mutating `d`, so data shared
+    across threads can be sanitized safely
+    """
+    return _sanitize_container(d, None, copy, {}, 0)
 
 
 def sanitize_item(
-    item: Any, default: Optional[Callable[..., Any]] = None
+    item: Any, default: Default = None, copy: bool = True
 ) -> Any:
     """
     :param item: item to be sanitized
     :param default: Optional function to be used when there is no case
     for this type of item, default `None` it returns the item as is.
+    :param copy: build new dicts, set `False` to sanitize the dicts in
+    `item` in place. Lists, tuples and sets are always rebuilt, with the
+    same container type.
     """
-    rv: Union[str, list[Any]]
-    if isinstance(item, dt.date):
-        if isinstance(item, dt.datetime) and not item.tzinfo:
-            rv = item.astimezone(dt.timezone.utc).isoformat()
-        else:
-            rv = item.isoformat()
-    elif isinstance(item, list):
-        rv = [
-            sanitize_dict(e) if isinstance(e, dict) else sanitize_item(e)
-            for e in item
-        ]
-    elif isinstance(item, bytes):
-        rv = base64.b64encode(item).decode('utf-8')
+    item_type = type(item)
+    if item_type in PASSTHROUGH_TYPES:
+        return item
+    sanitizer = LEAF_SANITIZERS.get(item_type)
+    if sanitizer is not None:
+        return sanitizer(item)
+    if _is_container(item):
+        return _sanitize_container(item, default, copy, {}, 0)
+    return _sanitize_value(item, default)
+
+
+def _is_container(item: Any) -> bool:
+    return isinstance(item, SEQUENCE_TYPES) or (
+        isinstance(item, dict) and not hasattr(item, 'to_dict')
+    )
+
+
+def _sanitize_value(item: Any, default: Default) -> Any:
+    sanitizer: Optional[Callable[[Any], Any]] = None
+    if isinstance(item, dt.datetime):
+        sanitizer = _sanitize_datetime
+    elif isinstance(item, dt.date):
+        sanitizer = _sanitize_date
+    elif is_bytes_like(item):
+        sanitizer = _sanitize_bytes
     elif isinstance(item, Enum):
-        rv = item.value
+        sanitizer = _sanitize_enum
     elif hasattr(item, 'to_dict'):
-        rv = item.to_dict()
+        return item.to_dict()
+    elif is_binary_file(item):
+        return _sanitize_file(item)
     elif default:
-        rv = default(item)
+        return default(item)
     else:
-        rv = item
-    return rv
+        return item
+    LEAF_SANITIZERS[type(item)] = sanitizer
+    return sanitizer(item)
+
+
+def _sanitize_leaf(item: Any, default: Default) -> Any:
+    item_type = type(item)
+    if item_type in PASSTHROUGH_TYPES:
+        return item
+    sanitizer = LEAF_SANITIZERS.get(item_type)
+    if sanitizer is not None:
+        return sanitizer(item)
+    return _sanitize_value(item, default)
+
+
+def _frozen(source: Any, items: list[Any]) -> Any:
+    if isinstance(source, tuple):
+        return tuple(items)
+    if isinstance(source, frozenset):
+        return frozenset(items)
+    return set(items)
+
+
+def _sanitize_container(
+    source: Any,
+    default: Default,
+    copy: bool,
+    targets: dict[int, Any],
+    depth: int,
+) -> Any:
+    """
+    `targets` maps the id of every dict and list already visited to its
+    sanitized version, so shared references stay shared and cycles end up
+    as cycles in the output instead of looping forever.
+    """
+    if id(source) in targets:
+        return targets[id(source)]
+    if depth >= MAX_RECURSION_DEPTH:
+        return _sanitize_deep(source, default, copy, targets)
+    depth += 1
+    if isinstance(source, dict):
+        target = {} if copy else source
+        targets[id(source)] = target
+        for key, value in source.items():
+            value_type = type(value)
+            if value_type in PASSTHROUGH_TYPES:
+                if copy:
+                    target[key] = value
+            elif value_type in LEAF_SANITIZERS:
+                target[key] = LEAF_SANITIZERS[value_type](value)
+            elif _is_container(value):
+                target[key] = _sanitize_container(
+                    value, default, copy, targets, depth
+                )
+            else:
+                target[key] = _sanitize_value(value, default)
+        return target
+    items: list[Any] = []
+    if isinstance(source, list):
+        targets[id(source)] = items
+    append = items.append
+    for value in source:
+        value_type = type(value)
+        if value_type in PASSTHROUGH_TYPES:
+            append(value)
+        elif value_type in LEAF_SANITIZERS:
+            append(LEAF_SANITIZERS[value_type](value))
+        elif _is_container(value):
+            append(_sanitize_container(value, default, copy, targets, depth))
+        else:
+            append(_sanitize_value(value, default))
+    return items if isinstance(source, list) else _frozen(source, items)
+
+
+def _sanitize_deep(
+    root: Any, default: Default, copy: bool, targets: dict[int, Any]
+) -> Any:
+    """Same as `_sanitize_container`, with an explicit stack.
+
+    Dicts and lists are handed to their parent as soon as they're created
+    and filled afterwards. Tuples and sets are built once their items are
+    sanitized, so their parent waits for them.
+    """
+    results: list[Any] = []
+    # (target or items, iterator over the source, is a dict, on close)
+    stack: list[
+        tuple[Any, Iterator[Any], bool, Optional[Callable[[Any], None]]]
+    ] = []
+
+    def visit(source: Any, deliver: Callable[[Any], None]) -> None:
+        if id(source) in targets:
+            deliver(targets[id(source)])
+        elif isinstance(source, dict):
+            target = {} if copy else source
+            targets[id(source)] = target
+            deliver(target)
+            stack.append((target, iter(source.items()), True, None))
+        elif isinstance(source, list):
+            items: list[Any] = []
+            targets[id(source)] = items
+            deliver(items)
+            stack.append((items, iter(source), False, None))
+        else:
+            stack.append(
+                (
+                    [],
+                    iter(source),
+                    False,
+                    lambda items: deliver(_frozen(source, items)),
+                )
+            )
+
+    visit(root, results.append)
+    while stack:
+        depth = len(stack)
+        target, iterator, is_dict, on_close = stack[-1]
+        for entry in iterator:
+            if is_dict:
+                key, value = entry
+                deliver = partial(target.__setitem__, key)
+            else:
+                value = entry
+                deliver = target.append
+            if _is_container(value):
+                visit(value, deliver)
+                if len(stack) > depth:
+                    break
+            elif is_dict and not copy and type(value) in PASSTHROUGH_TYPES:
+                continue
+            else:
+                deliver(_sanitize_leaf(value, default))
+        else:
+            stack.pop()
+            if on_close:
+                on_close(target)
+    return results[0]
@@ -0,0 +1,149 @@
+import random
+from typing import Optional
+
+import pytest
+from clabe import Clabe, compute_control_digit
+from pydantic import BaseModel, ValidationError
+from pydantic_core import PydanticCustomError
+from pydantic_extra_types.payment import PaymentCardNumber
+
+from cuenca_validations.types import (
+    AccountNumber,
+    AccountNumberType,
+    StrictAccountNumber,
+)
+from cuenca_validations.types.accounts import (
+    CardAccountNumber,
+    ClabeAccountNumber,
+    StrictCardAccountNumber,
+    clabe_control_digit,
+    is_valid_account_number,
+    luhn_valid,
+    parse_account_number,
+)
+from cuenca_validations.types.card import StrictPaymentCardNumber
+from cuenca_validations.types.requests import (
+    StrictTransferRequest,
+    TransferRequest,
+)
+
+CLABE = '646180157034181180'
+VALID_BBVA = '4772130000000003'
+UNKNOWN_BIN = '4000000000000002'
+# 18 digits, not a valid Clabe but a valid card number
+CARD_18 = '920000000000000009'
+
+
+class AccountModel(BaseModel):
+    account_number: AccountNumber
+    strict_account_number: Optional[StrictAccountNumber] = None
+
+
+def test_clabe_account_number():
+    account = AccountModel(account_number=f' {CLABE} ').account_number
+    assert account == CLABE
+    assert isinstance(account, ClabeAccountNumber)
+    assert isinstance(account, Clabe)
+    assert account.kind is AccountNumberType.clabe
+    assert account.bank_code == '90646'
+
+
+def test_card_account_number():
+    account = AccountModel(account_number=VALID_BBVA).account_number
+    assert isinstance(account, CardAccountNumber)
+    assert isinstance(account, PaymentCardNumber)
+    assert account.kind is AccountNumberType.card
+    assert account.bank_code == '40012'
+    assert account.last4 == '0003'
+    unknown = AccountModel(account_number=UNKNOWN_BIN).account_number
+    assert unknown.bank_code is None
+
+
+def test_18_digit_card_number():
+    account = AccountModel(account_number=CARD_18).account_number
+    assert account.kind is AccountNumberType.card
+
+
+@pytest.mark.parametrize(
+    'number,error_type',
+    [
+        (CLABE[:-1] + '1', 'clabe.control_digit'),
+        (CLABE[:-1] + 'a', 'clabe'),
+        ('999180157034181180', 'clabe.bank_code'),
+        ('4772130000000004', 'payment_card_number_luhn'),
+        ('47721300000a0003', 'payment_card_number_digits'),
+        ('12345', 'string_too_short'),
+        ('1' * 20, 'string_too_long'),
+        (12345, 'string_type'),
+    ],
+)
+def test_invalid_account_number(number: str, error_type: str):
+    with pytest.raises(ValidationError) as exc_info:
+        AccountModel.model_validate(dict(account_number=number))
+    union_errors = [
+        error
+        for error in exc_info.value.errors()
+        if error['loc'][:1] == ('account_number',)
+    ]
+    # same errors as Union[Clabe, PaymentCardNumber]
+    assert [error['loc'] for error in union_errors] == [
+        ('account_number', 'function-after[_validate(), constrained-str]'),
+        ('account_number', 'function-after[validate(), constrained-str]'),
+    ]
+    assert error_type in {error['type'] for error in union_errors}
+
+
+def test_strict_account_number():
+    model = AccountModel(
+        account_number=UNKNOWN_BIN, strict_account_number=VALID_BBVA
+    )
+    assert model.strict_account_number == VALID_BBVA
+    assert isinstance(model.strict_account_number, StrictCardAccountNumber)
+    assert isinstance(model.strict_account_number, StrictPaymentCardNumber)
+    assert model.strict_account_number.bank_code == '40012'
+    with pytest.raises(ValidationError) as exc_info:
+        AccountModel(account_number=CLABE, strict_account_number=UNKNOWN_BIN)
+    assert exc_info.value.errors()[1]['type'] == 'payment_card_number.bin'
+
+
+def test_parse_account_number_is_cached():
+    assert parse_account_number(VALID_BBVA) is parse_account_number(VALID_BBVA)
+    assert is_valid_account_number(CLABE)
+    assert is_valid_account_number(UNKNOWN_BIN)
+    assert not is_valid_account_number(UNKNOWN_BIN, strict=True)
+    assert not is_valid_account_number('4' * 20)
+
+
+def test_check_digits_match_libraries():
+    rng = random.Random(0)
+    for _ in range(1000):
+        clabe = ''.join(rng.choices('0123456789', k=17))
+        assert str(clabe_control_digit(clabe)) == compute_control_digit(clabe)
+        number = ''.join(rng.choices('0123456789', k=rng.randint(12, 19)))
+        try:
+            PaymentCardNumber.validate_luhn_check_digit(number)
+        except PydanticCustomError:
+            assert not luhn_valid(number)
+        else:
+            assert luhn_valid(number)
+
+
+def test_transfer_requests_account_number():
+    transfer = dict(
+        recipient_name='Doroteo Arango',
+        account_number=VALID_BBVA,
+        amount=100_00,
+        descriptor='Mezcal, pulque y tequila',
+        idempotency_key='UNIQUE-KEY-003',
+    )
+    request = StrictTransferRequest.model_validate(transfer)
+    assert request.account_number.kind is AccountNumberType.card
+    request = TransferRequest.model_validate(
+        dict(transfer, account_number=CLABE)
+    )
+    assert request.account_number.kind is AccountNumberType.clabe
+    assert request.model_dump()['account_number'] == CLABE
+    schema = TransferRequest.model_json_schema()['properties']
+    clabe, card = schema['account_number']['anyOf']
+    assert clabe['pattern'] == '^[0-9]{18}$'
+    assert card == dict(type='string', minLength=12, maxLength=19)
@@ -0,0 +1,152 @@
+import inspect
+import json
+import multiprocessing
+
+import pytest
+from pydantic import BaseModel
+
+from benchmarks import runner
+from benchmarks.__main__ import main
+from benchmarks.cases import (
+    BENCHMARKS,
+    LARGE_INPUT_CASES,
+    close_parallel_validators,
+    large_input_cases,
+)
+from benchmarks.fixtures import MODEL_PAYLOADS
+from cuenca_validations.types import queries, requests
+
+
+def module_models(module) -> list[type[BaseModel]]:
+    return [
+        value
+        for value in vars(module).values()
+        if inspect.isclass(value)
+        and issubclass(value, BaseModel)
+        and value.__module__ == module.__name__
+    ]
+
+
+@pytest.mark.parametrize('module', [requests, queries])
+def test_every_model_has_payload(module):
+    missing = set(module_models(module)) - set(MODEL_PAYLOADS)
+    assert not missing
+
+
+@pytest.mark.parametrize(
+    'model', MODEL_PAYLOADS, ids=lambda model: model.__name__
+)
+def test_model_payload_is_valid(model):
+    payload = MODEL_PAYLOADS[model]
+    dumped = model.model_validate(payload).model_dump()
+    # nothing in the payload is silently ignored
+    assert set(payload) - {'count'} <= set(dumped)
+
+
+def test_cases_run():
+    for name, case in BENCHMARKS.items():
+        if name not in LARGE_INPUT_CASES:
+            case()
+
+
+def test_large_input_cases_run():
+    cases = large_input_cases(files=3, rows=20, keys=100, payloads=20)
+    assert len(cases) == len(LARGE_INPUT_CASES)
+    try:
+        for case in cases.values():
+            case()
+    finally:
+        close_parallel_validators()
+    assert not multiprocessing.active_children()
+
+
+def test_measure():
+    assert 0 < runner.measure(lambda: None, min_time=0.001, repeat=2) < 1
+
+
+def test_measure_prepared():
+    inputs: list[list[int]] = []
+
+    def setup() -> list[int]:
+        inputs.append([1, 2, 3])
+        return inputs[-1]
+
+    case = runner.Prepared(setup, list.clear)
+    assert 0 < runner.measure(case, min_time=0.001, repeat=2) < 1
+    # every call got a list of its own
+    assert len(inputs) > 2 and not any(inputs)
+    assert case() is None
+
+
+def test_select():
+    names = ['validators.normalize_name', 'helpers.parse_curp']
+    assert runner.select(names, []) == names
+    assert runner.select(names, ['curp']) == ['helpers.parse_curp']
+    assert runner.select(names, ['curp', 'name']) == names
+
+
+def test_compare():
+    baseline = {'a': 1.0, 'b': 2.0, 'c': 1.0}
+    current = {'a': 1.5, 'b': 2.0, 'c': 1.1, 'new': 1.0}
+    comparisons = {c.name: c for c in runner.compare(baseline, current)}
+    assert comparisons['a'].ratio == 1.5
+    assert comparisons['a'].is_regression(0.25)
+    assert not comparisons['c'].is_regression(0.25)
+    assert comparisons['new'].ratio is None
+    assert not comparisons['new'].is_regression(0.25)
+
+    doubled = {name: seconds * 2 for name, seconds in baseline.items()}
+    normalized = runner.compare(baseline, doubled, normalize=True)
+    assert [c.ratio for c in normalized] == [1.0, 1.0, 1.0]
+
+
+@pytest.mark.parametrize(
+    'seconds,expected',
+    [
+        (2.0, '2.00 s'),
+        (0.0025, '2.50 ms'),
+        (3e-6, '3.00 us'),
+        (5e-9, '5.00 ns'),
+    ],
+)
+def test_format_time(seconds, expected):
+    assert runner.format_time(seconds).strip() == expected
+
+
+def test_cli_run(tmp_path):
+    output = tmp_path / 'results.json'
+    args = ['-k', 'helpers.age_cutoff', '--min-time', '0.001', '--repeat', '1']
+    assert main(['run', *args, '--output', str(output)]) == 0
+    assert list(runner.load(output)) == ['helpers.age_cutoff']
+    assert json.loads(output.read_text())['python']
+    # compares against a baseline 1000x slower, so it can't regress
+    slower = tmp_path / 'slower.json'
+    runner.save({'helpers.age_cutoff': 1.0}, slower)
+    assert main(['compare', *args, '--baseline', str(slower)]) == 0
+
+
+def test_cli_compare(tmp_path, capsys):
+    baseline = tmp_path / 'baseline.json'
+    results = tmp_path / 'results.json'
+    runner.save({'a': 1.0, 'b': 1.0}, baseline)
+    runner.save({'a': 1.1, 'b': 2.0, 'c': 1.0}, results)
+
+    def compare(*args: str) -> int:
+        return main(
+            ['compare', '--baseline', str(baseline), '--results', str(results)]
+            + list(args)
+        )
+
+    assert compare() == 1
+    output = capsys.readouterr().out
+    assert 'b  << SLOWER' in output
+    assert 'a  << SLOWER' not in output
+    assert '1 operation(s) slower' in output
+    assert compare('--threshold', '1.5') == 0
+    assert compare('-k', 'a') == 0
+
+
+def test_cli_compare_without_baseline(tmp_path, capsys):
+    missing = tmp_path / 'baseline.json'
+    assert main(['compare', '--baseline', str(missing)]) == 2
+    assert 'make benchmark-baseline' in capsys.readouterr().err
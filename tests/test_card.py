@@ -2,7 +2,9 @@ import pytest
 from pydantic import BaseModel, ValidationError
 from pydantic_extra_types.payment import PaymentCardBrand
 
+from cuenca_validations.card_bins import CARD_BINS
 from cuenca_validations.types import StrictPaymentCardNumber
+from cuenca_validations.types.card import CARD_BIN_INDEX, BinIndex
 
 VALID_BBVA = '4772130000000003'
 INVALID_BIN = '4050000000000001'
@@ -33,3 +35,50 @@ def test_valid_bin_strict_payment():
     assert card.card_number.last4 == '0003'
     assert card.card_number.masked == '477213******0003'
     assert card.card_number.bank_code == '40012'
+
+
+def test_bin_index_longest_prefix_and_ranges():
+    index = BinIndex(
+        {'477213': '40012', '47721399': '40127', '400443': '40036'},
+        ranges=[('506099', '506198', '40072'), ('5204', '5205', '40002')],
+    )
+    assert index.lookup(VALID_BBVA) == '40012'
+    assert index.lookup('4772139900000001') == '40127'
+    assert index.lookup('5061500000000000') == '40072'
+    assert index.lookup('5205990000000000') == '40002'
+    assert index.lookup('5206000000000000') is None
+    assert index.lookup('1000000000000000') is None
+    assert index.lookup('not-a-card') is None
+    assert index.lookup('４７７２１３0000000003') is None
+    assert index.lookup_many([VALID_BBVA, INVALID_BIN]) == ['40012', None]
+
+
+@pytest.mark.parametrize(
+    'number', ['0_000000', ' 0000000', '+0000000', '-0000000', '']
+)
+def test_bin_index_only_takes_ascii_digits(number: str):
+    # int() would parse these as a BIN of zeros
+    assert BinIndex({'000000': '40012'}).lookup(number) is None
+
+
+def test_bin_index_merges_contiguous_segments():
+    index = BinIndex({'400000': '40012', '400001': '40012', '400002': '1'})
+    assert len(index) == 2
+
+
+@pytest.mark.parametrize(
+    'low, high',
+    [('4772', '47721'), ('47a213', '47a213'), ('4772130000', '4772130000')],
+)
+def test_bin_index_invalid_entries(low, high):
+    with pytest.raises(ValueError):
+        BinIndex({}, ranges=[(low, high, '40012')])
+
+
+def test_card_bin_index_returns_stored_bank_code():
+    assert CARD_BIN_INDEX.lookup(VALID_BBVA) is CARD_BINS['477213']
+
+
+def test_bank_code_unknown_bin():
+    with pytest.raises(KeyError):
+        StrictPaymentCardNumber(INVALID_BIN).bank_code
@@ -0,0 +1,60 @@
+import pytest
+
+from cuenca_validations import duplicates
+from cuenca_validations.duplicates import MAX_DICT_KEYS, DuplicateIndex
+
+
+@pytest.mark.parametrize('max_dict_keys', [MAX_DICT_KEYS, 100, 0])
+def test_duplicate_index(max_dict_keys: int, monkeypatch) -> None:
+    monkeypatch.setattr(duplicates, 'MAX_DICT_KEYS', max_dict_keys)
+    index = DuplicateIndex(capacity=10)
+    keys = [f'PAYROLL-{i}' for i in range(5000)]
+    for row, key in enumerate(keys):
+        assert index.add(key, row) is None
+    assert len(index) == 5000
+    # it grew past its initial size, or moved to the arrays, and kept
+    # every row
+    assert index.add('PAYROLL-0', 9000) == 0
+    assert index.add('PAYROLL-4999', 9000) == 4999
+    assert index.get('PAYROLL-2500') == 2500
+    assert 'PAYROLL-10' in index
+    assert 'PAYROLL-5000' not in index
+    assert index.get('PAYROLL-5000') is None
+    assert len(index) == 5000
+
+
+def test_duplicate_index_nbytes(monkeypatch) -> None:
+    index = DuplicateIndex()
+    for row in range(5000):
+        index.add(f'PAYROLL-{row}', row)
+    assert index.nbytes / len(index) > 100
+    monkeypatch.setattr(duplicates, 'MAX_DICT_KEYS', 0)
+    index = DuplicateIndex()
+    for row in range(5000):
+        index.add(f'PAYROLL-{row}', row)
+    assert index.nbytes / len(index) <= 48
+
+
+def test_duplicate_index_capacity() -> None:
+    index = DuplicateIndex(capacity=100_000)
+    assert index.nbytes == 262_144 * 16
+    for row in range(100_000):
+        index.add(str(row), row)
+    assert index.nbytes == 262_144 * 16
+
+
+def test_duplicate_index_same_hash(monkeypatch) -> None:
+    # keys whose first hash is the same are told apart by the second one
+    index = DuplicateIndex(capacity=MAX_DICT_KEYS + 1)
+
+    def same_first_hash(key: str) -> int:
+        # only the salted keys of the second hash get their own
+        return hash(key) if key.startswith(index._salt) else 1
+
+    monkeypatch.setattr(duplicates, 'hash', same_first_hash, raising=False)
+    assert index.add('KEY-1', 1) is None
+    assert index.add('KEY-2', 2) is None
+    assert index.add('KEY-1', 3) == 1
+    assert index.get('KEY-2') == 2
+    assert index.get('KEY-3') is None
+    assert len(index) == 2
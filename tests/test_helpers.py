@@ -1,4 +1,25 @@
-from cuenca_validations.types import uuid_field
+import datetime as dt
+
+import pytest
+from dateutil.relativedelta import relativedelta
+from freezegun import freeze_time
+
+from cuenca_validations.types import (
+    ParsedCurp,
+    parse_curp,
+    parse_curps,
+    uuid_field,
+)
+from cuenca_validations.types.enums import Gender, State
+from cuenca_validations.types.helpers import (
+    _age_cutoff,
+    _parse_curp,
+    age_cutoff,
+    curp_check_digit,
+    get_birth_date_from_curp,
+    meets_age_requirement,
+    validate_age_requirement,
+)
 
 
 def test_uuid_field_without_prefix():
@@ -34,3 +55,134 @@ def test_sanitized_uuid():
     uuid_str = generator()
     assert "-" not in uuid_str
     assert "_" not in uuid_str
+
+
+@freeze_time('2022-01-01')
+def test_parse_curp():
+    assert parse_curp('HEGG560427MVZRRL04') == ParsedCurp(
+        curp='HEGG560427MVZRRL04',
+        birth_date=dt.date(1956, 4, 27),
+        gender=Gender.female,
+        state=State.VZ,
+        homoclave='04',
+        check_digit_valid=True,
+    )
+
+
+@freeze_time('2022-01-01')
+@pytest.mark.parametrize(
+    'curp,birth_date,gender,state,check_digit_valid',
+    [
+        (
+            'GOCG650418HVZNML08',
+            dt.date(1965, 4, 18),
+            Gender.male,
+            State.VZ,
+            True,
+        ),
+        (
+            'ABCD220101XNEXXX03',
+            dt.date(2022, 1, 1),
+            Gender.non_binary,
+            State.NE,
+            False,
+        ),
+        (
+            'ABCD230101HDFXXX03',
+            dt.date(1923, 1, 1),
+            Gender.male,
+            State.DF,
+            False,
+        ),
+        ('ABCD000229ZZZXXXA3', dt.date(2000, 2, 29), None, None, False),
+    ],
+)
+def test_parse_curp_fields(curp, birth_date, gender, state, check_digit_valid):
+    parsed = parse_curp(curp)
+    assert parsed.birth_date == birth_date == get_birth_date_from_curp(curp)
+    assert parsed.gender is gender
+    assert parsed.state is state
+    assert parsed.check_digit_valid is check_digit_valid
+
+
+@pytest.mark.parametrize(
+    'curp',
+    ['ABCD921304HDFSRN03', 'ABCD9206A4HDFSRN03', 'ABCD920604', ''],
+)
+def test_parse_curp_invalid(curp):
+    with pytest.raises(ValueError):
+        parse_curp(curp)
+
+
+def test_parse_curp_cached():
+    _parse_curp.cache_clear()
+    assert parse_curp('TAXM840916HNEMXT02') is parse_curp('TAXM840916HNEMXT02')
+    assert _parse_curp.cache_info().hits == 1
+
+
+def test_parse_curp_cache_follows_year():
+    with freeze_time('2024-01-01'):
+        assert parse_curp('ABCD250101HDFXXX03').birth_date.year == 1925
+    with freeze_time('2026-01-01'):
+        assert parse_curp('ABCD250101HDFXXX03').birth_date.year == 2025
+
+
+def test_curp_check_digit():
+    assert curp_check_digit('HEGG560427MVZRRL04') == 4
+    assert curp_check_digit('ÑEGG560427MVZRRL04') == 8
+    assert curp_check_digit('hegg560427MVZRRL04') is None
+
+
+def test_parse_curps():
+    parsed = list(
+        parse_curps(['HEGG560427MVZRRL04', 'ABCD921304HDFSRN03', 'bad'])
+    )
+    assert parsed[0] == parse_curp('HEGG560427MVZRRL04')
+    assert parsed[1:] == [None, None]
+
+
+def test_age_cutoff_matches_relativedelta():
+    leap_day_births = [dt.date(year, 2, 29) for year in range(1996, 2013, 4)]
+    today = dt.date(2023, 1, 1)
+    while today < dt.date(2026, 1, 1):
+        for min_age in (18, 21):
+            cutoff = _age_cutoff(today, min_age)
+            births = leap_day_births + [
+                cutoff + dt.timedelta(days=delta) for delta in range(-3, 4)
+            ]
+            for birth_date in births:
+                expected = relativedelta(today, birth_date).years >= min_age
+                assert (birth_date <= cutoff) is expected
+        today += dt.timedelta(days=1)
+
+
+def test_age_cutoff_changes_daily():
+    with freeze_time('2022-02-27 23:59:59'):
+        assert age_cutoff() == dt.date(2004, 2, 27)
+        with pytest.raises(ValueError):
+            validate_age_requirement(dt.date(2004, 2, 28))
+    with freeze_time('2022-02-28'):
+        assert age_cutoff() == dt.date(2004, 2, 29)
+        assert validate_age_requirement(dt.date(2004, 2, 29))
+
+
+@freeze_time('2022-01-01')
+def test_validate_age_requirement_min_age():
+    assert validate_age_requirement(dt.date(2001, 1, 1), min_age=21)
+    with pytest.raises(ValueError, match='age requirement'):
+        validate_age_requirement(dt.date(2001, 1, 2), min_age=21)
+    assert validate_age_requirement('ABCD010101HDFXXX03', min_age=21)
+
+
+@freeze_time('2022-01-01')
+def test_meets_age_requirement():
+    assert meets_age_requirement(
+        [
+            dt.date(2004, 1, 1),
+            dt.date(2004, 1, 2),
+            'ABCD040101HDFXXX03',
+            'ABCD040102HDFXXX03',
+            'ABCD041301HDFXXX03',
+        ]
+    ) == [True, False, True, False, None]
+    assert meets_age_requirement([dt.date(2004, 1, 1)], min_age=21) == [False]
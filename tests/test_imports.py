@@ -0,0 +1,131 @@
+import ast
+import inspect
+import os
+import re
+import subprocess
+import sys
+import textwrap
+from importlib import import_module
+
+import pytest
+
+import cuenca_validations
+from cuenca_validations import types
+
+# Cumulative microseconds for `import cuenca_validations.validators` as
+# reported by `python -X importtime`, generous enough for slow CI runners
+IMPORT_TIME_BUDGET = 200_000
+HEAVY_MODULES = ['pydantic', 'clabe', 'phonenumbers', 'dateutil']
+
+
+def run_python(code: str, **env: str) -> subprocess.CompletedProcess:
+    return subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', code],
+        capture_output=True,
+        text=True,
+        check=True,
+        env={**os.environ, **env},
+    )
+
+
+def test_validators_import_is_light():
+    result = run_python(
+        'import sys, cuenca_validations.validators; '
+        f'print([m for m in {HEAVY_MODULES!r} if m in sys.modules])'
+    )
+    assert result.stdout.strip() == '[]'
+
+
+def test_validators_import_time_budget():
+    result = run_python('import cuenca_validations.validators')
+    times = re.findall(
+        r'^import time:\s+\d+ \|\s+(\d+) \|\s*cuenca_validations$',
+        result.stderr,
+        re.MULTILINE,
+    )
+    assert times
+    assert int(times[0]) < IMPORT_TIME_BUDGET
+
+
+def test_phone_number_format_with_lazy_types():
+    result = run_python(
+        'from cuenca_validations.types import UserUpdateRequest; '
+        'request = UserUpdateRequest(phone_number="+52 55 0099 8877"); '
+        'print(request.phone_number)'
+    )
+    assert result.stdout.strip() == '+525500998877'
+
+
+def test_lazy_imports_resolve():
+    for name, module in types._LAZY_IMPORTS.items():
+        value = getattr(types, name)
+        assert value is getattr(
+            import_module(f'{types.__name__}.{module}'), name
+        )
+    assert types.__all__ == list(types._LAZY_IMPORTS)
+
+
+def test_type_checking_imports_match_lazy_imports():
+    tree = ast.parse(inspect.getsource(types))
+    (block,) = [
+        node
+        for node in tree.body
+        if isinstance(node, ast.If)
+        and isinstance(node.test, ast.Name)
+        and node.test.id == 'TYPE_CHECKING'
+    ]
+    imported = {
+        alias.name: node.module
+        for node in block.body
+        if isinstance(node, ast.ImportFrom)
+        for alias in node.names
+    }
+    assert imported == types._LAZY_IMPORTS
+
+
+def test_lazy_types():
+    assert cuenca_validations.__getattr__('types') is types
+    assert types.TransferRequest is types.requests.TransferRequest
+    assert 'TransferRequest' in dir(types)
+    assert types.PhoneNumber.phone_format == 'E164'
+
+
+@pytest.mark.parametrize('module', [cuenca_validations, types])
+def test_lazy_missing_attribute(module):
+    with pytest.raises(AttributeError, match='has no attribute'):
+        module.missing
+
+
+def test_prebuild_models_already_built():
+    assert types.TransferRequest.__pydantic_complete__
+    types.prebuild_models(types.TransferRequest, types.Address)
+    assert types.TransferRequest.__pydantic_complete__
+
+
+def test_defer_build():
+    code = textwrap.dedent(
+        '''
+        from cuenca_validations.types import (
+            PartnerUpdateRequest,
+            TransferRequest,
+            UserRequest,
+            prebuild_models,
+        )
+        from cuenca_validations.types.morals import Shareholder
+
+        assert not TransferRequest.__pydantic_complete__
+        assert not UserRequest.__pydantic_complete__
+        prebuild_models(TransferRequest)
+        assert TransferRequest.__pydantic_complete__
+        assert not UserRequest.__pydantic_complete__
+
+        example = UserRequest.model_config['json_schema_extra']['example']
+        UserRequest(**{**example, 'profession': 'empleado'})
+        assert UserRequest.__pydantic_complete__
+        assert PartnerUpdateRequest.model_json_schema()
+        assert not Shareholder.__pydantic_complete__
+        print('ok')
+        '''
+    )
+    result = run_python(code, CUENCA_VALIDATIONS_DEFER_BUILD='1')
+    assert result.stdout.strip() == 'ok'
@@ -0,0 +1,174 @@
+import io
+import mmap
+from pathlib import Path
+
+import pytest
+
+from cuenca_validations.ingestion import ingest, read_csv, read_fixed_width
+from cuenca_validations.types.requests import (
+    StrictTransferRequest,
+    TransferRequest,
+)
+
+CLABE = '646180157034181180'
+CARD = '4772130000000003'
+PAYROLL_CSV = (
+    'recipient_name,account_number,amount,descriptor,idempotency_key,'
+    'user_id\r\n'
+    f'Doroteo Arango,{CLABE},10000,Nómina,KEY-1,US01\r\n'
+    f'Pedro Páramo,{CARD},2500,"Bono, marzo",KEY-2,\r\n'
+    '\r\n'
+    f'Juan Preciado,{CLABE},abc,Nómina,KEY-3,\r\n'
+    f'Susana San Juan,{CLABE},-5,Nómina,KEY-4,\r\n'
+    f'Doroteo Arango,{CLABE},10000,Nómina,KEY-1,\r\n'
+    f'Miguel Páramo,{CLABE},10000\r\n'
+    f'Fulgor Sedano,{CARD},700,Nómina,KEY-5,\r\n'
+)
+
+
+def check_payroll(rows: list) -> None:
+    assert [row.line for row in rows] == [2, 3, 5, 6, 7, 8, 9]
+    clabe, card, text, negative, duplicate, short, last = rows
+    assert clabe.ok and clabe.model.account_number == CLABE
+    assert clabe.model.amount == 10_000 and clabe.model.user_id == 'US01'
+    assert card.ok and card.model.descriptor == 'Bono, marzo'
+    assert card.model.user_id is None
+    assert [error['type'] for error in text.errors] == ['int_type']
+    assert text.errors[0]['loc'] == ('amount',)
+    assert [error['type'] for error in negative.errors] == ['greater_than']
+    assert duplicate.model is None
+    assert duplicate.errors[0]['type'] == 'duplicate_idempotency_key'
+    assert duplicate.errors[0]['msg'] == 'Already used on line 2'
+    assert duplicate.errors[0]['ctx'] == dict(first_line=2)
+    assert short.errors[0]['type'] == 'column_count'
+    assert short.errors[0]['msg'] == 'Expected 6 columns, got 3'
+    assert last.ok and last.model.amount == 700
+
+
+@pytest.mark.parametrize('chunk_size', [1, 3, 1000])
+def test_ingest_csv(chunk_size: int) -> None:
+    rows = ingest(
+        TransferRequest,
+        read_csv(PAYROLL_CSV.encode()),
+        chunk_size=chunk_size,
+    )
+    check_payroll(list(rows))
+
+
+@pytest.mark.parametrize(
+    'source',
+    [
+        io.StringIO(PAYROLL_CSV, newline=''),
+        io.BytesIO(PAYROLL_CSV.encode()),
+        bytearray(PAYROLL_CSV.encode()),
+    ],
+)
+def test_read_csv_sources(source) -> None:
+    check_payroll(list(ingest(TransferRequest, read_csv(source))))
+
+
+def test_read_csv_mmap(tmp_path: Path) -> None:
+    path = tmp_path / 'payroll.csv'
+    path.write_bytes(PAYROLL_CSV.encode())
+    with path.open('rb') as file:
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            check_payroll(list(ingest(TransferRequest, read_csv(buffer))))
+
+
+def test_read_csv_files(tmp_path: Path) -> None:
+    path = tmp_path / 'payroll.csv'
+    path.write_bytes(PAYROLL_CSV.encode())
+    with path.open('rb') as file:
+        check_payroll(list(ingest(TransferRequest, read_csv(file))))
+        # the file is still usable
+        assert not file.closed
+        file.seek(0)
+        assert file.readline().startswith(b'recipient_name')
+    with path.open('rb', buffering=0) as raw:
+        check_payroll(list(ingest(TransferRequest, read_csv(raw))))
+
+
+def test_read_csv_options() -> None:
+    data = f'Doroteo Arango;{CARD};100;Nómina;KEY-1'.encode('latin-1')
+    (row,) = read_csv(
+        data,
+        fieldnames=[
+            'recipient_name',
+            'account_number',
+            'amount',
+            'descriptor',
+            'idempotency_key',
+        ],
+        delimiter=';',
+        encoding='latin-1',
+    )
+    assert row.fields['amount'] == 100
+    assert row.fields['descriptor'] == 'Nómina'
+    assert list(read_csv(b'')) == []
+
+
+def test_ingest_fixed_width() -> None:
+    layout = dict(
+        recipient_name=(0, 20),
+        account_number=(20, 38),
+        amount=(38, 48),
+        descriptor=(48, 60),
+        idempotency_key=(60, 70),
+    )
+    lines = [
+        f'{"Doroteo Arango":20}{CLABE}{"10000":>10}{"Nómina":12}KEY-1',
+        '',
+        f'{"Pedro Páramo":20}{CARD:18}{"2500":>10}{"Bono":12}KEY-2',
+        f'{"Juan Preciado":20}{CARD:18}',
+    ]
+    data = '\n'.join(lines).encode()
+    rows = list(ingest(StrictTransferRequest, read_fixed_width(data, layout)))
+    assert [row.line for row in rows] == [1, 3, 4]
+    first, second, third = rows
+    assert first.model is not None and second.model is not None
+    assert first.model.recipient_name == 'Doroteo Arango'
+    assert first.model.amount == 10_000
+    assert second.model.idempotency_key == 'KEY-2'
+    assert {error['loc'] for error in third.errors} == {
+        ('amount',),
+        ('descriptor',),
+        ('idempotency_key',),
+    }
+
+
+def test_ingest_processes() -> None:
+    rows = ingest(
+        TransferRequest,
+        read_csv(PAYROLL_CSV.encode()),
+        chunk_size=2,
+        processes=2,
+    )
+    check_payroll(list(rows))
+
+
+def test_ingest_processes_stop_early() -> None:
+    data = PAYROLL_CSV.encode() * 2
+    rows = ingest(TransferRequest, read_csv(data), chunk_size=1, processes=1)
+    assert next(rows).ok
+    rows.close()
+
+
+def test_ingest_unique_transfers() -> None:
+    data = (
+        'recipient_name,account_number,amount,descriptor,idempotency_key\n'
+        f'Doroteo Arango,{CLABE},10000,Nómina,KEY-1\n'
+        f'Doroteo Arango,{CLABE},10000,Bono,KEY-2\n'
+        f'Doroteo Arango,{CLABE},10000,Nómina,KEY-3\n'
+    ).encode()
+    rows = list(ingest(TransferRequest, read_csv(data)))
+    assert all(row.ok for row in rows)
+    rows = list(ingest(TransferRequest, read_csv(data), unique_transfers=True))
+    assert [row.ok for row in rows] == [True, True, False]
+    (error,) = rows[2].errors
+    assert error['type'] == 'duplicate_transfer'
+    assert error['loc'] == ()
+    assert error['msg'] == (
+        'Same account_number, amount and descriptor as the transfer on '
+        'line 2'
+    )
+    assert error['ctx'] == dict(first_line=2)
@@ -0,0 +1,271 @@
+import json
+import socket
+from typing import Iterator
+
+import pytest
+from pydantic import BaseModel, ConfigDict, ValidationError
+from pydantic_core import SchemaValidator
+
+from cuenca_validations import instrumentation
+from cuenca_validations.types import (
+    CurpValidationRequest,
+    QueryParams,
+    StrictTransferRequest,
+    TransferRequest,
+    UserQuery,
+)
+from cuenca_validations.types.requests import BaseRequest
+
+TRANSFER = dict(
+    recipient_name='Doroteo Arango',
+    account_number='646180157034181180',
+    amount=10000,
+    descriptor='Mezcal, pulque y tequila',
+    idempotency_key='UNIQUE-KEY-003',
+)
+
+
+@pytest.fixture
+def sink() -> Iterator[instrumentation.InMemorySink]:
+    sink = instrumentation.InMemorySink()
+    instrumentation.enable(sink)
+    yield sink
+    instrumentation.disable()
+
+
+def test_enable_disable():
+    assert not instrumentation.is_enabled()
+    instrumentation.enable(instrumentation.InMemorySink())
+    assert instrumentation.is_enabled()
+    for model in (BaseRequest, QueryParams, TransferRequest, UserQuery):
+        assert not isinstance(model.__pydantic_validator__, SchemaValidator)
+    assert '__pydantic_init_subclass__' in BaseRequest.__dict__
+    instrumentation.disable()
+    assert not instrumentation.is_enabled()
+    for model in (BaseRequest, QueryParams, TransferRequest, UserQuery):
+        assert isinstance(model.__pydantic_validator__, SchemaValidator)
+        assert '__pydantic_init_subclass__' not in model.__dict__
+    assert not TransferRequest.__pydantic_custom_init__
+    assert TransferRequest(**TRANSFER)
+
+
+def test_records_latency(sink):
+    TransferRequest(**TRANSFER)
+    TransferRequest.model_validate(TRANSFER)
+    TransferRequest.model_validate_json(json.dumps(TRANSFER))
+    UserQuery.model_validate(dict(curp='GOCG650418HVZNML08'))
+    UserQuery.model_validate_strings(dict(page_size='10'))
+    assert sink.latencies['TransferRequest'].count == 3
+    assert sink.latencies['UserQuery'].count == 2
+    assert not sink.failures
+    assert not sink.errors
+
+
+def test_records_errors(sink):
+    with pytest.raises(ValidationError):
+        StrictTransferRequest(
+            **{**TRANSFER, 'account_number': '4000000000000002'}
+        )
+    with pytest.raises(ValidationError):
+        CurpValidationRequest.model_validate(
+            dict(manual_curp='ABCD240614HDFSRN03')
+        )
+    with pytest.raises(ValidationError):
+        TransferRequest.model_validate_json('{}')
+    assert sink.failures == dict(
+        StrictTransferRequest=1, CurpValidationRequest=1, TransferRequest=1
+    )
+    assert (
+        sink.errors[
+            'StrictTransferRequest',
+            'account_number',
+            'payment_card_number.bin',
+        ]
+        == 1
+    )
+    assert (
+        sink.errors['CurpValidationRequest', 'manual_curp', 'value_error'] == 1
+    )
+    assert sink.errors['TransferRequest', 'amount', 'missing'] == 1
+    assert sink.latencies['TransferRequest'].count == 1
+
+
+def test_root_errors(sink):
+    with pytest.raises(ValidationError):
+        TransferRequest.model_validate([])
+    assert sink.errors['TransferRequest', '__root__', 'model_type'] == 1
+
+
+def test_enable_twice_replaces_sink(sink):
+    other = instrumentation.InMemorySink()
+    instrumentation.enable(other)
+    TransferRequest(**TRANSFER)
+    assert not sink.latencies
+    assert other.latencies['TransferRequest'].count == 1
+
+
+def test_enable_custom_models():
+    class Custom(BaseModel):
+        value: int
+
+    sink = instrumentation.InMemorySink()
+    instrumentation.enable(sink, [Custom])
+    try:
+        Custom(value=1)
+        TransferRequest(**TRANSFER)
+    finally:
+        instrumentation.disable()
+    assert list(sink.latencies) == ['Custom']
+
+
+def test_enable_model_with_own_init(sink):
+    class Custom(BaseRequest):
+        def __init__(self, **data) -> None:
+            super().__init__(**data)
+
+    Custom()
+    assert sink.latencies['Custom'].count == 1
+
+
+def test_enable_overlapping_models():
+    sink = instrumentation.InMemorySink()
+    instrumentation.enable(sink, [BaseRequest, TransferRequest])
+    try:
+
+        class Late(TransferRequest):
+            pass
+
+        TransferRequest(**TRANSFER)
+        Late(**TRANSFER)
+    finally:
+        instrumentation.disable()
+    assert sink.latencies['TransferRequest'].count == 1
+    assert sink.latencies['Late'].count == 1
+
+
+def test_enable_model_with_own_init_subclass():
+    class Custom(BaseModel):
+        @classmethod
+        def __pydantic_init_subclass__(cls, **kwargs) -> None:
+            pass
+
+    with pytest.raises(ValueError, match='already defines'):
+        instrumentation.enable(
+            instrumentation.InMemorySink(), [BaseRequest, Custom]
+        )
+    assert not instrumentation.is_enabled()
+    assert '__pydantic_init_subclass__' not in BaseRequest.__dict__
+
+
+def test_models_defined_while_enabled(sink):
+    class Late(BaseRequest):
+        value: int
+
+    class Deferred(Late):
+        model_config = ConfigDict(defer_build=True)
+
+    assert not Late.__pydantic_custom_init__
+    assert not Deferred.__pydantic_complete__
+    Late(value=1)
+    Late.model_validate(dict(value=1))
+    for _ in range(2):
+        Deferred(value=1)
+    assert Deferred.__pydantic_complete__
+    assert Deferred.__pydantic_validator__.title == 'Deferred'
+    assert sink.latencies['Late'].count == 2
+    assert sink.latencies['Deferred'].count == 2
+    instrumentation.disable()
+    for model in (Late, Deferred):
+        assert isinstance(model.__pydantic_validator__, SchemaValidator)
+    Deferred(value=1)
+    assert sink.latencies['Deferred'].count == 2
+
+
+def test_histogram():
+    histogram = instrumentation.Histogram((0.1, 1.0, float('inf')))
+    for value in (0.05, 0.1, 0.5, 5.0):
+        histogram.observe(value)
+    assert histogram.counts == [2, 1, 1]
+    assert histogram.cumulative_counts() == [2, 3, 4]
+    assert histogram.count == 4
+    assert histogram.sum == pytest.approx(5.65)
+
+
+def test_to_prometheus():
+    sink = instrumentation.InMemorySink(buckets=(0.001, float('inf')))
+    sink.record('TransferRequest', 0.0005, ())
+    sink.record('TransferRequest', 0.002, [('amount', 'missing')])
+    sink.record('Model"', 0.0001, [('field', 'type\\')])
+    assert sink.to_prometheus() == (
+        '# HELP cuenca_validations_validation_seconds Validation latency '
+        'per model.\n'
+        '# TYPE cuenca_validations_validation_seconds histogram\n'
+        'cuenca_validations_validation_seconds_bucket'
+        '{model="Model\\"",le="0.001"} 1\n'
+        'cuenca_validations_validation_seconds_bucket'
+        '{model="Model\\"",le="+Inf"} 1\n'
+        'cuenca_validations_validation_seconds_sum{model="Model\\""} 0.0001\n'
+        'cuenca_validations_validation_seconds_count{model="Model\\""} 1\n'
+        'cuenca_validations_validation_seconds_bucket'
+        '{model="TransferRequest",le="0.001"} 1\n'
+        'cuenca_validations_validation_seconds_bucket'
+        '{model="TransferRequest",le="+Inf"} 2\n'
+        'cuenca_validations_validation_seconds_sum'
+        '{model="TransferRequest"} 0.0025\n'
+        'cuenca_validations_validation_seconds_count'
+        '{model="TransferRequest"} 2\n'
+        '# HELP cuenca_validations_validation_failures_total Rejected '
+        'validations per model.\n'
+        '# TYPE cuenca_validations_validation_failures_total counter\n'
+        'cuenca_validations_validation_failures_total{model="Model\\""} 1\n'
+        'cuenca_validations_validation_failures_total'
+        '{model="TransferRequest"} 1\n'
+        '# HELP cuenca_validations_validation_errors_total Validation errors '
+        'per model, field and error type.\n'
+        '# TYPE cuenca_validations_validation_errors_total counter\n'
+        'cuenca_validations_validation_errors_total'
+        '{model="Model\\"",field="field",type="type\\\\"} 1\n'
+        'cuenca_validations_validation_errors_total'
+        '{model="TransferRequest",field="amount",type="missing"} 1\n'
+    )
+    sink.reset()
+    assert 'TransferRequest' not in sink.to_prometheus()
+
+
+@pytest.fixture
+def statsd_server() -> Iterator[socket.socket]:
+    server = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    server.bind(('127.0.0.1', 0))
+    server.settimeout(2)
+    yield server
+    server.close()
+
+
+def test_statsd_sink(statsd_server):
+    sink = instrumentation.StatsdSink(
+        port=statsd_server.getsockname()[1], prefix='cv'
+    )
+    instrumentation.enable(sink)
+    try:
+        TransferRequest(**TRANSFER)
+        with pytest.raises(ValidationError):
+            TransferRequest.model_validate({**TRANSFER, 'amount': 0})
+    finally:
+        instrumentation.disable()
+        sink.close()
+
+    success = statsd_server.recv(1024).decode()
+    assert success.startswith('cv.TransferRequest.validation:')
+    assert success.endswith('|ms')
+    failure = statsd_server.recv(1024).decode().split('\n')
+    assert failure[0].startswith('cv.TransferRequest.validation:')
+    assert failure[1:] == [
+        'cv.TransferRequest.failures:1|c',
+        'cv.TransferRequest.errors.amount.greater_than:1|c',
+    ]
+
+
+def test_statsd_sink_ignores_send_errors():
+    sink = instrumentation.StatsdSink()
+    sink.close()
+    sink.record('TransferRequest', 0.001, ())
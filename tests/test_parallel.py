@@ -0,0 +1,126 @@
+from concurrent.futures import Future
+
+import pytest
+
+from cuenca_validations.parallel import (
+    MAX_CHUNK_SIZE,
+    MIN_CHUNK_SIZE,
+    ParallelValidator,
+    Payload,
+    _check_chunk,
+    _validate_chunk,
+    _warm_up,
+)
+from cuenca_validations.types.requests import (
+    CurpValidationRequest,
+    UserUpdateRequest,
+    validate_batch,
+)
+
+CURP = dict(
+    names='Guillermo',
+    first_surname='Gonzalez',
+    date_of_birth='1965-04-18',
+    state_of_birth='VZ',
+    gender='male',
+    country_of_birth='MX',
+)
+
+
+def summary(errors: dict) -> dict:
+    # the ctx of value errors has exceptions, which aren't equal
+    return {
+        position: [
+            (error['type'], error['loc'], error['msg']) for error in items
+        ]
+        for position, items in errors.items()
+    }
+
+
+@pytest.fixture(scope='module')
+def validator():
+    with ParallelValidator(
+        [CurpValidationRequest, UserUpdateRequest], processes=2
+    ) as validator:
+        yield validator
+
+
+def test_validate_matches_validate_batch(validator) -> None:
+    payloads: list[Payload] = []
+    for i in range(100):
+        payload = dict(CURP)
+        if i % 7 == 0:
+            payload['date_of_birth'] = 'not a date'
+        payloads.append(payload)
+    payloads.insert(50, b'{"names": 1}')
+    result = validator.validate(CurpValidationRequest, payloads)
+    expected = validate_batch(CurpValidationRequest, payloads)
+    assert result.models == expected.models
+    assert list(result.errors) == sorted(expected.errors)
+    assert summary(result.errors) == summary(expected.errors)
+    assert CurpValidationRequest in validator.item_seconds
+
+
+def test_validate_empty(validator) -> None:
+    result = validator.validate(UserUpdateRequest, [])
+    assert result.models == [] and result.errors == {}
+
+
+def test_validate_chunks(validator) -> None:
+    chunks = ([CURP] * size for size in (3, 0, 2))
+    results = validator.validate_chunks(CurpValidationRequest, chunks)
+    assert [len(result.models) for result in results] == [3, 0, 2]
+
+
+def test_check_chunks(validator) -> None:
+    invalid = dict(CURP, date_of_birth='not a date')
+    chunks = [[CURP, invalid, CURP], [], [invalid]]
+    results = list(validator.check_chunks(CurpValidationRequest, chunks))
+    assert [sorted(errors) for errors in results] == [[1], [], [0]]
+    assert results[0][1][0]['loc'] == ('date_of_birth',)
+
+
+def test_worker_error_cancels_pending_chunks(monkeypatch) -> None:
+    cancelled: list[Future] = []
+    cancel = Future.cancel
+
+    def record_cancel(future: Future) -> bool:
+        cancelled.append(future)
+        return cancel(future)
+
+    monkeypatch.setattr(Future, 'cancel', record_cancel)
+    # lambdas can't be pickled, so the first chunk fails
+    payloads = [dict(CURP, names=lambda: None)] + [CURP] * 30
+    with ParallelValidator([CurpValidationRequest], processes=1) as validator:
+        with pytest.raises(Exception):
+            validator.validate(CurpValidationRequest, payloads)
+        assert len(cancelled) == 1
+        # the pool is still usable
+        result = validator.validate(CurpValidationRequest, [CURP])
+        assert result.models[0] is not None
+
+
+def test_chunk_size() -> None:
+    validator = ParallelValidator(processes=4, target_seconds=0.01)
+    try:
+        assert validator.chunk_size(UserUpdateRequest, 1000) == MIN_CHUNK_SIZE
+        assert validator.chunk_size(UserUpdateRequest, 3) == 1
+        validator.item_seconds[UserUpdateRequest] = 0.0001
+        assert validator.chunk_size(UserUpdateRequest, 1000) == 100
+        # an even share of what's left for each process
+        assert validator.chunk_size(UserUpdateRequest, 200) == 50
+        validator.item_seconds[UserUpdateRequest] = 0.0
+        assert validator.chunk_size(UserUpdateRequest, 10**6) == MAX_CHUNK_SIZE
+    finally:
+        validator.close()
+
+
+def test_worker_functions() -> None:
+    # what the workers run, in this process
+    _warm_up((CurpValidationRequest,))
+    result, seconds = _validate_chunk(CurpValidationRequest, [CURP])
+    assert result.models[0] is not None
+    assert seconds > 0
+    errors, seconds = _check_chunk(CurpValidationRequest, [{}, CURP])
+    assert list(errors) == [0]
+    assert seconds > 0
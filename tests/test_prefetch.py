@@ -0,0 +1,233 @@
+import asyncio
+import http.client
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Iterator
+
+import pytest
+from pydantic import ValidationError
+
+from cuenca_validations.prefetch import (
+    BatchPrefetch,
+    ConnectionPool,
+    prefetch_batch,
+)
+from cuenca_validations.types.enums import FileExtension
+
+JPEG = b'\xff\xd8\xff\xe0\x00\x10JFIF\x00' + bytes(1000)
+PDF = b'%PDF-1.7\n' + bytes(1000)
+
+
+class Server(ThreadingHTTPServer):
+    daemon_threads = True
+    active = 0
+    max_active = 0
+    connections = 0
+    delay = 0.0
+
+
+class FileHandler(BaseHTTPRequestHandler):
+    """
+    /ine.jpg honours Range, /full.pdf ignores it, /close.jpg drops the
+    connection after answering as if it were kept alive, /text.txt isn't
+    a known format and anything else is a 404
+    """
+
+    protocol_version = 'HTTP/1.1'
+    # one write per response, so it isn't held back by Nagle's algorithm
+    wbufsize = -1
+    disable_nagle_algorithm = True
+    server: Server
+
+    def setup(self) -> None:
+        super().setup()
+        with lock:
+            self.server.connections += 1
+
+    def log_message(self, *args) -> None:
+        pass
+
+    def do_GET(self) -> None:
+        with lock:
+            self.server.active += 1
+            self.server.max_active = max(
+                self.server.max_active, self.server.active
+            )
+        try:
+            time.sleep(self.server.delay)
+            self.respond()
+        finally:
+            with lock:
+                self.server.active -= 1
+
+    def respond(self) -> None:
+        path = self.path.split('?')[0]
+        if path in ('/ine.jpg', '/close.jpg'):
+            _, start, end = re.split('[=-]', self.headers['Range'])
+            first, last = int(start), int(end) + 1
+            body = JPEG[first:last]
+            self.send_response(206)
+            self.send_header('Content-Type', 'image/jpeg')
+        elif path == '/full.pdf':
+            body = PDF
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/pdf')
+        elif path == '/text.txt':
+            body = b'plain text'
+            self.send_response(200)
+        else:
+            body = b'not found'
+            self.send_response(404)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+        if path == '/close.jpg':
+            self.close_connection = True
+
+
+lock = threading.Lock()
+
+
+@pytest.fixture
+def server() -> Iterator[Server]:
+    server = Server(('127.0.0.1', 0), FileHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def base_url(server: Server) -> str:
+    host, port = server.server_address[:2]
+    return f'http://{host!s}:{port}'
+
+
+def batch_data(server: Server, *paths: str) -> dict:
+    return dict(
+        user_id='US01',
+        files=[
+            dict(url=f'{base_url(server)}{path}', type='ine') for path in paths
+        ],
+    )
+
+
+def prefetch(data: dict, **kwargs) -> BatchPrefetch:
+    return asyncio.run(prefetch_batch(data, **kwargs))
+
+
+def test_prefetch_batch(server: Server) -> None:
+    data = batch_data(
+        server, '/ine.jpg', '/full.pdf?signature=1', '/missing', '/text.txt'
+    )
+    data['files'].insert(2, dict(url='not a url', type='selfie'))
+    batch = prefetch(data)
+    assert [file.index for file in batch.files] == [0, 1, 2, 3, 4]
+    ine, pdf, invalid, missing, text = batch.files
+    assert ine.ok and ine.content_type == 'image/jpeg'
+    assert ine.extensions == {FileExtension.jpg, FileExtension.jpeg}
+    assert pdf.ok and pdf.extensions == {FileExtension.pdf}
+    assert invalid.file is None
+    assert invalid.error is not None
+    assert invalid.error.startswith('url: Input should be a valid URL')
+    assert 'type: Input should be' in invalid.error
+    assert missing.error == 'Download failed with status 404'
+    assert text.error == 'Unrecognized file format'
+    assert batch.errors == [invalid, missing, text]
+    assert batch.request.user_id == 'US01'
+    assert batch.request.files == [ine.file, pdf.file]
+
+
+def test_prefetch_batch_download_error() -> None:
+    # nothing listens on port 9 (discard)
+    data = dict(
+        user_id='US01',
+        files=[dict(url='http://127.0.0.1:9/ine.jpg', type='ine')],
+    )
+    (file,) = prefetch(data, timeout=1).files
+    assert file.error is not None
+    assert file.error.startswith('Download failed: ConnectionRefusedError')
+
+
+@pytest.mark.parametrize(
+    'data', [dict(user_id='US01'), dict(files=[]), dict(files='files')]
+)
+def test_prefetch_batch_invalid_request(data: dict) -> None:
+    with pytest.raises(ValidationError):
+        prefetch(data)
+
+
+def test_prefetch_batch_concurrency(server: Server) -> None:
+    server.delay = 0.02
+    batch = prefetch(batch_data(server, *['/ine.jpg'] * 20), concurrency=4)
+    assert not batch.errors
+    assert 1 < server.max_active <= 4
+    # connections are kept alive and shared between requests
+    assert server.connections <= 4
+
+
+def test_prefetch_batch_cancel(server: Server) -> None:
+    server.delay = 0.5
+    data = batch_data(server, *['/ine.jpg'] * 8)
+
+    async def cancel() -> float:
+        start = time.perf_counter()
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(prefetch_batch(data, concurrency=2), 0.05)
+        return time.perf_counter() - start
+
+    # the running downloads don't hold the event loop back
+    assert asyncio.run(cancel()) < 0.4
+    time.sleep(0.6)
+    # the pending downloads were dropped
+    assert server.connections == 2
+
+
+def test_connection_pool_closed(server: Server) -> None:
+    pool = ConnectionPool()
+    url = f'{base_url(server)}/ine.jpg'
+    pool.close()
+    assert pool.fetch_head(url).status == 206
+    assert not any(pool._idle.values())
+
+
+def test_connection_pool_reuses_connections(server: Server) -> None:
+    pool = ConnectionPool()
+    for _ in range(3):
+        assert pool.fetch_head(f'{base_url(server)}/ine.jpg').head == JPEG[:32]
+    # the full body wasn't read, so that connection isn't reused
+    assert pool.fetch_head(f'{base_url(server)}/full.pdf').head == PDF[:32]
+    assert pool.fetch_head(f'{base_url(server)}/ine.jpg', 4).head == JPEG[:4]
+    pool.close()
+    assert server.connections == 2
+
+
+def test_connection_pool_retries_closed_connections(server: Server) -> None:
+    pool = ConnectionPool()
+    for _ in range(2):
+        head = pool.fetch_head(f'{base_url(server)}/close.jpg')
+        assert head.status == 206 and head.head == JPEG[:32]
+    pool.close()
+    assert server.connections == 2
+
+
+def test_connection_pool_connection_errors(monkeypatch) -> None:
+    pool = ConnectionPool()
+    with pytest.raises(ConnectionRefusedError):
+        pool.fetch_head('http://127.0.0.1:9')
+
+    def disconnected(*args, **kwargs):
+        raise http.client.RemoteDisconnected('closed')
+
+    monkeypatch.setattr(http.client.HTTPConnection, 'request', disconnected)
+    with pytest.raises(http.client.RemoteDisconnected):
+        pool.fetch_head('http://127.0.0.1:9')
+
+
+def test_connection_pool_https() -> None:
+    pool = ConnectionPool()
+    connection, reused = pool._acquire(('https', 'cuenca.com', None))
+    assert isinstance(connection, http.client.HTTPSConnection)
+    assert not reused
@@ -1,5 +1,5 @@
 import pytest
-from pydantic import ValidationError
+from pydantic import BaseModel, ValidationError, field_validator
 from pydantic_extra_types.phone_numbers import PhoneNumber
 
 from cuenca_validations.types.enums import VerificationType
@@ -9,6 +9,7 @@ from cuenca_validations.types.requests import (
     UserTOSAgreementRequest,
     UserUpdateRequest,
     VerificationRequest,
+    validate_batch,
 )
 from cuenca_validations.typing import DictStrAny
 
@@ -123,3 +124,70 @@ def test_update_transfer_request_forbids_extra() -> None:
             {'status': 'succeeded', 'foo': 'bar'}
         )
     assert 'Extra inputs are not permitted' in str(ex.value)
+
+
+def test_validate_batch_splits_valid_and_invalid_items() -> None:
+    items: list = [
+        {'status': 'succeeded'},
+        {'status': 'created'},
+        b'{"status": "failed"}',
+        '{"status": "unknown"}',
+        {'status': 'failed', 'extra': True},
+        {'status': 'succeeded'},
+    ]
+    result = validate_batch(UpdateTransferRequest, items)
+    assert [m.status if m else None for m in result.models] == [
+        'succeeded',
+        None,
+        'failed',
+        None,
+        None,
+        'succeeded',
+    ]
+    assert sorted(result.errors) == [1, 3, 4]
+    assert result.errors[1][0]['loc'] == ('status',)
+    assert result.errors[3][0]['type'] == 'enum'
+    assert result.errors[4][0]['loc'] == ('extra',)
+    assert len(result.valid) == 3
+
+
+def test_validate_batch_validates_each_item_once() -> None:
+    validated: list[str] = []
+
+    class CountedRequest(BaseModel):
+        name: str
+
+        @field_validator('name')
+        @classmethod
+        def count(cls, name: str) -> str:
+            validated.append(name)
+            if name == 'invalid':
+                raise ValueError('invalid name')
+            return name
+
+    names = ['a', 'invalid', 'b', 'invalid', 'c']
+    result = validate_batch(CountedRequest, [dict(name=n) for n in names])
+    assert validated == names
+    assert [m.name if m else None for m in result.models] == [
+        'a',
+        None,
+        'b',
+        None,
+        'c',
+    ]
+    assert sorted(result.errors) == [1, 3]
+    assert result.errors[1][0]['loc'] == ('name',)
+
+
+def test_validate_batch_accepts_iterators() -> None:
+    result = validate_batch(
+        UpdateTransferRequest, ({'status': 'failed'} for _ in range(3))
+    )
+    assert not result.errors
+    assert all(m and m.status == 'failed' for m in result.models)
+
+
+def test_validate_batch_empty() -> None:
+    result = validate_batch(UpdateTransferRequest, [])
+    assert result.models == []
+    assert result.errors == {}
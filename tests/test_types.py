@@ -1,58 +1,108 @@
+import array
+import base64
 import datetime as dt
+import io
 import json
+import mmap
 from dataclasses import dataclass
 from enum import Enum
-from typing import Annotated
+from typing import Annotated, Any, Optional, Union
 
 import pytest
 from clabe import Clabe
 from freezegun import freeze_time
-from pydantic import AfterValidator, BaseModel, SecretStr, ValidationError
+from pydantic import (
+    AfterValidator,
+    BaseModel,
+    Field,
+    SecretStr,
+    TypeAdapter,
+    ValidationError,
+)
 from pydantic.fields import FieldInfo
+from pydantic_core import PydanticSerializationError
 
 from cuenca_validations.types import (
+    BalanceEntryQuery,
     CardQuery,
+    Cursor,
+    DepositQuery,
+    Filter,
     FraudFundsTransferRequest,
+    IdList,
     JSONEncoder,
+    QueryFilters,
     QueryParams,
     SantizedDict,
     SessionRequest,
     TransactionStatus,
+    TransferQuery,
     UserQuery,
     digits,
+    enums,
+    files,
     get_account_use_type_name,
     get_income_type_name,
     get_monthly_movements_type_name,
     get_monthly_spending_type_name,
     get_profession_name,
     get_state_name,
+    id_list,
 )
 from cuenca_validations.types.enums import (
     AccountUseType,
     EcommerceIndicator,
+    FileExtension,
     IncomeType,
     MonthlyMovementsType,
     MonthlySpendingType,
     Profession,
     SessionType,
     State,
+    TrackDataMethod,
+)
+from cuenca_validations.types.general import (
+    STREAM_CHUNK_SIZE,
+    EnumCoercer,
+    EnumLabels,
+    LogConfig,
+    StrictPositiveInt,
+    enum_coercer,
+    income_type_labels,
+    lenient_enum,
+    profession_labels,
+    state_labels,
+)
+from cuenca_validations.types.helpers import (
+    get_log_config,
+    get_log_plan,
+    mask_value,
+    uuid_field,
+)
+from cuenca_validations.types.identities import (
+    ADDRESS_REQUEST_EXAMPLE,
+    AddressRequest,
+    Password,
 )
-from cuenca_validations.types.general import LogConfig, StrictPositiveInt
-from cuenca_validations.types.helpers import get_log_config
-from cuenca_validations.types.identities import Password
+from cuenca_validations.types.queries import MAX_CURSOR_LENGTH
 from cuenca_validations.types.requests import (
     ApiKeyUpdateRequest,
     BankAccountValidationRequest,
+    BaseRequest,
     ChargeRequest,
     CurpValidationRequest,
     EndpointRequest,
     EndpointUpdateRequest,
+    FileUploadRequest,
     LimitedWalletRequest,
     SavingRequest,
     SavingUpdateRequest,
+    StrictFileUploadRequest,
+    TransferRequest,
     UserCardNotificationRequest,
     UserCredentialUpdateRequest,
     UserListsRequest,
+    UserLoginRequest,
     UserRequest,
     UserUpdateRequest,
     VerificationAttemptRequest,
@@ -61,6 +111,9 @@ from cuenca_validations.types.requests import (
 
 today = dt.date.today()
 now = dt.datetime.now()
+USER_IDS = tuple(f'US{i:022}' for i in range(101))
+TRANSFER_IDS = tuple(f'TR{i:022}' for i in range(2))
+CARD_IDS = tuple(f'CA{i:022}' for i in range(2))
 utcnow = now.astimezone(dt.timezone.utc)
 
 
@@ -135,6 +188,8 @@ def test_count(count, truth):
         (now, utcnow.isoformat()),
         (DictModel(uno='uno'), dict(uno='uno', dos='dos')),
         (b'test', 'dGVzdA=='),  # b64 encode
+        ({today}, [today.isoformat()]),
+        (frozenset([EnumModel.zero]), [0]),
     ],
 )
 def test_json_encoder(value, result):
@@ -159,6 +214,90 @@ def test_invalid_class():
         json.dumps(invalid_class, cls=JSONEncoder)
 
 
+STREAM_CASES = [
+    1,
+    [],
+    {},
+    dict(value=now, status=TransactionStatus.succeeded),
+    {1: ['int'], 1.5: 'float', False: 'bool', None: 'none'},
+    dict(items=[dict(id=i, created_at=now, tags=[i]) for i in range(1500)]),
+    list(range(2500)),
+    [[1], 2, [[3]], dict(a=dict(b=b'test')), DictModel(uno='uno')] * 500,
+    dict(big={str(i): [i] for i in range(1200)}),
+]
+
+
+@pytest.mark.parametrize('value', STREAM_CASES)
+@pytest.mark.parametrize(
+    'options', [dict(), dict(sort_keys=True), dict(indent=2)]
+)
+def test_json_encoder_stream(value, options):
+    if options.get('sort_keys') and isinstance(value, dict) and None in value:
+        return  # mixed key types can't be sorted
+    chunks = list(JSONEncoder(**options).stream(value, chunk_size=64))
+    assert ''.join(chunks) == json.dumps(value, cls=JSONEncoder, **options)
+
+
+@pytest.mark.parametrize('options', [dict(), dict(indent=2)])
+def test_json_encoder_stream_iterators(options):
+    rows = (dict(id=i, created_at=today) for i in range(3))
+    value = dict(rows=rows, ids=iter([1, 2]), nested=[iter([[3]])])
+    assert ''.join(JSONEncoder(**options).stream(value)) == json.dumps(
+        dict(
+            rows=[dict(id=i, created_at=today) for i in range(3)],
+            ids=[1, 2],
+            nested=[[[3]]],
+        ),
+        cls=JSONEncoder,
+        **options,
+    )
+    with pytest.raises(TypeError):
+        json.dumps(iter([1]), cls=JSONEncoder, **options)
+
+
+def test_json_encoder_stream_to():
+    value = dict(items=[dict(created_at=now)] * 3, nested=[[b'test']])
+    expected = json.dumps(value, cls=JSONEncoder)
+    text, binary = io.StringIO(), io.BytesIO()
+    JSONEncoder().stream_to(value, text)
+    JSONEncoder().stream_to(value, binary)
+    assert text.getvalue() == expected
+    assert binary.getvalue() == expected.encode()
+
+
+def test_json_encoder_stream_binary():
+    content = bytes(range(256)) * (STREAM_CHUNK_SIZE // 128)
+    value = dict(
+        files=[content, memoryview(content), io.BytesIO(content)],
+        small=bytearray(b'test'),
+    )
+    encoded = base64.b64encode(content).decode()
+    chunks = list(JSONEncoder().stream(value, chunk_size=1024))
+    assert ''.join(chunks) == json.dumps(
+        dict(files=[encoded] * 3, small='dGVzdA==')
+    )
+    assert max(map(len, chunks)) < len(encoded)
+
+
+def test_json_encoder_stream_keys():
+    value = {('tuple',): 1, 'nested': [1]}
+    with pytest.raises(TypeError):
+        ''.join(JSONEncoder().stream(value))
+    skipped = ''.join(JSONEncoder(skipkeys=True).stream(value))
+    assert skipped == json.dumps(value, cls=JSONEncoder, skipkeys=True)
+
+
+def test_json_encoder_stream_circular() -> None:
+    value: list = [[1]]
+    value.append(value)
+    with pytest.raises(ValueError, match='Circular reference'):
+        ''.join(JSONEncoder().stream(value))
+    unchecked: list = [[1], [2]]
+    assert ''.join(JSONEncoder(check_circular=False).stream(unchecked)) == (
+        '[[1], [2]]'
+    )
+
+
 class Accounts(BaseModel):
     number: digits(5, 8)  # type: ignore
 
@@ -249,11 +388,12 @@ def test_user_query_rejects_invalid(field, value):
 
 
 def test_user_query_accepts_ids_and_is_blocked():
-    query = UserQuery(ids='US1,US2', is_blocked=True)
-    assert query.ids == 'US1,US2'
+    ids = f'{USER_IDS[0]},{USER_IDS[1]}'
+    query = UserQuery(ids=ids, is_blocked=True)
+    assert query.ids == ids
     assert query.is_blocked is True
     dumped = query.model_dump(exclude_none=True)
-    assert dumped['ids'] == 'US1,US2'
+    assert dumped['ids'] == ids
     assert dumped['is_blocked'] is True
     assert isinstance(dumped['ids'], str)
 
@@ -270,7 +410,21 @@ def test_query_params_ids_none():
 
 def test_user_query_rejects_ids_over_limit():
     with pytest.raises(ValidationError):
-        UserQuery(ids=','.join(f'US{i}' for i in range(101)))
+        UserQuery(ids=','.join(USER_IDS))
+
+
+@pytest.mark.parametrize(
+    'query,ids',
+    [
+        (UserQuery, 'US1'),
+        (UserQuery, TRANSFER_IDS[0]),
+        (TransferQuery, USER_IDS[0]),
+        (CardQuery, f'CA{"0" * 21}'),
+    ],
+)
+def test_query_rejects_ids_with_wrong_format(query, ids):
+    with pytest.raises(ValidationError, match='invalid ids'):
+        query(ids=ids)
 
 
 def test_user_query_ids_empty_string_ok():
@@ -279,6 +433,38 @@ def test_user_query_ids_empty_string_ok():
     assert 'ids' in query.model_dump(exclude_none=True)
 
 
+def test_query_params_ids_parsed_once():
+    query = QueryParams(ids=' US1, US2,,US1 ,US3')
+    assert isinstance(query.ids, IdList)
+    assert query.ids == 'US1,US2,US3'
+    assert query.ids.ids == ('US1', 'US2', 'US3')
+    assert query.ids.id_set == frozenset({'US1', 'US2', 'US3'})
+    assert query.ids.id_set is query.ids.id_set
+    assert query.model_dump()['ids'] == 'US1,US2,US3'
+    assert query.model_dump_json(exclude_defaults=True) == (
+        '{"ids":"US1,US2,US3"}'
+    )
+
+
+def test_query_params_ids_limit_counts_unique_ids():
+    query = QueryParams(ids=','.join(['US1'] * 101))
+    assert query.ids is not None and query.ids.ids == ('US1',)
+
+
+def test_id_list_with_prefix():
+    ids = [uuid_field('TR')() for _ in range(3)]
+    adapter = TypeAdapter(id_list('TR'))
+    parsed = adapter.validate_python(','.join(ids))
+    assert parsed.ids == tuple(ids)
+    assert isinstance(parsed, IdList)
+    assert id_list('TR') is type(parsed)
+    wrong_prefix = 'US' + ids[1][2:]
+    with pytest.raises(
+        ValidationError, match=f'invalid ids: TR1, {wrong_prefix}'
+    ):
+        adapter.validate_python(f'{ids[0]},TR1,{wrong_prefix}')
+
+
 def test_user_query_ids_none_excluded_from_dump():
     query = UserQuery()
     dumped = query.model_dump(exclude_none=True)
@@ -286,6 +472,170 @@ def test_user_query_ids_none_excluded_from_dump():
     assert 'is_blocked' not in dumped
 
 
+def test_query_params_ids_any_prefix():
+    # queries over resources with mixed ids keep accepting any value
+    query = QueryParams(ids=f'{USER_IDS[0]},{TRANSFER_IDS[0]},ID1')
+    assert type(query.ids) is IdList
+    assert query.ids.ids == (USER_IDS[0], TRANSFER_IDS[0], 'ID1')
+    assert type(UserQuery(ids=USER_IDS[0]).ids) is id_list('US')
+
+
+def test_query_to_filters():
+    query = CardQuery.model_validate(
+        dict(
+            count='true',
+            page_size='20',
+            created_after='2024-01-01T00:00:00',
+            created_before=now,
+            ids=f'{CARD_IDS[0]}, {CARD_IDS[1]},',
+            status='active',
+            user_id='US01',
+            number=None,
+        )
+    )
+    assert query.to_filters() == QueryFilters(
+        filters=(
+            Filter('user_id', 'eq', 'US01'),
+            Filter('id', 'in', CARD_IDS[:2]),
+            Filter('created_at', 'lte', now),
+            Filter('created_at', 'gte', dt.datetime(2024, 1, 1)),
+            Filter('status', 'eq', 'active'),
+        ),
+        count=True,
+        page_size=20,
+    )
+
+
+def test_query_to_filters_only_set_fields():
+    # wallet_id's default isn't a filter, like it isn't in model_dump
+    assert BalanceEntryQuery(limit=5).to_filters() == QueryFilters(
+        filters=(), limit=5
+    )
+    assert BalanceEntryQuery(wallet_id='LA01').to_filters().filters == (
+        Filter('wallet_id', 'eq', 'LA01'),
+    )
+    assert UserQuery(ids='').to_filters().filters == ()
+
+
+@pytest.mark.parametrize(
+    'data',
+    [
+        dict(),
+        dict(
+            status='succeeded',
+            network='spei',
+            ids=f'{TRANSFER_IDS[0]},{TRANSFER_IDS[1]}',
+        ),
+        dict(created_after=now, account_number='646180157034181180'),
+        dict(idempotency_key='key', count=True, limit=10),
+    ],
+)
+def test_query_to_filters_matches_model_dump(data):
+    query = TransferQuery.model_validate(data)
+    dumped = query.model_dump()
+    filters = {
+        (flt.field if flt.op == 'eq' else f'{flt.field}.{flt.op}'): flt.value
+        for flt in query.to_filters().filters
+    }
+    expected = {
+        key: value
+        for key, value in dumped.items()
+        if key not in {'count', 'limit', 'ids', 'created_after'}
+    }
+    if 'ids' in dumped:
+        expected['id.in'] = tuple(dumped['ids'].split(','))
+    if 'created_after' in dumped:
+        expected['created_at.gte'] = now
+    assert filters == expected
+
+
+@pytest.fixture
+def cursor_secret(monkeypatch) -> None:
+    monkeypatch.setattr(Cursor, 'secret', b'not so secret')
+
+
+CURSOR_CREATED_AT = dt.datetime(2024, 5, 1, 12, 30, 1, 123456, dt.timezone.utc)
+
+
+@pytest.mark.usefixtures('cursor_secret')
+@pytest.mark.parametrize('id', ['TR01', 'TRSnL4BHyuRsqIHVdVTcvLwg', ''])
+def test_cursor_round_trip(id: str) -> None:
+    cursor = Cursor.create(CURSOR_CREATED_AT, id)
+    assert cursor.isascii() and '=' not in cursor
+    decoded = Cursor.decode(cursor)
+    assert decoded == cursor
+    assert decoded.created_at == CURSOR_CREATED_AT
+    assert decoded.id == id
+
+
+@pytest.mark.usefixtures('cursor_secret')
+def test_cursor_naive_datetime() -> None:
+    naive = dt.datetime(2024, 5, 1, 12, 30)
+    cursor = Cursor.decode(Cursor.create(naive, 'TR01'))
+    assert cursor.created_at == naive.astimezone(dt.timezone.utc)
+
+
+@pytest.mark.usefixtures('cursor_secret')
+@pytest.mark.parametrize(
+    'model', [TransferQuery, DepositQuery, BalanceEntryQuery]
+)
+def test_query_cursor(model: type[QueryParams]) -> None:
+    token = str(Cursor.create(CURSOR_CREATED_AT, 'TR01'))
+    query = model.model_validate(dict(cursor=token, page_size=10))
+    cursor = query.to_filters().cursor
+    assert isinstance(cursor, Cursor)
+    assert (cursor.created_at, cursor.id) == (CURSOR_CREATED_AT, 'TR01')
+    assert query.model_dump() == dict(cursor=token, page_size=10)
+    assert query.to_filters().filters == ()
+
+
+def test_query_without_cursor() -> None:
+    assert CardQuery.model_validate({}).to_filters().cursor is None
+    assert 'cursor' not in CardQuery.model_fields
+
+
+@pytest.mark.usefixtures('cursor_secret')
+def test_cursor_invalid() -> None:
+    token = Cursor.create(CURSOR_CREATED_AT, 'TR01')
+    forged = Cursor.create(CURSOR_CREATED_AT, 'TR02')
+    tampered = forged[:-16] + token[-16:]
+    for value in [tampered, token[:-1], 'short', 'not base64!', 'x' * 200]:
+        with pytest.raises(ValidationError):
+            TransferQuery.model_validate(dict(cursor=value))
+    # junk that urlsafe_b64decode would skip
+    for value in ['ñ', f'{token[:4]}!{token[4:]}', f'{token}.', f' {token}']:
+        with pytest.raises(ValueError, match='invalid cursor'):
+            Cursor.decode(value)
+    assert Cursor.decode(token) == token
+
+
+@pytest.mark.parametrize('secret', [None, b''])
+def test_cursor_without_secret(monkeypatch, secret) -> None:
+    monkeypatch.setattr(Cursor, 'secret', secret)
+    with pytest.raises(RuntimeError, match='secret must be set'):
+        Cursor.create(CURSOR_CREATED_AT, 'TR01')
+    with pytest.raises(ValidationError, match='cursors are not enabled'):
+        TransferQuery.model_validate(dict(cursor='TR01'))
+
+
+def test_cursor_secret_too_long(monkeypatch) -> None:
+    monkeypatch.setattr(Cursor, 'secret', b'x' * 65)
+    with pytest.raises(RuntimeError, match='must be up to 64 bytes'):
+        Cursor.create(CURSOR_CREATED_AT, 'TR01')
+    with pytest.raises(RuntimeError, match='must be up to 64 bytes'):
+        TransferQuery.model_validate(dict(cursor='TR01'))
+
+
+@pytest.mark.usefixtures('cursor_secret')
+def test_cursor_max_length() -> None:
+    # 8 bytes of timestamp, the id and 12 of signature, in base64
+    longest = Cursor.create(CURSOR_CREATED_AT, 'T' * 76)
+    assert len(longest) == MAX_CURSOR_LENGTH
+    assert Cursor.decode(longest).id == 'T' * 76
+    with pytest.raises(ValueError, match='id is too long'):
+        Cursor.create(CURSOR_CREATED_AT, 'T' * 77)
+
+
 def test_exclude_none_in_dict():
     request = ApiKeyUpdateRequest(user_id='US123')
     assert request.model_dump() == dict(user_id='US123')
@@ -671,6 +1021,154 @@ def test_get_monthly_movements_type_name() -> None:
     )
 
 
+def test_enum_labels() -> None:
+    assert State.VZ.label == 'Veracruz'  # type: ignore[attr-defined]
+    assert state_labels[State.DF] == 'Ciudad de México'
+    assert state_labels['DF'] == 'Ciudad de México'
+    assert state_labels.labels_for([State.VZ, 'DF']) == [
+        'Veracruz',
+        'Ciudad de México',
+    ]
+
+
+@pytest.mark.parametrize(
+    'labels,text,member',
+    [
+        (state_labels, 'Ciudad de México', State.DF),
+        (state_labels, '  ciudad   de MEXICO ', State.DF),
+        (state_labels, 'vz', State.VZ),
+        (profession_labels, 'EMPLEADO(A/E)', Profession.empleado),
+        (income_type_labels, 'independiente', IncomeType.freelance),
+        (income_type_labels, 'freelance', IncomeType.freelance),
+    ],
+)
+def test_enum_labels_lookup(
+    labels: EnumLabels, text: str, member: Enum
+) -> None:
+    assert labels.lookup(text) is member
+
+
+def test_enum_labels_lookup_many() -> None:
+    assert state_labels.lookup_many(['veracruz', 'DF']) == [State.VZ, State.DF]
+    with pytest.raises(ValueError, match="'Atlantis' is not a valid State"):
+        state_labels.lookup_many(['Veracruz', 'Atlantis'])
+
+
+class Color(str, Enum):
+    red = 'red'
+    blue = 'blue'
+
+
+def test_enum_labels_missing_label() -> None:
+    with pytest.raises(ValueError, match=r"Missing Color labels: \['blue'\]"):
+        EnumLabels(Color, {Color.red: 'Rojo'})
+
+
+def test_enum_labels_ambiguous_label() -> None:
+    with pytest.raises(ValueError, match="'Red' matches more than one Color"):
+        EnumLabels(Color, {Color.red: 'Rojo', Color.blue: 'Red'})
+
+
+def test_enum_coercer_all_enums() -> None:
+    for value in vars(enums).values():
+        if isinstance(value, type) and issubclass(value, Enum):
+            assert enum_coercer(value).coerce_many(list(value)) == list(value)
+
+
+def test_enum_coercer_is_shared() -> None:
+    assert enum_coercer(TransactionStatus) is enum_coercer(TransactionStatus)
+
+
+@pytest.mark.parametrize(
+    'value,lenient,member',
+    [
+        ('succeeded', False, TransactionStatus.succeeded),
+        (TransactionStatus.failed, False, TransactionStatus.failed),
+        ('SUCCEEDED', False, None),
+        ('SUCCEEDED', True, TransactionStatus.succeeded),
+        (' Succeeded ', True, TransactionStatus.succeeded),
+        ('nope', True, None),
+        (1, True, None),
+        (['succeeded'], True, None),
+    ],
+)
+def test_enum_coercer_lookup(
+    value: Any, lenient: bool, member: Optional[TransactionStatus]
+) -> None:
+    coercer = enum_coercer(TransactionStatus)
+    assert coercer.lookup(value, lenient) is member
+
+
+@pytest.mark.parametrize(
+    'value,member',
+    [
+        ('not-set', TrackDataMethod.not_set),
+        ('NOT_SET', TrackDataMethod.not_set),
+        ('not set', TrackDataMethod.not_set),
+        ('Magnetic Stripe', TrackDataMethod.magnetic_stripe),
+    ],
+)
+def test_enum_coercer_separators(value: str, member: TrackDataMethod) -> None:
+    assert enum_coercer(TrackDataMethod).coerce(value, lenient=True) is member
+
+
+def test_enum_coercer_coerce_error() -> None:
+    with pytest.raises(ValueError, match="'SUCCEEDED' is not a valid"):
+        enum_coercer(TransactionStatus).coerce('SUCCEEDED')
+
+
+def test_enum_coercer_coerce_many() -> None:
+    coercer = enum_coercer(TransactionStatus)
+    values = ['succeeded', 'FAILED', 'in review']
+    assert coercer.coerce_many(iter(values), lenient=True) == [
+        TransactionStatus.succeeded,
+        TransactionStatus.failed,
+        TransactionStatus.in_review,
+    ]
+    with pytest.raises(ValueError, match="'FAILED' is not a valid"):
+        coercer.coerce_many(values)
+
+
+def test_enum_coercer_aliases() -> None:
+    coercer = EnumCoercer(
+        TransactionStatus, aliases={'OK': TransactionStatus.succeeded}
+    )
+    assert coercer.coerce('ok', lenient=True) is TransactionStatus.succeeded
+    assert coercer.lookup('OK') is None
+
+
+def test_enum_coercer_ambiguous_alias() -> None:
+    with pytest.raises(ValueError, match="'Failed' matches more than one"):
+        EnumCoercer(
+            TransactionStatus, aliases={'Failed': TransactionStatus.succeeded}
+        )
+
+
+LenientTrackDataMethod = lenient_enum(
+    TrackDataMethod, aliases={'swipe': TrackDataMethod.magnetic_stripe}
+)
+
+
+class LenientModel(BaseModel):
+    status: lenient_enum(TransactionStatus)  # type: ignore[valid-type]
+    method: LenientTrackDataMethod  # type: ignore[valid-type]
+
+
+def test_lenient_enum() -> None:
+    model = LenientModel(status='SUCCEEDED', method='Swipe')
+    assert model.status is TransactionStatus.succeeded
+    assert model.method is TrackDataMethod.magnetic_stripe
+    assert model.model_dump() == dict(
+        status='succeeded', method='magnetic_stripe'
+    )
+
+
+def test_lenient_enum_error() -> None:
+    with pytest.raises(ValidationError) as exc_info:
+        LenientModel(status='nope', method='manual')
+    assert exc_info.value.errors()[0]['type'] == 'enum'
+
+
 def test_bank_account_validation_clabe_request():
     assert BankAccountValidationRequest(account_number='646180157098510917')
 
@@ -833,3 +1331,382 @@ def test_log_config(
 def test_get_log_config_no_log_config():
     field = FieldInfo(default=None)
     assert get_log_config(field) is None
+
+
+class NestedLogRequest(BaseRequest):
+    name: str
+    single: Optional[LogConfigModel] = None
+    many: list[LogConfigModel] = []
+    token: Annotated[
+        Optional[str], LogConfig(masked=True, unmasked_chars_length=2)
+    ] = None
+
+
+LOG_CONFIG_DATA = dict(
+    password='Mypass123.',
+    validated='str123',
+    secret='super-secret',
+    partial_secret='1234567890',
+    unmasked='unmasked',
+    excluded='excluded',
+)
+MASKED_LOG_CONFIG_DATA = dict(
+    password='**********',
+    validated='******',
+    secret='************',
+    partial_secret='******7890',
+    unmasked='unmasked',
+)
+
+
+def test_model_dump_for_log():
+    request = NestedLogRequest.model_validate(
+        dict(
+            name='log',
+            single=LOG_CONFIG_DATA,
+            many=[LOG_CONFIG_DATA, LOG_CONFIG_DATA],
+            token='abcdef',
+        )
+    )
+    assert request.model_dump_for_log() == dict(
+        name='log',
+        single=MASKED_LOG_CONFIG_DATA,
+        many=[MASKED_LOG_CONFIG_DATA, MASKED_LOG_CONFIG_DATA],
+        token='****ef',
+    )
+    assert request.model_dump()['token'] == 'abcdef'
+
+
+def test_model_dump_for_log_unset_fields():
+    request = NestedLogRequest(name='log')
+    assert request.model_dump_for_log() == dict(name='log')
+    assert request.model_dump_for_log(
+        exclude_unset=False, exclude_none=False
+    ) == dict(name='log', single=None, many=[], token=None)
+
+
+def test_model_dump_for_log_login():
+    request = UserLoginRequest(password='supersecret')
+    assert request.model_dump_for_log() == dict(password='***********')
+
+
+def test_log_plan_cached():
+    plan = get_log_plan(NestedLogRequest)
+    assert get_log_plan(NestedLogRequest) is plan
+    assert [entry.name for entry in plan] == ['single', 'many', 'token']
+    assert get_log_plan(TransferRequest) == ()
+
+
+class LogNode(BaseRequest):
+    secret: Annotated[str, LogConfig(masked=True)]
+    link: Optional['LogLink'] = None
+    by_name: dict[str, 'LogNode'] = {}
+
+
+class LogLink(BaseRequest):
+    name: str
+    node: Optional[LogNode] = None
+    nodes: tuple[LogNode, ...] = ()
+
+
+class LogLeaf(BaseRequest):
+    name: str
+    parent: Optional['LogLeaf'] = None
+
+
+LogNode.model_rebuild()
+LogLeaf.model_rebuild()
+
+
+def test_model_dump_for_log_recursive_models():
+    node = dict(secret='abc', link=dict(name='link'))
+    request = LogNode.model_validate(
+        dict(
+            secret='secret',
+            link=dict(name='link', node=node, nodes=[node]),
+            by_name=dict(secret=dict(secret='xyz')),
+        )
+    )
+    masked_node = dict(secret='***', link=dict(name='link'))
+    assert request.model_dump_for_log() == dict(
+        secret='******',
+        link=dict(name='link', node=masked_node, nodes=(masked_node,)),
+        by_name=dict(secret=dict(secret='***')),
+    )
+    assert [entry.name for entry in get_log_plan(LogNode)] == [
+        'secret',
+        'link',
+        'by_name',
+    ]
+    assert get_log_plan(LogLeaf) == ()
+
+
+class LogAliasModel(BaseModel):
+    secret: Annotated[str, LogConfig(masked=True)] = Field(alias='Secret')
+    excluded: Annotated[str, LogConfig(excluded=True)] = Field(
+        alias='Excluded'
+    )
+
+
+class LogContainersRequest(BaseRequest):
+    aliased: Optional[LogAliasModel] = None
+    either: Union[LogLeaf, LogConfigModel, None] = None
+    many: list[Union[LogLeaf, LogConfigModel]] = []
+    by_key: dict[str, list[LogConfigModel]] = {}
+
+
+def test_model_dump_for_log_by_alias():
+    request = LogContainersRequest(aliased=dict(Secret='abc', Excluded='xyz'))
+    assert request.model_dump_for_log() == dict(aliased=dict(secret='***'))
+    assert request.model_dump_for_log(by_alias=True) == dict(
+        aliased=dict(Secret='***')
+    )
+    assert [
+        entry.key for entry in get_log_plan(LogAliasModel, by_alias=True)
+    ] == ['Secret', 'Excluded']
+
+
+def test_model_dump_for_log_unions_and_containers():
+    leaf = dict(name='leaf', parent=dict(name='secret'))
+    request = LogContainersRequest.model_validate(
+        dict(
+            either=LOG_CONFIG_DATA,
+            many=[leaf, LOG_CONFIG_DATA],
+            by_key=dict(a=[LOG_CONFIG_DATA]),
+        )
+    )
+    assert request.model_dump_for_log() == dict(
+        either=MASKED_LOG_CONFIG_DATA,
+        many=[leaf, MASKED_LOG_CONFIG_DATA],
+        by_key=dict(a=[MASKED_LOG_CONFIG_DATA]),
+    )
+    assert request.model_dump_for_log(mode='json') == dict(
+        either=MASKED_LOG_CONFIG_DATA,
+        many=[leaf, MASKED_LOG_CONFIG_DATA],
+        by_key=dict(a=[MASKED_LOG_CONFIG_DATA]),
+    )
+    # a leaf has the fields of neither plan
+    request = LogContainersRequest.model_validate(dict(either=leaf))
+    assert request.model_dump_for_log() == dict(either=leaf)
+    # items excluded from the dump can't be matched with their models
+    request = LogContainersRequest.model_validate(dict(many=[leaf, leaf]))
+    assert request.model_dump_for_log(exclude={'many': {0}}) == dict(
+        many=[leaf]
+    )
+
+
+@pytest.mark.parametrize(
+    'value,unmasked_chars_length,expected',
+    [
+        ('secret', 0, '******'),
+        ('secret', 2, '****et'),
+        ('secret', 6, '******'),
+        ('secret', 10, '******'),
+        (1234, 2, '**34'),
+        ('', 2, ''),
+    ],
+)
+def test_mask_value(value, unmasked_chars_length, expected):
+    assert mask_value(value, unmasked_chars_length) == expected
+
+
+JPEG = b'\xff\xd8\xff\xe0\x00\x10JFIF\x00' + bytes(100)
+PNG = b'\x89PNG\r\n\x1a\n' + bytes(100)
+
+
+@pytest.mark.parametrize(
+    'head,extensions',
+    [
+        (JPEG, {FileExtension.jpg, FileExtension.jpeg}),
+        (PNG, {FileExtension.png}),
+        (b'%PDF-1.7\n', {FileExtension.pdf}),
+        (
+            b'\x00\x00\x00\x18ftypmp42',
+            {FileExtension.mp4, FileExtension.mov, FileExtension.v_3gpp},
+        ),
+        (b'\xef\xbb\xbf\n<!DOCTYPE html>', {FileExtension.html}),
+        (b'<html><body>', {FileExtension.html}),
+        (b'test', set()),
+    ],
+)
+def test_sniff_extensions(head: bytes, extensions: set) -> None:
+    assert files.sniff_extensions(head) == extensions
+
+
+def file_upload(
+    file: Any, model: type[FileUploadRequest] = FileUploadRequest, **kwargs
+) -> FileUploadRequest:
+    return model.model_validate(
+        dict(file=file, type='ine', user_id='US01', **kwargs)
+    )
+
+
+@pytest.mark.parametrize(
+    'file',
+    [
+        JPEG,
+        'dGVzdA==',
+        bytearray(JPEG),
+        memoryview(JPEG),
+        io.BytesIO(JPEG),
+    ],
+)
+@pytest.mark.parametrize('model', [FileUploadRequest, StrictFileUploadRequest])
+def test_file_upload_request_does_not_copy(file: Any, model) -> None:
+    assert file_upload(file, model, extension='jpg').file is file
+
+
+def test_file_upload_request_mmap() -> None:
+    with mmap.mmap(-1, len(PNG)) as mapped:
+        mapped.write(PNG)
+        request = file_upload(mapped, StrictFileUploadRequest, extension='png')
+        assert request.file is mapped
+        assert json.dumps(request.model_dump(), cls=JSONEncoder) == json.dumps(
+            dict(
+                file=base64.b64encode(PNG).decode(),
+                extension='png',
+                type='ine',
+                user_id='US01',
+            )
+        )
+
+
+def test_file_upload_request_file_position() -> None:
+    file = io.BytesIO(PNG)
+    file.seek(8)
+    assert file_upload(file).file.tell() == 8
+    # the head is sniffed from the current position
+    request = file_upload(file, StrictFileUploadRequest, extension='pdf')
+    assert request.file.tell() == 8
+    file.seek(0)
+    with pytest.raises(ValidationError):
+        file_upload(file, StrictFileUploadRequest, extension='pdf')
+    assert file.tell() == 0
+
+
+def test_file_upload_request_model_dump_file() -> None:
+    file = io.BytesIO(PNG)
+    request = file_upload(file)
+    assert request.model_dump()['file'] is file
+    assert request.model_dump(exclude={'file'}) == dict(
+        type='ine', user_id='US01'
+    )
+    assert json.loads(json.dumps(request.model_dump(), cls=JSONEncoder))[
+        'file'
+    ] == (base64.b64encode(PNG).decode())
+
+
+@pytest.mark.parametrize(
+    'file',
+    [
+        b'hello',
+        bytearray(b'hello'),
+        memoryview(b'hello'),
+        io.BytesIO(b'hello'),
+    ],
+)
+def test_file_upload_request_model_dump_json(file: Any) -> None:
+    # as UTF-8 text, like the bytes field it replaced
+    request = file_upload(file)
+    assert json.loads(request.model_dump_json())['file'] == 'hello'
+    assert request.model_dump(mode='json')['file'] == 'hello'
+    assert file_upload('dGVzdA==').model_dump(mode='json')['file'] == (
+        'dGVzdA=='
+    )
+
+
+def test_file_upload_request_array() -> None:
+    file = array.array('B', b'hello')
+    request = file_upload(file)
+    assert request.file is file
+    assert json.loads(request.model_dump_json())['file'] == 'hello'
+    assert (
+        json.loads(json.dumps(request.model_dump(), cls=JSONEncoder))['file']
+        == 'aGVsbG8='
+    )
+    adapter: TypeAdapter[Any] = TypeAdapter(files.file_content(4))
+    with pytest.raises(ValidationError, match='larger than 4 bytes'):
+        adapter.validate_python(file)
+
+
+def test_file_upload_request_model_dump_json_binary() -> None:
+    file = io.BytesIO(PNG)
+    with pytest.raises(PydanticSerializationError):
+        file_upload(file).model_dump_json()
+    assert file.tell() == 0
+
+
+@pytest.mark.parametrize(
+    'file,extension',
+    [(JPEG, 'png'), (PNG, 'jpg'), (memoryview(PNG), 'mp4')],
+)
+def test_file_upload_request_extension_mismatch(
+    file: Any, extension: str
+) -> None:
+    assert file_upload(file, extension=extension).file is file
+    with pytest.raises(
+        ValidationError,
+        match=f'file content does not match extension {extension}',
+    ):
+        file_upload(file, StrictFileUploadRequest, extension=extension)
+
+
+@pytest.mark.parametrize('extension', [None, 'pdf'])
+def test_file_upload_request_unknown_content(extension) -> None:
+    request = file_upload(
+        b'test', StrictFileUploadRequest, extension=extension
+    )
+    assert request.file == b'test'
+
+
+def test_file_upload_request_max_size() -> None:
+    large = bytes(files.MAX_FILE_SIZE + 1)
+    assert file_upload(large).file is large
+    with pytest.raises(ValidationError, match='larger than 20971520 bytes'):
+        file_upload(large, StrictFileUploadRequest)
+
+
+def test_file_content_max_size() -> None:
+    class Upload(BaseModel):
+        file: files.file_content(8)  # type: ignore
+
+    assert Upload(file=b'12345678').file == b'12345678'
+    assert Upload(file='dGVzdHRlc3Q=').file == 'dGVzdHRlc3Q='
+    for file in [b'123456789', io.BytesIO(b'123456789'), 'dGVzdHRlc3R0A']:
+        with pytest.raises(ValidationError, match='larger than 8 bytes'):
+            Upload(file=file)
+
+
+class Unseekable(io.RawIOBase):
+    def readable(self) -> bool:
+        return True
+
+
+class TextReader:
+    def read(self, size: int = -1) -> str:
+        return 'hello'[:size]
+
+
+@pytest.mark.parametrize(
+    'file,error',
+    [
+        (memoryview(JPEG)[::2], 'memoryview must be contiguous'),
+        (Unseekable(), 'file must be seekable'),
+        (123, 'file must be bytes, str'),
+        (io.StringIO('hello'), 'file must be bytes, str'),
+        (TextReader(), 'file must be bytes, str'),
+    ],
+)
+def test_file_upload_request_invalid_file(file: Any, error: str) -> None:
+    with pytest.raises(ValidationError, match=error):
+        file_upload(file)
+
+
+def test_address_request_examples_are_copies():
+    examples = [
+        AddressRequest.model_config['json_schema_extra']['example'],
+        UserRequest.model_config['json_schema_extra']['example']['address'],
+    ]
+    assert examples[0] == examples[1] == ADDRESS_REQUEST_EXAMPLE
+    assert len({id(example) for example in examples}) == 2
+    assert all(example is not ADDRESS_REQUEST_EXAMPLE for example in examples)
@@ -1,11 +1,43 @@
+import base64
+import datetime as dt
+import io
+import mmap
+import sys
+import unicodedata
+from enum import Enum
+from typing import Any
+
 import pytest
 
 from cuenca_validations.validators import (
+    NAME_FOLD_TABLE,
+    PHONE_NUMBER_DELETE_TABLE,
+    SANITIZE_PHONE_NUMBER,
+    cached_normalize_name,
+    iter_base64,
     normalize_email,
+    normalize_emails,
     normalize_name,
     normalize_phone_number,
+    normalize_phone_numbers,
+    sanitize_dict,
+    sanitize_item,
 )
 
+PHONE_NUMBERS = [
+    '+116503456789',
+    '+5215512345678',
+    '+520445512345678',
+    '+52 (55) 1234-5678',
+    '+525512345678',
+    '+16503456789',
+    '+52\u3000155.1234.5678',
+    '11 650 345 6789',
+    '+44 20 7946 0958',
+    '+9952155123456789',
+    '',
+]
+
 
 @pytest.mark.parametrize(
     'raw, normalized',
@@ -46,7 +78,228 @@ def test_normalize_phone_number(raw: str, normalized: str) -> None:
         ('María  José', 'maria jose'),  # collapse internal whitespace
         ('  Raúl  ', 'raul'),  # trim + lowercase
         ('Nuño Garçía', 'nuno garcia'),  # tilde and cedilla
+        ('Jose\u0301 Pen\u0303a', 'jose pena'),  # decomposed accents
+        ('Søren ÆSIR', 'søren æsir'),  # letters without decomposition
+        ('ΟΔΥΣΣΕΥΣ', 'οδυσσευς'),  # final sigma
     ],
 )
 def test_normalize_name(raw: str, normalized: str) -> None:
     assert normalize_name(raw) == normalized
+    assert cached_normalize_name(raw) == normalized
+
+
+def test_name_fold_table_matches_nfkd() -> None:
+    for code, folded in NAME_FOLD_TABLE.items():
+        nfkd = unicodedata.normalize('NFKD', chr(code))
+        assert folded == ''.join(
+            c for c in nfkd if not unicodedata.combining(c)
+        )
+
+
+def test_normalize_emails_matches_scalar() -> None:
+    emails = ['user+cuenca@Gmail.com', 'user@Yahoo.com', 'no-at-sign']
+    assert normalize_emails(emails) == [normalize_email(e) for e in emails]
+
+
+def test_normalize_phone_numbers_matches_scalar() -> None:
+    assert normalize_phone_numbers(PHONE_NUMBERS) == [
+        normalize_phone_number(pn) for pn in PHONE_NUMBERS
+    ]
+
+
+def test_phone_number_delete_table_matches_regex() -> None:
+    expected = {
+        c
+        for c in range(sys.maxunicode + 1)
+        if SANITIZE_PHONE_NUMBER.match(chr(c))
+    }
+    assert set(PHONE_NUMBER_DELETE_TABLE) == expected
+
+
+class Color(str, Enum):
+    red = 'red'
+
+
+class Birthday(dt.date): ...  # noqa: E701
+
+
+class Timestamp(dt.datetime): ...  # noqa: E701
+
+
+class Payload(bytes): ...  # noqa: E701
+
+
+class WithToDict(dict):
+    def to_dict(self) -> dict:
+        return dict(converted=True)
+
+
+def test_sanitize_item_nested_containers() -> None:
+    today = dt.date(2024, 1, 2)
+    item = dict(
+        a=[dict(b=today), (Color.red, b'hi'), {Birthday(2024, 1, 3)}],
+        c=dict(d=dict(e=today)),
+        f=WithToDict(),
+    )
+    assert sanitize_item(item) == dict(
+        a=[dict(b='2024-01-02'), ('red', 'aGk='), {'2024-01-03'}],
+        c=dict(d=dict(e='2024-01-02')),
+        f=dict(converted=True),
+    )
+
+
+def test_sanitize_item_leaves() -> None:
+    utc = dt.timezone.utc
+    assert sanitize_item('plain') == 'plain'
+    assert sanitize_item(Timestamp(2024, 1, 2, tzinfo=utc)) == (
+        '2024-01-02T00:00:00+00:00'
+    )
+    assert sanitize_item([Payload(b'hi'), dt.date(2024, 1, 2), 1]) == [
+        'aGk=',
+        '2024-01-02',
+        1,
+    ]
+    assert sanitize_item(Color.red) == 'red'
+    assert sanitize_item(Birthday(2024, 1, 3)) == '2024-01-03'
+    assert sanitize_item(WithToDict()) == dict(converted=True)
+    assert sanitize_item(object, default=repr) == repr(object)
+    assert sanitize_item(object) is object
+
+
+def test_sanitize_dict_copy_does_not_mutate() -> None:
+    today = dt.date(2024, 1, 2)
+    original = dict(a=dict(b=today), c='c', d=[today])
+    sanitized = sanitize_dict(original, copy=True)
+    assert sanitized == dict(a=dict(b='2024-01-02'), c='c', d=['2024-01-02'])
+    assert original == dict(a=dict(b=today), c='c', d=[today])
+    assert sanitize_dict(original) is original
+    assert original['a'] == dict(b='2024-01-02')
+
+
+def test_sanitize_item_does_not_mutate() -> None:
+    today = dt.date(2024, 1, 2)
+    original = dict(a=[dict(b=today)], c=(dict(d=today),))
+    sanitized = sanitize_item(original)
+    assert sanitized == dict(
+        a=[dict(b='2024-01-02')], c=(dict(d='2024-01-02'),)
+    )
+    assert original == dict(a=[dict(b=today)], c=(dict(d=today),))
+    assert sanitize_item(original, copy=False) is original
+    assert original['c'][0] == dict(d='2024-01-02')
+
+
+@pytest.mark.parametrize('copy', [True, False])
+def test_sanitize_item_deep_nesting(copy: bool) -> None:
+    today = dt.date(2024, 1, 2)
+    depth = sys.getrecursionlimit() * 2
+    item: list = []
+    inner = item
+    for level in range(depth):
+        child: Any = [] if level % 3 else dict(day=today, n=1)
+        inner.append((child, frozenset([today])) if level % 5 else child)
+        inner = child if isinstance(child, list) else child.setdefault('x', [])
+    inner.append(today)
+    sanitized = sanitize_item(item, copy=copy)
+    for level in range(depth):
+        if level % 5:
+            assert sanitized[0][1] == frozenset(['2024-01-02'])
+            sanitized = sanitized[0][0]
+        else:
+            sanitized = sanitized[0]
+        if not level % 3:
+            assert sanitized['day'] == '2024-01-02' and sanitized['n'] == 1
+            sanitized = sanitized['x']
+    assert sanitized == ['2024-01-02']
+
+
+def test_sanitize_item_deep_cycles() -> None:
+    item: list = []
+    inner = item
+    for _ in range(sys.getrecursionlimit() * 2):
+        inner.append([])
+        inner = inner[0]
+    shared = dict(day=dt.date(2024, 1, 2))
+    inner.extend([item, shared, (shared,), WithToDict()])
+    sanitized = sanitize_item(item)
+    inner = sanitized
+    for _ in range(sys.getrecursionlimit() * 2):
+        inner = inner[0]
+    assert inner[0] is sanitized
+    assert inner[1] is inner[2][0]
+    assert inner[1] == dict(day='2024-01-02')
+    assert inner[3] == dict(converted=True)
+
+
+def test_sanitize_item_cycles_and_shared_references() -> None:
+    shared = dict(day=dt.date(2024, 1, 2))
+    cyclic: list = [shared, shared]
+    cyclic.append(cyclic)
+    sanitized = sanitize_item(cyclic, copy=True)
+    assert sanitized[0] is sanitized[1]
+    assert sanitized[0] == dict(day='2024-01-02')
+    assert sanitized[2] is sanitized
+    assert shared == dict(day=dt.date(2024, 1, 2))
+
+
+class ShortReads(io.RawIOBase):
+    """Returns at most 7 bytes per read, like a pipe or a socket"""
+
+    def __init__(self, data: bytes) -> None:
+        self.data = io.BytesIO(data)
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:  # type: ignore[override]
+        chunk = self.data.read(min(len(buffer), 7))
+        buffer[: len(chunk)] = chunk
+        return len(chunk)
+
+
+BINARY = bytes(range(256)) * 40 + b'end'
+BINARY_BASE64 = base64.b64encode(BINARY).decode()
+
+
+@pytest.mark.parametrize(
+    'data',
+    [
+        BINARY,
+        bytearray(BINARY),
+        memoryview(BINARY),
+        memoryview(BINARY[:-3]).cast('I'),
+        io.BytesIO(BINARY),
+        ShortReads(BINARY),
+    ],
+)
+def test_iter_base64(data) -> None:
+    expected = (
+        base64.b64encode(memoryview(data)).decode()
+        if isinstance(data, memoryview)
+        else BINARY_BASE64
+    )
+    chunks = list(iter_base64(data, chunk_size=300))
+    assert ''.join(chunks) == expected
+    assert all(len(chunk) <= 400 and not len(chunk) % 4 for chunk in chunks)
+
+
+def test_iter_base64_file_position() -> None:
+    file = io.BytesIO(BINARY)
+    file.seek(3)
+    assert ''.join(iter_base64(file)) == base64.b64encode(BINARY[3:]).decode()
+    assert file.tell() == 3
+
+
+def test_iter_base64_chunk_size() -> None:
+    with pytest.raises(ValueError, match='multiple of 3'):
+        next(iter_base64(BINARY, chunk_size=100))
+
+
+def test_sanitize_item_binary() -> None:
+    with mmap.mmap(-1, len(BINARY)) as mapped:
+        mapped.write(BINARY)
+        assert sanitize_item(mapped) == BINARY_BASE64
+    assert sanitize_item(bytearray(BINARY)) == BINARY_BASE64
+    assert sanitize_item(memoryview(BINARY)) == BINARY_BASE64
+    assert sanitize_item(dict(file=io.BytesIO(BINARY))) == dict(
+        file=BINARY_BASE64
+    )